@@ -0,0 +1,195 @@
+"""
+Annotation Store
+Drop-in replacement for the plain annotation list that keeps secondary
+indexes (page, SR No, Ref No, type counts) up to date, so per-page
+rendering and punch lookups cost O(annotations on that page / with that
+SR No) instead of a scan over the whole cabinet.
+
+It is still a list - iteration order, JSON serialization and existing
+list code keep working. Code that changes an indexed field ('page',
+'sr_no', 'ref_no', 'type') on an annotation already in the store must
+call reindex(ann) afterwards.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from stroke_geometry import annotations_equal
+
+
+INDEXED_FIELDS = ('page', 'sr_no', 'ref_no', 'type')
+
+
+class AnnotationStore(list):
+    """List of annotation dicts with page / sr_no / ref_no / type indexes"""
+
+    def __init__(self, annotations: Iterable[dict] = ()):
+        super().__init__(annotations)
+        self._rebuild_index()
+
+    # ================================================================
+    # INDEX MAINTENANCE
+    # ================================================================
+
+    def _rebuild_index(self):
+        self._by_page: Dict[object, List[dict]] = defaultdict(list)
+        self._by_sr_no: Dict[object, List[dict]] = defaultdict(list)
+        self._by_ref_no: Dict[str, List[dict]] = defaultdict(list)
+        self._type_counts: Dict[object, int] = defaultdict(int)
+        # id(annotation) -> indexed field values at the time it was indexed
+        self._indexed: Dict[int, tuple] = {}
+        for ann in self:
+            self._index(ann)
+
+    def _index(self, ann: dict):
+        keys = tuple(ann.get(f) for f in INDEXED_FIELDS)
+        page, sr_no, ref_no, ann_type = keys
+        self._indexed[id(ann)] = keys
+        self._by_page[page].append(ann)
+        if sr_no is not None:
+            self._by_sr_no[sr_no].append(ann)
+        if ref_no:
+            self._by_ref_no[str(ref_no).strip()].append(ann)
+        self._type_counts[ann_type] += 1
+
+    def _unindex(self, ann: dict):
+        keys = self._indexed.pop(id(ann), None)
+        if keys is None:
+            return
+        page, sr_no, ref_no, ann_type = keys
+        self._discard(self._by_page, page, ann)
+        if sr_no is not None:
+            self._discard(self._by_sr_no, sr_no, ann)
+        if ref_no:
+            self._discard(self._by_ref_no, str(ref_no).strip(), ann)
+        self._type_counts[ann_type] -= 1
+        if self._type_counts[ann_type] <= 0:
+            del self._type_counts[ann_type]
+
+    @staticmethod
+    def _discard(index, key, ann):
+        bucket = index.get(key)
+        if not bucket:
+            return
+        for i, item in enumerate(bucket):
+            if item is ann:
+                del bucket[i]
+                break
+        if not bucket:
+            del index[key]
+
+    def reindex(self, ann: dict):
+        """Refresh the indexes after an annotation's page/sr_no/ref_no/type changed"""
+        if id(ann) in self._indexed:
+            self._unindex(ann)
+            self._index(ann)
+
+    # ================================================================
+    # LIST MUTATORS
+    # ================================================================
+
+    def append(self, ann: dict):
+        super().append(ann)
+        self._index(ann)
+
+    def extend(self, annotations: Iterable[dict]):
+        for ann in annotations:
+            self.append(ann)
+
+    def __iadd__(self, annotations):
+        self.extend(annotations)
+        return self
+
+    def insert(self, index, ann: dict):
+        super().insert(index, ann)
+        self._index(ann)
+
+    def remove(self, ann: dict):
+        for i, item in enumerate(self):
+            if annotations_equal(item, ann):
+                del self[i]
+                return
+        raise ValueError("annotation not in store")
+
+    def pop(self, index=-1):
+        ann = super().pop(index)
+        self._unindex(ann)
+        return ann
+
+    def clear(self):
+        super().clear()
+        self._rebuild_index()
+
+    def __delitem__(self, index):
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        for ann in removed:
+            self._unindex(ann)
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._rebuild_index()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._rebuild_index()
+
+    def reverse(self):
+        super().reverse()
+        self._rebuild_index()
+
+    # ================================================================
+    # QUERIES
+    # ================================================================
+
+    def on_page(self, page) -> List[dict]:
+        """Annotations on one page, in insertion order"""
+        return list(self._by_page.get(page, ()))
+
+    def in_pages(self, pages: Iterable) -> Iterable[dict]:
+        """Annotations on the given pages, page by page"""
+        for page in pages:
+            yield from self._by_page.get(page, ())
+
+    def annotated_pages(self) -> set:
+        """Pages that carry at least one annotation"""
+        return {page for page in self._by_page if page is not None}
+
+    def page_count(self) -> int:
+        """Number of pages that carry at least one annotation"""
+        return len(self.annotated_pages())
+
+    def by_sr_no(self, sr_no) -> List[dict]:
+        return list(self._by_sr_no.get(sr_no, ()))
+
+    def by_ref_no(self, ref_no) -> List[dict]:
+        return list(self._by_ref_no.get(str(ref_no).strip(), ()))
+
+    def of_type(self, ann_type) -> List[dict]:
+        """Annotations of one type (scan only if any exist)"""
+        if not self._type_counts.get(ann_type):
+            return []
+        return [a for a in self if a.get('type') == ann_type]
+
+    def type_count(self, ann_type) -> int:
+        return self._type_counts.get(ann_type, 0)
+
+    def type_counts(self) -> Dict[object, int]:
+        return dict(self._type_counts)
+
+    def punch_counts(self, page) -> Tuple[int, int]:
+        """(punches, not yet implemented) on one page - thumbnail badges"""
+        punches = [a for a in self._by_page.get(page, ()) if a.get('sr_no') is not None]
+        return len(punches), sum(1 for a in punches if not a.get('implemented'))
+
+    def find_punch(self, sr_no, excel_row=None, types: Optional[Iterable] = None) -> Optional[dict]:
+        """Annotation for a punch: by SR No, falling back to its Excel row"""
+        types = tuple(types) if types is not None else None
+        for ann in self._by_sr_no.get(sr_no, ()):
+            if types is None or ann.get('type') in types:
+                return ann
+        if excel_row is not None:
+            for ann in self:
+                if ann.get('excel_row') == excel_row and (types is None or ann.get('type') in types):
+                    return ann
+        return None
@@ -0,0 +1,430 @@
+"""
+Content-Addressed Page Cache
+Cabinets of one project usually carry the same (or nearly the same)
+schematic set. Rasters and OCR results are stored on disk under a hash of
+the page *content* - contents stream, XObjects, images, embedded font
+programs, page box and rotation - rather than the file path, so cabinet
+#2 reuses what cabinet #1 rendered, across the Quality, Highlighter and
+Production tools. Rasters are additionally keyed by render profile (gray
+or RGB).
+
+The cache lives in the per-user cache folder (%LOCALAPPDATA%, ~/.cache),
+never in the application folder unless there is no such folder.
+
+Rasters are kept only for the standard zoom steps (PNG, fast compression),
+OCR results as JSON. A SQLite index tracks sizes and last use; the cache
+is capped at max_bytes and evicts least recently used entries. Writes go
+through a background thread so the display path never waits on the disk.
+
+Highlight OCR readings are kept per page region: the bbox is snapped to a
+REGION_GRID point grid, and a lookup reuses any cached region of the same
+page content and OCR profile that overlaps it by REGION_MIN_OVERLAP, so
+re-drawing a highlight a few points off still hits.
+"""
+
+import hashlib
+import json
+import math
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+from page_cache import pdf_identity
+
+
+# Viewer scales (2 x zoom level) worth keeping on disk - 50 % .. 150 % zoom
+STANDARD_SCALES = (1.0, 1.5, 2.0, 2.5, 3.0)
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+CACHE_FOLDER = "content_cache"
+APP_FOLDER = "InprocessTool"   # per-user cache subfolder shared by all tools
+
+REGION_GRID = 4.0            # page points
+REGION_MIN_OVERLAP = 0.7     # intersection over union
+REGION_MAX_ROWS = 50000
+
+
+def user_cache_root() -> Optional[str]:
+    """Per-user cache folder of the OS (None if it cannot be determined)"""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return base if base and os.path.isabs(base) else None
+
+
+def default_cache_dir() -> str:
+    """content_cache folder in the user's cache folder (shared by all tools) -
+    next to the application only when there is none"""
+    root = user_cache_root()
+    if root:
+        return os.path.join(root, APP_FOLDER, CACHE_FOLDER)
+    if getattr(sys, 'frozen', False):
+        base = os.path.dirname(sys.executable)
+    else:
+        base = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base, CACHE_FOLDER)
+
+
+# ================================================================
+# PAGE CONTENT HASH
+# ================================================================
+
+_page_hashes: Dict[Tuple, str] = {}
+_font_digests: Dict[Tuple, str] = {}
+_page_hash_lock = threading.Lock()
+
+
+def _font_digest(doc, font) -> str:
+    """Length and SHA-1 of a font's program, memoized per document and xref.
+
+    Subset fonts share names across files but not glyphs. Type3 fonts have
+    no program - their glyph procedures (CharProcs streams) are hashed instead.
+    """
+    xref, _, font_type = font[:3]
+    memo_key = (pdf_identity(doc), xref)
+    with _page_hash_lock:
+        cached = _font_digests.get(memo_key)
+    if cached is not None:
+        return cached
+
+    sha, size = hashlib.sha1(), 0
+    try:
+        if font_type == 'Type3':
+            kind, procs = doc.xref_get_key(xref, 'CharProcs')
+            if kind == 'xref':
+                procs = doc.xref_object(int(procs.split()[0]), compressed=True)
+            for name, proc in re.findall(r'/([^\s/<>\[\]()]+)\s*(\d+) 0 R', procs):
+                stream = doc.xref_stream_raw(int(proc)) or b''
+                sha.update(name.encode() + stream)
+                size += len(stream)
+        else:
+            program = doc.extract_font(xref)[3] or b''
+            sha.update(program)
+            size = len(program)
+    except Exception as e:
+        print(f"⚠️ Font {xref} not readable for the page hash: {e}")
+    digest = f"{size}:{sha.hexdigest()}"
+
+    with _page_hash_lock:
+        _font_digests[memo_key] = digest
+    return digest
+
+
+def page_content_hash(doc, page_number: int) -> str:
+    """SHA-1 over everything MuPDF draws for a page.
+
+    Memoized per document identity and page, so each page is hashed once
+    per session.
+    """
+    memo_key = (pdf_identity(doc), page_number)
+    with _page_hash_lock:
+        cached = _page_hashes.get(memo_key)
+    if cached is not None:
+        return cached
+
+    page = doc[page_number]
+    sha = hashlib.sha1()
+    sha.update(repr((tuple(page.mediabox), tuple(page.cropbox), page.rotation)).encode())
+    sha.update(page.read_contents())
+    for xref, *_ in page.get_xobjects():
+        sha.update(doc.xref_stream_raw(xref) or b'')
+    for image in page.get_images(full=True):
+        sha.update(doc.xref_stream_raw(image[0]) or b'')
+    for font in page.get_fonts(full=True):
+        sha.update(repr(font[1:4]).encode())  # ext, type, basefont
+        sha.update(_font_digest(doc, font).encode())
+    for xref, *_ in page.annot_xrefs():
+        sha.update(doc.xref_object(xref, compressed=True).encode())
+    digest = sha.hexdigest()
+
+    with _page_hash_lock:
+        _page_hashes[memo_key] = digest
+    return digest
+
+
+# ================================================================
+# DISK CACHE
+# ================================================================
+
+class ContentCache:
+    """Size-capped, LRU, content-addressed disk cache for rasters and OCR"""
+
+    # Rasters that render faster than this are cheaper to redo than to decode
+    MIN_RENDER_S = 0.1
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(self.cache_dir, "index.db"),
+                                     timeout=10, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                path TEXT,
+                data TEXT,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON entries (last_used)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_regions (
+                page_hash TEXT NOT NULL,
+                profile TEXT NOT NULL,
+                x0 REAL NOT NULL,
+                y0 REAL NOT NULL,
+                x1 REAL NOT NULL,
+                y1 REAL NOT NULL,
+                data TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (page_hash, profile, x0, y0, x1, y1)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_region_used ON ocr_regions (last_used)")
+        self._conn.commit()
+
+        self.hits = {'raster': 0, 'ocr': 0, 'region': 0}
+        self.misses = {'raster': 0, 'ocr': 0, 'region': 0}
+        self.evicted = 0
+
+        self._writes = queue.Queue()
+        self._writer = threading.Thread(target=self._run_writer, name="content-cache", daemon=True)
+        self._writer.start()
+
+    # ================================================================
+    # RASTERS
+    # ================================================================
+
+    @staticmethod
+    def is_standard_scale(scale: float) -> bool:
+        return any(abs(scale - s) < 1e-6 for s in STANDARD_SCALES)
+
+    def get_page_raster(self, doc, page_number: int, scale: float,
+                        profile: str) -> Optional[Image.Image]:
+        """Raster of a page at a standard scale and render profile from disk, or None"""
+        if not self.is_standard_scale(scale):
+            return None
+        return self.get_raster(page_content_hash(doc, page_number), scale, profile)
+
+    def put_page_raster(self, doc, page_number: int, scale: float, profile: str, img: Image.Image):
+        if self.is_standard_scale(scale):
+            self.put_raster(page_content_hash(doc, page_number), scale, profile, img)
+
+    @staticmethod
+    def _raster_key(page_hash: str, scale: float, profile: str) -> str:
+        # profile: 'gray' or 'rgb' (rasters never carry alpha)
+        return f"raster:{page_hash}:{scale:.2f}:{profile}"
+
+    def get_raster(self, page_hash: str, scale: float, profile: str) -> Optional[Image.Image]:
+        key = self._raster_key(page_hash, scale, profile)
+        row = self._lookup(key, 'raster')
+        if row is None:
+            return None
+        try:
+            img = Image.open(os.path.join(self.cache_dir, row[0]))
+            img.load()
+            return img
+        except Exception:
+            # Evicted by another tool between lookup and open
+            self._forget(key)
+            return None
+
+    def put_raster(self, page_hash: str, scale: float, profile: str, img: Image.Image):
+        """Queue a raster for writing (the image must not be modified afterwards)"""
+        rel_path = os.path.join("rasters", page_hash[:2], f"{page_hash}_{scale:.2f}_{profile}.png")
+        self._writes.put(('raster', self._raster_key(page_hash, scale, profile), rel_path, img))
+
+    # ================================================================
+    # OCR RESULTS
+    # ================================================================
+
+    def get_ocr(self, page_hash: str, variant: str):
+        """JSON value stored for a page's OCR variant (e.g. 'page@2.0'), or None"""
+        row = self._lookup(f"ocr:{page_hash}:{variant}", 'ocr')
+        return json.loads(row[1]) if row is not None else None
+
+    def put_ocr(self, page_hash: str, variant: str, value):
+        self._writes.put(('ocr', f"ocr:{page_hash}:{variant}", None, json.dumps(value)))
+
+    # ================================================================
+    # OCR REGIONS
+    # ================================================================
+
+    @staticmethod
+    def snap_bbox(bbox) -> Tuple[float, float, float, float]:
+        """Grow a page-space bbox outwards to the region grid (never empty)"""
+        x0, y0, x1, y1 = bbox
+        x0, y0 = math.floor(x0 / REGION_GRID), math.floor(y0 / REGION_GRID)
+        x1, y1 = max(math.ceil(x1 / REGION_GRID), x0 + 1), max(math.ceil(y1 / REGION_GRID), y0 + 1)
+        return (x0 * REGION_GRID, y0 * REGION_GRID, x1 * REGION_GRID, y1 * REGION_GRID)
+
+    def get_ocr_region(self, page_hash: str, bbox, profile: str):
+        """Stored reading of the best-overlapping cached region, or None"""
+        x0, y0, x1, y1 = self.snap_bbox(bbox)
+        area = (x1 - x0) * (y1 - y0)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT x0, y0, x1, y1, data FROM ocr_regions "
+                "WHERE page_hash = ? AND profile = ? AND x0 < ? AND x1 > ? AND y0 < ? AND y1 > ?",
+                (page_hash, profile, x1, x0, y1, y0)).fetchall()
+            best, best_overlap = None, 0.0
+            for rx0, ry0, rx1, ry1, data in rows:
+                inter = (min(x1, rx1) - max(x0, rx0)) * (min(y1, ry1) - max(y0, ry0))
+                overlap = inter / (area + (rx1 - rx0) * (ry1 - ry0) - inter)
+                if overlap > best_overlap:
+                    best, best_overlap = (rx0, ry0, rx1, ry1, data), overlap
+            if best is None or best_overlap < REGION_MIN_OVERLAP:
+                self.misses['region'] += 1
+                return None
+            self._conn.execute(
+                "UPDATE ocr_regions SET last_used = ? "
+                "WHERE page_hash = ? AND profile = ? AND x0 = ? AND y0 = ? AND x1 = ? AND y1 = ?",
+                (time.time(), page_hash, profile) + best[:4])
+            self._conn.commit()
+            self.hits['region'] += 1
+        return json.loads(best[4])
+
+    def put_ocr_region(self, page_hash: str, bbox, profile: str, value: dict):
+        """Queue an OCR reading (text, confidence, rotation, word boxes) for a region"""
+        self._writes.put(('region', f"region:{page_hash}:{profile}", None,
+                          (page_hash, profile, self.snap_bbox(bbox), json.dumps(value))))
+
+    # ================================================================
+    # INDEX
+    # ================================================================
+
+    def _lookup(self, key: str, kind: str):
+        with self._lock:
+            row = self._conn.execute("SELECT path, data FROM entries WHERE key = ?",
+                                     (key,)).fetchone()
+            if row is None:
+                self.misses[kind] += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?",
+                               (time.time(), key))
+            self._conn.commit()
+            self.hits[kind] += 1
+            return row
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _run_writer(self):
+        while True:
+            kind, key, rel_path, value = self._writes.get()
+            try:
+                if kind == 'region':
+                    self._write_region(*value)
+                    continue
+                if kind == 'raster':
+                    full_path = os.path.join(self.cache_dir, rel_path)
+                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                    tmp_path = f"{full_path}.{os.getpid()}.tmp"
+                    value.save(tmp_path, format='PNG', compress_level=1)
+                    os.replace(tmp_path, full_path)
+                    size, data = os.path.getsize(full_path), None
+                else:
+                    size, data = len(value), value
+                with self._lock:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO entries (key, kind, path, data, size, last_used) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, kind, rel_path, data, size, time.time()))
+                    self._conn.commit()
+                self._evict()
+            except Exception as e:
+                print(f"⚠️ Content cache write failed for {key}: {e}")
+            finally:
+                self._writes.task_done()
+
+    def _write_region(self, page_hash: str, profile: str, bbox, data: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_regions "
+                "(page_hash, profile, x0, y0, x1, y1, data, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (page_hash, profile) + tuple(bbox) + (data, time.time()))
+            count = self._conn.execute("SELECT COUNT(*) FROM ocr_regions").fetchone()[0]
+            if count > REGION_MAX_ROWS:
+                # Least recently used tenth goes in one statement
+                excess = count - int(REGION_MAX_ROWS * 0.9)
+                self._conn.execute(
+                    "DELETE FROM ocr_regions WHERE rowid IN "
+                    "(SELECT rowid FROM ocr_regions ORDER BY last_used LIMIT ?)", (excess,))
+                self.evicted += excess
+                print(f"🧹 Content cache evicted {excess} OCR regions")
+            self._conn.commit()
+
+    def _evict(self):
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            victims = []
+            for key, path, size in self._conn.execute(
+                    "SELECT key, path, size FROM entries ORDER BY last_used"):
+                if total <= self.max_bytes * 0.9:
+                    break
+                victims.append((key, path))
+                total -= size
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k, _ in victims])
+            self._conn.commit()
+            self.evicted += len(victims)
+
+        for _, path in victims:
+            if path:
+                try:
+                    os.remove(os.path.join(self.cache_dir, path))
+                except OSError:
+                    pass
+        print(f"🧹 Content cache evicted {len(victims)} entries")
+
+    def flush(self, timeout: float = 5.0):
+        """Wait for queued writes (tests, app close)"""
+        deadline = time.time() + timeout
+        while self._writes.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.01)
+
+    # ================================================================
+    # STATISTICS
+    # ================================================================
+
+    def format_stats(self) -> str:
+        parts = []
+        for kind in ('raster', 'ocr', 'region'):
+            lookups = self.hits[kind] + self.misses[kind]
+            if lookups:
+                parts.append(f"{kind} {self.hits[kind]}/{lookups} hits")
+        return "disk: " + (", ".join(parts) if parts else "idle")
+
+
+_shared: Dict[str, ContentCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_content_cache(cache_dir: Optional[str] = None) -> Optional[ContentCache]:
+    """One ContentCache per directory for the whole process (None if unusable)"""
+    cache_dir = cache_dir or default_cache_dir()
+    with _shared_lock:
+        if cache_dir not in _shared:
+            try:
+                _shared[cache_dir] = ContentCache(cache_dir)
+            except Exception as e:
+                print(f"⚠️ Content cache disabled ({cache_dir}): {e}")
+                _shared[cache_dir] = None
+        return _shared[cache_dir]
@@ -0,0 +1,316 @@
+"""
+OCR Engine
+One entry point for every tesseract call in the tools.
+
+pytesseract starts a new tesseract process per call, and every process
+reloads the language data (150-400 ms before any recognition happens).
+When the optional tesserocr package is installed, the engine instead
+keeps one initialized tesseract API per thread and language/page-mode
+pair, in process, and reuses it for every later call on that thread.
+pytesseract stays as the fallback backend.
+
+Calls made inside an ocr_deadline() block get the time left until the
+deadline: pytesseract kills its tesseract process when it runs out
+(OcrTimeout), and no call is started once the deadline has passed. The
+in-process tesserocr backend cannot be interrupted mid-call; it only
+gets the check before each call.
+
+OCR_ENGINE counts calls, latency and budget kills per backend; run this
+file directly to benchmark the available backends on an image.
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import pytesseract
+from PIL import Image, ImageDraw
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+
+DEFAULT_LANG = 'eng'
+TIMEOUT_MESSAGE = 'Tesseract process timeout'   # pytesseract's, after killing the process
+
+
+class OcrTimeout(RuntimeError):
+    """The OCR deadline passed - the call was skipped or its process killed"""
+
+
+class OcrBackendUnavailable(RuntimeError):
+    """A backend cannot start (language data, broken install) - use the fallback for good"""
+
+
+_deadline = threading.local()
+
+
+@contextmanager
+def ocr_deadline(deadline: Optional[float]):
+    """OCR calls on this thread inside the block must end by deadline (time.perf_counter())"""
+    previous = getattr(_deadline, 'at', None)
+    _deadline.at = deadline
+    try:
+        yield
+    finally:
+        _deadline.at = previous
+
+
+def current_deadline() -> Optional[float]:
+    """This thread's OCR deadline (None - no deadline)"""
+    return getattr(_deadline, 'at', None)
+
+
+def ocr_remaining() -> Optional[float]:
+    """Seconds left before this thread's OCR deadline (None - no deadline)"""
+    deadline = current_deadline()
+    return None if deadline is None else deadline - time.perf_counter()
+
+
+class OcrStats:
+    """Calls, latency and deadline kills per backend"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+        self.timeouts = 0
+
+    def record(self, backend: str, elapsed: float):
+        with self._lock:
+            self.calls[backend] = self.calls.get(backend, 0) + 1
+            self.seconds[backend] = self.seconds.get(backend, 0.0) + elapsed
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def format(self) -> str:
+        with self._lock:
+            parts = [f"{name} {count} calls, {self.seconds[name] / count * 1000:.0f} ms/call"
+                     for name, count in self.calls.items()]
+            if self.timeouts:
+                parts.append(f"{self.timeouts} stopped at deadline")
+        return ", ".join(parts) if parts else "no OCR calls"
+
+
+# ================================================================
+# BACKENDS
+# ================================================================
+
+class PytesseractBackend:
+    """tesseract executable, one process per call"""
+
+    name = 'pytesseract'
+
+    def image_to_data(self, image: Image.Image, lang: str, psm: Optional[int],
+                      whitelist: Optional[str] = None, timeout: Optional[float] = None) -> dict:
+        return self._run(pytesseract.image_to_data, image, lang=lang,
+                         config=self._config(psm, whitelist), output_type=pytesseract.Output.DICT,
+                         timeout=timeout)
+
+    def image_to_string(self, image: Image.Image, lang: str, psm: Optional[int],
+                        whitelist: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        return self._run(pytesseract.image_to_string, image, lang=lang,
+                         config=self._config(psm, whitelist), timeout=timeout)
+
+    @staticmethod
+    def _run(fn, image, timeout: Optional[float] = None, **kwargs):
+        try:
+            # pytesseract kills the process once timeout runs out (0 - no limit)
+            return fn(image, timeout=max(timeout, 0.001) if timeout is not None else 0, **kwargs)
+        except RuntimeError as e:
+            if str(e) == TIMEOUT_MESSAGE:
+                raise OcrTimeout(f"tesseract killed after {timeout:.2f} s") from e
+            raise
+
+    @staticmethod
+    def _config(psm: Optional[int], whitelist: Optional[str] = None) -> str:
+        options = []
+        if psm is not None:
+            options.append(f'--psm {psm}')
+        if whitelist:
+            options.append(f'-c tessedit_char_whitelist={whitelist}')
+        return ' '.join(options)
+
+
+class TesserocrBackend:
+    """tesseract C API via tesserocr - one initialized engine per thread"""
+
+    name = 'tesserocr'
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def image_to_data(self, image: Image.Image, lang: str, psm: Optional[int],
+                      whitelist: Optional[str] = None, timeout: Optional[float] = None) -> dict:
+        """Word-level results in pytesseract's Output.DICT layout (in process - timeout unused)"""
+        api = self._api(lang, psm, whitelist)
+        api.SetImage(image)
+        api.Recognize()
+        data = {'text': [], 'conf': [], 'left': [], 'top': [], 'width': [], 'height': []}
+        level = tesserocr.RIL.WORD
+        iterator = api.GetIterator()
+        if iterator is not None:
+            for word in tesserocr.iterate_level(iterator, level):
+                box = word.BoundingBox(level)
+                if box is None:
+                    continue
+                x0, y0, x1, y1 = box
+                data['text'].append(word.GetUTF8Text(level) or '')
+                data['conf'].append(word.Confidence(level))
+                data['left'].append(x0)
+                data['top'].append(y0)
+                data['width'].append(x1 - x0)
+                data['height'].append(y1 - y0)
+        api.Clear()
+        return data
+
+    def image_to_string(self, image: Image.Image, lang: str, psm: Optional[int],
+                        whitelist: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        api = self._api(lang, psm, whitelist)
+        api.SetImage(image)
+        text = api.GetUTF8Text()
+        api.Clear()
+        return text
+
+    def _api(self, lang: str, psm: Optional[int], whitelist: Optional[str] = None):
+        apis = getattr(self._local, 'apis', None)
+        if apis is None:
+            apis = self._local.apis = {}
+        key = (lang, psm)
+        api = apis.get(key)
+        if api is None:
+            # tesserocr.PSM only holds the mode constants - the API takes the int
+            mode = psm if psm is not None else tesserocr.PSM.AUTO
+            path = tessdata_dir()
+            try:
+                if path:
+                    api = tesserocr.PyTessBaseAPI(path=path, lang=lang, psm=mode)
+                else:
+                    api = tesserocr.PyTessBaseAPI(lang=lang, psm=mode)
+            except RuntimeError as e:
+                raise OcrBackendUnavailable(f"tesseract init failed for '{lang}': {e}") from e
+            apis[key] = api
+            print(f"🔤 OCR engine ready on {threading.current_thread().name} ({lang}, psm {mode})")
+        # Variables stick to the API - always set, so a whitelist never leaks into later calls
+        api.SetVariable('tessedit_char_whitelist', whitelist or '')
+        return api
+
+
+def tessdata_dir() -> Optional[str]:
+    """tessdata folder of the configured tesseract install (None - library default)"""
+    prefix = os.environ.get('TESSDATA_PREFIX')
+    if prefix:
+        return prefix
+    cmd = pytesseract.pytesseract.tesseract_cmd
+    if cmd and os.path.isabs(cmd):
+        path = os.path.join(os.path.dirname(cmd), 'tessdata')
+        if os.path.isdir(path):
+            return path
+    return None
+
+
+# ================================================================
+# ENGINE
+# ================================================================
+
+class OcrEngine:
+    """Routes OCR calls to the persistent backend, falling back to pytesseract"""
+
+    def __init__(self):
+        self.stats = OcrStats()
+        self.fallback = PytesseractBackend()
+        self.backend = TesserocrBackend() if tesserocr is not None else self.fallback
+        self._backend_lock = threading.Lock()
+
+    def image_to_data(self, image: Image.Image, lang: str = DEFAULT_LANG,
+                      psm: Optional[int] = None, whitelist: Optional[str] = None) -> dict:
+        return self._call('image_to_data', image, lang, psm, whitelist)
+
+    def image_to_string(self, image: Image.Image, lang: str = DEFAULT_LANG,
+                        psm: Optional[int] = None, whitelist: Optional[str] = None) -> str:
+        return self._call('image_to_string', image, lang, psm, whitelist)
+
+    def _call(self, method: str, image, lang, psm, whitelist):
+        timeout = ocr_remaining()
+        if timeout is not None and timeout <= 0:
+            self.stats.record_timeout()
+            raise OcrTimeout("OCR deadline passed - call skipped")
+        backend = self.backend
+        start = time.perf_counter()
+        try:
+            result = getattr(backend, method)(image, lang, psm, whitelist, timeout)
+        except OcrTimeout:
+            self.stats.record_timeout()
+            raise
+        except Exception as e:
+            if backend is self.fallback:
+                raise
+            if isinstance(e, OcrBackendUnavailable):
+                # Missing language data, broken install - stay on pytesseract from now on
+                with self._backend_lock:
+                    if self.backend is backend:
+                        print(f"⚠️ {backend.name} unavailable ({e}) - switching to pytesseract")
+                        self.backend = self.fallback
+            else:
+                print(f"⚠️ {backend.name} call failed ({e}) - retrying it with pytesseract")
+            backend = self.fallback
+            timeout = ocr_remaining()
+            start = time.perf_counter()
+            try:
+                result = getattr(backend, method)(image, lang, psm, whitelist, timeout)
+            except OcrTimeout:
+                self.stats.record_timeout()
+                raise
+        self.stats.record(backend.name, time.perf_counter() - start)
+        return result
+
+
+OCR_ENGINE = OcrEngine()
+
+
+# ================================================================
+# BENCHMARK
+# ================================================================
+
+def _sample_image() -> Image.Image:
+    img = Image.new('L', (360, 60), 255)
+    ImageDraw.Draw(img).text((10, 20), "TB1-23  K12  X4:17", fill=0)
+    return img.resize((1080, 180))
+
+
+def benchmark(image: Optional[Image.Image] = None, runs: int = 10):
+    """Latency per call of every available backend on the same image"""
+    image = image or _sample_image()
+    backends = [PytesseractBackend()]
+    if tesserocr is not None:
+        backends.append(TesserocrBackend())
+    else:
+        print("ℹ️ tesserocr not installed - only the pytesseract backend is available")
+
+    for backend in backends:
+        timings = []
+        try:
+            for _ in range(runs):
+                start = time.perf_counter()
+                data = backend.image_to_data(image, DEFAULT_LANG, 6)
+                timings.append(time.perf_counter() - start)
+        except Exception as e:
+            print(f"{backend.name:12s} failed: {e}")
+            continue
+        words = [w for w in data['text'] if str(w).strip()]
+        steady = timings[1:] or timings
+        print(f"{backend.name:12s} first call {timings[0] * 1000:7.1f} ms, "
+              f"then {sum(steady) / len(steady) * 1000:7.1f} ms/call "
+              f"(min {min(steady) * 1000:.1f} ms) - {' '.join(words)!r}")
+
+
+if __name__ == '__main__':
+    sample = Image.open(sys.argv[1]) if len(sys.argv) > 1 else None
+    benchmark(sample, int(sys.argv[2]) if len(sys.argv) > 2 else 10)
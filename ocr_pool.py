@@ -0,0 +1,322 @@
+"""
+OCR Worker Pool
+Runs OCR jobs off the Tk thread on a small, bounded thread pool
+(tesseract is an external process, so threads run it in parallel).
+
+A job's result is handed back on the Tk thread: finished jobs are put on
+a queue that the pool drains from a root.after() poll, and the job's
+on_done callback runs from there. A cancelled job never calls back; if it
+has not started yet it never runs, and a running job sees should_stop()
+turn True so it can skip its remaining passes.
+
+ocr_orientations() runs the rotated variants of one crop concurrently on
+a separate, per-core pool: the first result above its confidence
+threshold wins, the passes still queued are cancelled, and the best
+result so far is returned once the latency budget runs out.
+
+Every job has a time budget (OCR_BUDGET_S from submission, configurable
+with the QC_OCR_BUDGET_S environment variable). The job runs under an
+OCR deadline, so at the end of the budget the orientation search returns
+its best partial reading, and tesseract processes still running are
+killed. Jobs finishing past their budget are counted as overruns.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ocr_engine import OCR_ENGINE, current_deadline, ocr_deadline
+
+
+MAX_WORKERS = 2
+POLL_MS = 30
+
+
+def _budget_from_env(default: float) -> float:
+    try:
+        return max(0.5, float(os.environ.get('QC_OCR_BUDGET_S', default)))
+    except ValueError:
+        print(f"⚠️ QC_OCR_BUDGET_S is not a number - using {default} s")
+        return default
+
+
+# Longest one highlight's OCR may take, from the highlight being drawn
+OCR_BUDGET_S = _budget_from_env(4.0)
+# Delay between a popup menu closing and cancelling its OCR job - a chosen
+# entry runs its command in between and claims the job first
+DISMISS_GRACE_MS = 200
+
+# Orientation -> confidence that ends the search. 0° is by far the most
+# common, so it is trusted earlier than a rotated reading.
+ORIENTATIONS = ((0, 60), (90, 70), (270, 70), (180, 70))
+ORIENTATION_BUDGET_S = 3.0
+ORIENTATION_WORKERS = min(4, os.cpu_count() or 2)
+
+# Identifies the highlight OCR pipeline in cached readings (the adaptive
+# profile picked for a region is stored in the reading itself)
+HIGHLIGHT_OCR_PROFILE = "adaptive-otsu-glyph32"
+
+
+class OcrJob:
+    """Handle for one submitted OCR job"""
+
+    def __init__(self, on_done: Optional[Callable] = None, budget_s: float = OCR_BUDGET_S):
+        self.on_done = on_done
+        self.result = None
+        self.error: Optional[Exception] = None
+        self.submitted = time.perf_counter()
+        self.deadline = self.submitted + budget_s
+        self.started = None
+        self.elapsed = None
+        self.overrun = False
+        self.delivered = False  # result handed to the Tk thread (on_done called unless failed)
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+        self._future = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def should_stop(self) -> bool:
+        """Passed to the job function - True once the job is cancelled"""
+        return self._cancelled.is_set()
+
+    def remaining(self) -> float:
+        """Seconds left of the job's budget"""
+        return max(0.0, self.deadline - time.perf_counter())
+
+    def cancel(self):
+        """Drop the job - it is not started if still queued and never calls back"""
+        if self._finished.is_set() or self._cancelled.is_set():
+            return
+        self._cancelled.set()
+        if self._future is not None:
+            self._future.cancel()
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block for the result (None on timeout, error or cancellation)"""
+        self._finished.wait(timeout)
+        return self.result if self.done else None
+
+
+class OcrWorkerPool:
+    """Bounded pool of OCR threads with results delivered via root.after"""
+
+    def __init__(self, root, max_workers: int = MAX_WORKERS, budget_s: float = OCR_BUDGET_S):
+        self.root = root
+        self.budget_s = budget_s
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="ocr-worker")
+        self._results = queue.Queue()
+        self._poll_id = None
+        self._jobs = set()
+        self.completed = 0
+        self.cancelled = 0
+        self.overruns = 0
+
+    def submit(self, fn: Callable, *args, on_done: Optional[Callable] = None) -> OcrJob:
+        """Run fn(*args, should_stop=job.should_stop) on a worker.
+
+        on_done(result) is called on the Tk thread unless the job is
+        cancelled first. OCR calls made by fn end at the job's deadline.
+        """
+        job = OcrJob(on_done, self.budget_s)
+        job._future = self._executor.submit(self._run, job, fn, args)
+        self._jobs.add(job)
+        self._schedule_poll()
+        return job
+
+    def shutdown(self):
+        """Cancel queued jobs and stop polling (app close)"""
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ================================================================
+    # WORKER SIDE
+    # ================================================================
+
+    def _run(self, job: OcrJob, fn: Callable, args):
+        if job.cancelled:
+            job._finished.set()
+            self._results.put(job)
+            return
+        job.started = time.perf_counter()
+        try:
+            with ocr_deadline(job.deadline):
+                job.result = fn(*args, should_stop=job.should_stop)
+        except Exception as e:
+            job.error = e
+        finished = time.perf_counter()
+        job.elapsed = finished - job.started
+        job.overrun = finished >= job.deadline
+        job._finished.set()
+        self._results.put(job)
+
+    # ================================================================
+    # TK SIDE
+    # ================================================================
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                job = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._jobs.discard(job)
+            self._deliver(job)
+
+        # Jobs cancelled before they started never reach the queue
+        for job in [j for j in self._jobs if j._future.cancelled()]:
+            self._jobs.discard(job)
+            self.cancelled += 1
+        if self._jobs:
+            self._schedule_poll()
+
+    def _deliver(self, job: OcrJob):
+        if job.overrun:
+            self.overruns += 1
+            print(f"⏱️ OCR job hit its {self.budget_s:.1f} s budget "
+                  f"({self.overruns} overruns in {self.completed + self.cancelled + 1} jobs)")
+        if job.cancelled:
+            self.cancelled += 1
+            return
+        self.completed += 1
+        job.delivered = True
+        queued_ms = ((job.started or job.submitted) - job.submitted) * 1000
+        if job.error is not None:
+            print(f"❌ OCR job failed after {job.elapsed * 1000:.0f} ms: {job.error}")
+            return
+        print(f"🔍 OCR job finished in {job.elapsed * 1000:.0f} ms (queued {queued_ms:.0f} ms) "
+              f"- {OCR_ENGINE.stats.format()}, {self.overruns} over budget")
+        if job.on_done is not None:
+            job.on_done(job.result)
+
+
+# ================================================================
+# MULTI-ORIENTATION OCR
+# ================================================================
+
+_orientation_executor = None
+_orientation_lock = threading.Lock()
+
+
+def _orientation_pool() -> ThreadPoolExecutor:
+    # Separate from OcrWorkerPool so a highlight job waiting on its
+    # orientation passes can never starve them of threads
+    global _orientation_executor
+    with _orientation_lock:
+        if _orientation_executor is None:
+            _orientation_executor = ThreadPoolExecutor(max_workers=ORIENTATION_WORKERS,
+                                                       thread_name_prefix="ocr-orientation")
+        return _orientation_executor
+
+
+def _ocr_rotated(image, angle: int, ocr_fn: Callable, deadline: Optional[float]):
+    started = time.perf_counter()
+    # PIL rotates counter-clockwise; angle is the clockwise reading direction
+    rotated = image.rotate(-angle % 360, expand=True) if angle else image
+    with ocr_deadline(deadline):
+        text, confidence, *words = ocr_fn(rotated)
+    return text, confidence, words[0] if words else [], time.perf_counter() - started
+
+
+def image_boxes(words: List, angle: int, size: Tuple[int, int]) -> List:
+    """Map (x0, y0, x1, y1, text) boxes read at angle back onto the unrotated image"""
+    width, height = size
+    boxes = []
+    for x0, y0, x1, y1, text in words:
+        if angle == 90:
+            x0, y0, x1, y1 = y0, height - x1, y1, height - x0
+        elif angle == 180:
+            x0, y0, x1, y1 = width - x1, height - y1, width - x0, height - y0
+        elif angle == 270:
+            x0, y0, x1, y1 = width - y1, x0, width - y0, x1
+        boxes.append((x0, y0, x1, y1, text))
+    return boxes
+
+
+def ocr_orientations(image, ocr_fn: Callable, budget_s: float = ORIENTATION_BUDGET_S,
+                     should_stop: Optional[Callable] = None,
+                     orientations: Tuple[Tuple[int, int], ...] = ORIENTATIONS
+                     ) -> Tuple[Optional[str], float, int, List]:
+    """OCR image at every candidate orientation concurrently.
+
+    Args:
+        ocr_fn: PIL image -> (text, confidence) or (text, confidence, word boxes)
+        orientations: (angle, confidence that ends the search), preferred first
+        budget_s: wall-clock limit; the best reading so far is returned after it
+            (or at the caller's OCR deadline, if sooner - the passes inherit it)
+        should_stop: checked while waiting - True abandons the search
+
+    Returns:
+        (text, confidence, angle, word boxes in the rotated image) of the
+        accepted or best reading
+    """
+    started = time.perf_counter()
+    deadline = current_deadline()
+    if deadline is not None:
+        budget_s = min(budget_s, deadline - started)
+    executor = _orientation_pool()
+    futures = {executor.submit(_ocr_rotated, image, angle, ocr_fn, deadline): (angle, accept_at)
+               for angle, accept_at in orientations}
+    timings: Dict[int, str] = {}
+    best = (None, 0, 0, [])
+    pending = set(futures)
+    outcome = "all passes"
+
+    while pending:
+        remaining = budget_s - (time.perf_counter() - started)
+        if remaining <= 0:
+            outcome = "budget expired"
+            break
+        if should_stop is not None and should_stop():
+            outcome = "cancelled"
+            break
+        done, pending = wait(pending, timeout=min(remaining, 0.1), return_when=FIRST_COMPLETED)
+        accepted = None
+        # Ties go to the earlier orientation in orientations
+        for future in sorted(done, key=lambda f: orientations.index(futures[f])):
+            angle, accept_at = futures[future]
+            try:
+                text, confidence, words, elapsed = future.result()
+            except Exception as e:
+                timings[angle] = "failed"
+                print(f"⚠️ OCR {angle}° failed: {e}")
+                continue
+            timings[angle] = f"{elapsed * 1000:.0f} ms ({confidence:.0f}%)"
+            if text and confidence > best[1]:
+                best = (text, confidence, angle, words)
+            if text and confidence > accept_at and (accepted is None or confidence > accepted[1]):
+                accepted = (text, confidence, angle, words)
+        if accepted is not None:
+            best = accepted
+            outcome = f"accepted {best[2]}°"
+            break
+
+    # Passes not started yet are dropped; running ones finish unobserved
+    for future in pending:
+        future.cancel()
+        angle = futures[future][0]
+        timings.setdefault(angle, "cancelled" if future.cancelled() else "abandoned")
+
+    print(f"🧭 OCR orientations ({outcome}, {(time.perf_counter() - started) * 1000:.0f} ms): "
+          + ", ".join(f"{angle}° {timings.get(angle, '-')}" for angle, _ in orientations))
+    return best
@@ -0,0 +1,73 @@
+"""
+OCR Prefill Dialog
+Text prompt for a highlight whose OCR is still running. Choosing a
+category from the highlight menu no longer waits for the reading: the
+prompt opens at once and its entry is filled in when the OCR job calls
+back on the Tk thread - unless the user has already changed the text.
+Otherwise it behaves like simpledialog.askstring.
+"""
+
+import tkinter as tk
+from tkinter import simpledialog
+from typing import Callable, Optional
+
+
+class OcrPrefillDialog(simpledialog.Dialog):
+    """Modal string prompt whose entry OCR can fill in later"""
+
+    def __init__(self, parent, title: str, prompt: str, initialvalue: Optional[str],
+                 register: Callable[[Optional[Callable[[Optional[str]], None]]], None]):
+        """
+        Args:
+            register: called with fill(text) once the entry exists and with
+                None when the dialog closes
+        """
+        self.prompt = prompt
+        self.initialvalue = initialvalue or ""
+        self.register = register
+        self.entry = None
+        self.status = None
+        super().__init__(parent, title)  # returns once the dialog is closed
+
+    def body(self, master):
+        tk.Label(master, text=self.prompt, justify=tk.LEFT).grid(row=0, padx=5, sticky=tk.W)
+        self.entry = tk.Entry(master, name="entry")
+        self.entry.grid(row=1, padx=5, sticky=tk.W + tk.E)
+        self.status = tk.Label(master, text="📖 Reading highlighted text…", fg='#64748b',
+                               justify=tk.LEFT)
+        self.status.grid(row=2, padx=5, sticky=tk.W)
+        self.entry.insert(0, self.initialvalue)
+        self.entry.select_range(0, tk.END)
+        self.register(self.fill)
+        return self.entry
+
+    def fill(self, text: Optional[str]):
+        """OCR finished (Tk thread) - replace the entry unless it was edited"""
+        if self.entry is None:
+            return
+        if not text:
+            self.status.config(text="📖 No text found")
+            return
+        if self.entry.get() != self.initialvalue:
+            self.status.config(text=f"📖 Read: {text[:40]}{'…' if len(text) > 40 else ''}")
+            return
+        self.entry.delete(0, tk.END)
+        self.entry.insert(0, text)
+        self.entry.select_range(0, tk.END)
+        self.initialvalue = text
+        self.status.config(text="📖 Filled in from OCR")
+
+    def apply(self):
+        self.result = self.entry.get()
+
+    def destroy(self):
+        if self.entry is not None:
+            self.entry = None
+            self.register(None)
+        super().destroy()
+
+
+def ask_ocr_prefilled(parent, title: str, prompt: str, initialvalue: Optional[str],
+                      register) -> Optional[str]:
+    """askstring whose entry is filled in by an OCR callback - see OcrPrefillDialog"""
+    return OcrPrefillDialog(parent, title, prompt, initialvalue, register).result
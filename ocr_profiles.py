@@ -0,0 +1,144 @@
+"""
+Adaptive OCR Profiles
+Highlight OCR used to run tesseract as a uniform text block (--psm 6) at
+all four orientations, whatever was highlighted. The profile is now picked
+from the highlight itself:
+
+- layout of the glyphs found while measuring the region (lines, words,
+  glyph count) selects the page segmentation mode - a single tag such as
+  TB1-23 or K12 is read as one word with a tag character whitelist, a
+  wire number or short note as one line, anything taller as a block
+- aspect ratio of the highlight gives the expected text direction, so a
+  horizontal stroke only tries 0°/180° and a vertical one 90°/270°; only
+  blocks and near-square highlights still try all four
+
+PROFILE_STATS keeps the read rate and confidence per profile for tuning.
+"""
+
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+# Tag-like device and terminal codes - upper case, digits and separators
+TAG_WHITELIST = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-+/:."
+TAG_MAX_GLYPHS = 12
+
+# Highlights less elongated than this have no expected direction
+MIN_ASPECT = 1.5
+# Glyph centres further apart than this (x glyph size) across the text are
+# on different lines. Along it, a gap separates words when it is wider than
+# WORD_SPACING x glyph size and WORD_GAP_RATIO x the line's median gap
+# (monospaced fonts space their letters almost as wide as words)
+LINE_SPACING = 0.6
+WORD_SPACING = 0.45
+WORD_GAP_RATIO = 1.8
+
+# Expected orientation is accepted at a lower confidence than the others
+EXPECTED_ACCEPT = 60
+OTHER_ACCEPT = 70
+
+
+class OcrProfile(NamedTuple):
+    name: str
+    psm: int
+    whitelist: Optional[str]
+    orientations: Tuple[Tuple[int, int], ...]   # (angle, accept at), expected first
+
+    def describe(self) -> str:
+        angles = "/".join(f"{angle}°" for angle, _ in self.orientations)
+        whitelist = ", tag whitelist" if self.whitelist else ""
+        return f"{self.name} (psm {self.psm}{whitelist}, {angles})"
+
+
+def _orientations(angles: Tuple[int, ...]) -> Tuple[Tuple[int, int], ...]:
+    return tuple((angle, EXPECTED_ACCEPT if i == 0 else OTHER_ACCEPT)
+                 for i, angle in enumerate(angles))
+
+
+def glyph_layout(boxes: List[Tuple[int, int, int, int]], vertical: bool) -> List[int]:
+    """Words per line of the glyph boxes (x, y, w, h), lines in order across the text"""
+    if not boxes:
+        return []
+    size = sorted(max(w, h) for _, _, w, h in boxes)[len(boxes) // 2]
+    if vertical:
+        spans = [(x + w / 2, y, y + h) for x, y, w, h in boxes]
+    else:
+        spans = [(y + h / 2, x, x + w) for x, y, w, h in boxes]
+
+    lines: List[List[tuple]] = []
+    for span in sorted(spans):
+        if lines and span[0] - lines[-1][-1][0] <= LINE_SPACING * size:
+            lines[-1].append(span)
+        else:
+            lines.append([span])
+
+    words = []
+    for line in lines:
+        line.sort(key=lambda s: s[1])
+        gaps, end = [], line[0][2]
+        for _, start, stop in line[1:]:
+            gaps.append(start - end)
+            end = max(end, stop)
+        typical = sorted(gaps)[len(gaps) // 2] if gaps else 0
+        word_gap = max(WORD_SPACING * size, WORD_GAP_RATIO * typical)
+        words.append(1 + sum(gap > word_gap for gap in gaps))
+    return words
+
+
+def choose_profile(bbox_page, boxes: List[Tuple[int, int, int, int]]) -> OcrProfile:
+    """Profile for a highlight from its page bbox and the region's glyph boxes"""
+    x0, y0, x1, y1 = bbox_page
+    width, height = x1 - x0, y1 - y0
+    vertical = height > width
+    elongated = max(width, height) >= MIN_ASPECT * max(min(width, height), 1e-6)
+    expected = (90, 270) if vertical else (0, 180)
+    every = expected + ((0, 180) if vertical else (90, 270))
+
+    layout = glyph_layout(boxes, vertical) if len(boxes) >= 2 else []
+    if not layout:
+        kind, psm, whitelist, angles = "block", 6, None, every
+        hint = "no glyphs measured"
+    elif len(layout) > 1:
+        kind, psm, whitelist, angles = "block", 6, None, every
+        hint = f"{len(layout)} lines"
+    elif layout[0] == 1 and len(boxes) <= TAG_MAX_GLYPHS:
+        kind, psm, whitelist, angles = "word", 8, TAG_WHITELIST, expected
+        hint = f"1 word, {len(boxes)} glyphs"
+    else:
+        kind, psm, whitelist, angles = "line", 7, None, expected
+        hint = f"1 line, {layout[0]} words"
+    if not elongated:
+        angles = every
+        hint += ", no clear direction"
+
+    name = f"vertical-{kind}" if vertical else kind
+    profile = OcrProfile(name, psm, whitelist, _orientations(angles))
+    print(f"🎛️ OCR profile {profile.describe()} - {hint}")
+    return profile
+
+
+class ProfileStats:
+    """Runs, readings and confidence per profile (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, List[float]] = {}   # name -> [runs, read, expected angle, confidence sum]
+
+    def record(self, profile: OcrProfile, reading: Optional[dict]):
+        with self._lock:
+            entry = self._stats.setdefault(profile.name, [0, 0, 0, 0.0])
+            entry[0] += 1
+            if reading:
+                entry[1] += 1
+                entry[2] += reading['rotation'] == profile.orientations[0][0]
+                entry[3] += reading['confidence']
+
+    def format(self) -> str:
+        with self._lock:
+            parts = [f"{name} {read}/{runs} read"
+                     + (f" ({confidence / read:.0f}% avg, {expected} at expected angle)" if read else "")
+                     for name, (runs, read, expected, confidence) in sorted(self._stats.items())]
+        return ", ".join(parts) if parts else "no profiled OCR runs"
+
+
+PROFILE_STATS = ProfileStats()
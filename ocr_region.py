@@ -0,0 +1,119 @@
+"""
+OCR Region Rendering
+Highlight OCR renders just the highlighted part of the page straight from
+the PDF (fitz clip), at a zoom picked for tesseract, instead of cropping
+the on-screen raster and upscaling it 2x - so the result no longer
+depends on the zoom level the inspector happens to be using.
+
+A cheap probe render measures the glyph size (median size of the
+glyph-like connected components); the clip is then rendered so glyphs
+come out about TARGET_GLYPH_PX tall, which is where tesseract is most
+accurate. When the probe is already close enough it is used as is.
+"""
+
+from typing import List, Optional, Tuple
+
+import cv2
+import fitz  # PyMuPDF
+import numpy as np
+
+from ocr_engine import ocr_remaining
+from page_raster import pixmap_array
+
+
+PROBE_ZOOM = 2.0
+TARGET_GLYPH_PX = 32
+DEFAULT_GLYPH_PT = 7.0       # assumed when the probe finds no glyphs
+MIN_ZOOM = 1.0
+MAX_ZOOM = 8.0
+RERENDER_TOLERANCE = 0.15    # keep the probe if within 15 % of the target zoom
+MIN_GLYPH_PX = 4             # smallest component measured as a glyph on the probe
+MIN_MARK_PX = 2              # smallest component kept as punctuation
+
+# Non-local means denoising costs about this much per pixel; with less OCR
+# budget left than that, a median filter is used instead
+NL_MEANS_S_PER_PX = 0.6e-6
+
+# Padding around the highlight in page points - more across the text
+# direction, where the bbox only spans the stroke's centre line
+PAD_ALONG = 5.0
+PAD_ACROSS = 10.0
+
+
+def ocr_clip(bbox_page, page_rect) -> fitz.Rect:
+    """Padded highlight rect (displayed page coordinates) clipped to the page"""
+    x0, y0, x1, y1 = bbox_page
+    if (y1 - y0) > (x1 - x0):
+        pad_x, pad_y = PAD_ACROSS, PAD_ALONG   # vertical label
+    else:
+        pad_x, pad_y = PAD_ALONG, PAD_ACROSS
+    return fitz.Rect(x0 - pad_x, y0 - pad_y, x1 + pad_x, y1 + pad_y) & page_rect
+
+
+def render_gray(page, clip: fitz.Rect, zoom: float) -> np.ndarray:
+    """Contiguous grayscale array of a clip of the displayed page"""
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip,
+                          colorspace=fitz.csGRAY, alpha=False)
+    return np.ascontiguousarray(pixmap_array(pix)[:, :, 0])
+
+
+def denoise(binary: np.ndarray) -> np.ndarray:
+    """fastNlMeansDenoising, or a 3x3 median filter if the OCR deadline is too close"""
+    remaining = ocr_remaining()
+    if remaining is not None and remaining < binary.size * NL_MEANS_S_PER_PX:
+        print(f"⏱️ Skipping slow denoise ({remaining * 1000:.0f} ms of OCR budget left)")
+        return cv2.medianBlur(binary, 3)
+    return cv2.fastNlMeansDenoising(binary)
+
+
+def glyph_boxes(gray: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """(x, y, w, h) of the glyph-like connected components of a region.
+
+    Wires (long and thin) and frames (larger than the region's short side)
+    are ignored; glyphs cut by the region border only count when there
+    are fewer than two whole ones. Small marks (hyphens, colons, dots)
+    are kept - they hold tag codes such as TB1-23 together.
+    """
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    height, width = gray.shape
+    whole, cut = [], []
+    for i in range(1, count):
+        x, y, w, h = (int(v) for v in stats[i, :4])
+        size, thickness = max(w, h), min(w, h)
+        if not (MIN_MARK_PX <= size < min(height, width) and size <= 8 * thickness):
+            continue
+        on_border = x == 0 or y == 0 or x + w == width or y + h == height
+        (cut if on_border else whole).append((x, y, w, h))
+    return whole if len(whole) >= 2 else whole + cut
+
+
+def glyph_size_px(boxes: List[Tuple[int, int, int, int]]) -> Optional[float]:
+    """Median glyph size (longer box side, so rotated labels measure the same)"""
+    sizes = [max(w, h) for _, _, w, h in boxes if max(w, h) >= MIN_GLYPH_PX]
+    if len(sizes) < 2:
+        return None
+    return float(np.median(sizes))
+
+
+def render_ocr_region(page, clip: fitz.Rect) -> Tuple[np.ndarray, float, List[Tuple[int, int, int, int]]]:
+    """Grayscale render of clip with glyphs near TARGET_GLYPH_PX.
+
+    Returns (array, zoom, glyph boxes measured on the probe at PROBE_ZOOM).
+    """
+    probe = render_gray(page, clip, PROBE_ZOOM)
+    boxes = glyph_boxes(probe)
+    measured = glyph_size_px(boxes)
+    if measured is None:
+        zoom = TARGET_GLYPH_PX / DEFAULT_GLYPH_PT
+    else:
+        zoom = PROBE_ZOOM * TARGET_GLYPH_PX / measured
+    zoom = min(MAX_ZOOM, max(MIN_ZOOM, zoom))
+
+    if abs(zoom / PROBE_ZOOM - 1) <= RERENDER_TOLERANCE:
+        zoom, region = PROBE_ZOOM, probe
+    else:
+        region = render_gray(page, clip, zoom)
+    glyph = f"{measured / PROBE_ZOOM:.1f} pt glyphs" if measured else "no glyphs measured"
+    print(f"🔎 OCR region {region.shape[1]}x{region.shape[0]} px at zoom {zoom:.2f} ({glyph})")
+    return region, zoom, boxes
@@ -0,0 +1,339 @@
+"""
+Page Raster Cache
+Bounded, memory-budgeted LRU cache of rendered PDF page rasters.
+Shared by the Quality (CircuitInspector) and Production viewers so that
+repeat views and annotation-only redraws skip MuPDF rasterization.
+
+Render profiles: most schematics are black-and-white line art. In 'auto'
+mode a small probe render decides per page whether it is monochrome; such
+pages are rasterized in DeviceGray without alpha (one byte per pixel
+instead of three) and only promoted to RGB where a region is handed to
+OCR. The decision is cached per page.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import fitz  # PyMuPDF
+import numpy as np
+from PIL import Image
+
+from page_raster import RASTER_STATS, pixmap_array, pixmap_to_image
+
+
+# Zoom steps are quantized so 1.0000001 and 1.0 share one raster
+ZOOM_QUANTUM = 0.05
+
+# Default budget - a handful of A1 sheets at zoom 2
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 32
+
+# Monochrome probe: render this long edge, count pixels whose channels
+# differ by more than PROBE_CHROMA; above PROBE_COLOR_FRACTION it is colour
+PROBE_EDGE = 800
+PROBE_CHROMA = 24
+PROBE_COLOR_FRACTION = 0.0002
+
+
+def quantize_zoom(scale: float, quantum: float = ZOOM_QUANTUM) -> float:
+    """Snap a render scale to the cache grid"""
+    steps = max(1, int(round(scale / quantum)))
+    return round(steps * quantum, 4)
+
+
+def pdf_identity(doc) -> Tuple:
+    """Stable identity for an open PDF: path + size + mtime.
+
+    Falls back to the object id for in-memory documents.
+    """
+    path = getattr(doc, 'name', '') or ''
+    if path and os.path.exists(path):
+        st = os.stat(path)
+        return (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    return ('<memory>', id(doc))
+
+
+_content_hashes: Dict[Tuple, str] = {}
+_content_hash_lock = threading.Lock()
+
+
+def pdf_content_hash(path: str) -> str:
+    """SHA-1 of the PDF file contents - survives copies, renames and handover.
+
+    Memoized per path + size + mtime, so only the first call per file reads it.
+    """
+    st = os.stat(path)
+    identity = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _content_hash_lock:
+        cached = _content_hashes.get(identity)
+    if cached is not None:
+        return cached
+
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+    with _content_hash_lock:
+        _content_hashes[identity] = digest
+    return digest
+
+
+# Bytes per pixel PIL stores - multi-band modes are padded to 4 bytes
+_STORAGE_BYTES = {'1': 1, 'L': 1, 'P': 1, 'LA': 4, 'RGB': 4, 'RGBA': 4, 'RGBX': 4,
+                  'CMYK': 4, 'YCbCr': 4, 'I': 4, 'F': 4, 'I;16': 2}
+
+
+def image_nbytes(img: Image.Image) -> int:
+    """Approximate memory held by a PIL image"""
+    return img.width * img.height * _STORAGE_BYTES.get(img.mode, 4)
+
+
+class PageRasterCache:
+    """LRU cache of base page rasters keyed by (pdf, page, zoom, rotation)"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, disk_cache=None,
+                 render_profile: str = 'auto'):
+        """
+        Args:
+            disk_cache: optional content_cache.ContentCache consulted before
+                        rendering a full page and fed with new renders
+            render_profile: 'auto' (probe each page), 'gray' or 'rgb'
+        """
+        self.max_bytes = max_bytes
+        self.disk_cache = disk_cache
+        self.render_profile = render_profile
+        # (pdf identity, page) -> 'gray' or 'rgb'
+        self._profiles: Dict[Tuple, str] = {}
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Image.Image]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prefetched = 0
+        self.render_time = 0.0
+        # Shared with the background prefetcher
+        self._lock = threading.RLock()
+
+    # ================================================================
+    # KEYS
+    # ================================================================
+
+    def make_key(self, doc, page_number: int, scale: float) -> Tuple:
+        """Build the cache key for a page at a given render scale"""
+        page = doc[page_number]
+        return (pdf_identity(doc), page_number, quantize_zoom(scale), page.rotation)
+
+    # ================================================================
+    # LRU OPERATIONS
+    # ================================================================
+
+    def get(self, key: Tuple) -> Optional[Image.Image]:
+        """Return cached raster (and mark as recently used) or None"""
+        with self._lock:
+            img = self._entries.get(key)
+            if img is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return img
+
+    def peek(self, key: Tuple) -> Optional[Image.Image]:
+        """Cached raster or None, without touching LRU order or statistics"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def contains(self, key: Tuple) -> bool:
+        """Membership test that does not touch LRU order or statistics"""
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key: Tuple, img: Image.Image):
+        """Insert a raster, evicting least recently used entries over budget"""
+        size = image_nbytes(img)
+        if size > self.max_bytes:
+            # Larger than the whole budget - never cache
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= image_nbytes(old)
+
+            self._entries[key] = img
+            self._bytes += size
+
+            while self._entries and (self._bytes > self.max_bytes or
+                                     len(self._entries) > self.max_entries):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= image_nbytes(evicted)
+                self.evictions += 1
+
+    def invalidate(self, doc=None, page_number: Optional[int] = None):
+        """Drop all rasters and render profiles, those of one PDF, or of one of its pages"""
+        with self._lock:
+            if doc is None:
+                self._entries.clear()
+                self._bytes = 0
+                self._profiles.clear()
+                return
+
+            identity = pdf_identity(doc)
+
+            def matches(key):
+                return key[0] == identity and (page_number is None or key[1] == page_number)
+
+            for key in [k for k in self._entries if matches(k)]:
+                self._bytes -= image_nbytes(self._entries.pop(key))
+            for key in [k for k in self._profiles if matches(k)]:
+                del self._profiles[key]
+
+    # ================================================================
+    # RENDER PROFILE
+    # ================================================================
+
+    def page_profile(self, doc, page_number: int) -> str:
+        """'gray' or 'rgb' for a page - probed once per page in auto mode"""
+        if self.render_profile != 'auto':
+            return self.render_profile
+
+        key = (pdf_identity(doc), page_number)
+        with self._lock:
+            profile = self._profiles.get(key)
+        if profile is not None:
+            return profile
+
+        start = time.perf_counter()
+        page = doc[page_number]
+        zoom = PROBE_EDGE / max(page.rect.width, page.rect.height, 1)
+        arr = pixmap_array(page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False))
+        chroma = arr.max(axis=2).astype(np.int16) - arr.min(axis=2)
+        colored = np.count_nonzero(chroma > PROBE_CHROMA) / max(1, chroma.size)
+        profile = 'rgb' if colored > PROBE_COLOR_FRACTION else 'gray'
+
+        with self._lock:
+            self._profiles[key] = profile
+        print(f"🎨 Page {page_number + 1}: {profile} profile "
+              f"({colored * 100:.3f}% colour, probe {(time.perf_counter() - start) * 1000:.0f} ms)")
+        return profile
+
+    def _pixmap(self, doc, page_number: int, zoom: float, clip=None):
+        """Render with the page's profile - gray pages skip two of three channels"""
+        colorspace = fitz.csGRAY if self.page_profile(doc, page_number) == 'gray' else fitz.csRGB
+        return doc[page_number].get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip,
+                                           colorspace=colorspace, alpha=False)
+
+    # ================================================================
+    # RENDERING
+    # ================================================================
+
+    def get_page_image(self, doc, page_number: int, scale: float) -> Image.Image:
+        """Return the base raster for a page, rendering only on a cache miss.
+
+        The returned image is shared with the cache - callers must copy it
+        before drawing on it.
+        """
+        key = self.make_key(doc, page_number, scale)
+        img = self.get(key)
+        if img is not None:
+            return img
+
+        img, elapsed, from_disk = self._render(doc, page_number, key)
+        print(f"🖼️ {'Loaded' if from_disk else 'Rendered'} page {page_number + 1} @ {key[2]:.2f}x "
+              f"in {elapsed * 1000:.0f} ms "
+              f"({self.format_stats()})")
+        return img
+
+    def ensure_page(self, doc, page_number: int, scale: float) -> bool:
+        """Render a page into the cache if it is not there yet (prefetch path).
+
+        Returns True if a render was performed.
+        """
+        key = self.make_key(doc, page_number, scale)
+        if self.contains(key):
+            return False
+        self._render(doc, page_number, key)
+        with self._lock:
+            self.prefetched += 1
+        return True
+
+    def get_tile_image(self, doc, page_number: int, scale: float,
+                       tile_x: int, tile_y: int, tile_size: int) -> Image.Image:
+        """Return one tile of a page raster, rendered with a fitz clip rect.
+
+        The tile's pixel origin within the full page raster is stored in
+        img.info['origin'].
+        """
+        key = self.make_key(doc, page_number, scale) + ('tile', tile_x, tile_y, tile_size)
+        img = self.get(key)
+        if img is not None:
+            return img
+
+        start = time.perf_counter()
+        zoom = key[2]
+        clip = fitz.Rect(tile_x * tile_size, tile_y * tile_size,
+                         (tile_x + 1) * tile_size, (tile_y + 1) * tile_size) / zoom
+        pix = self._pixmap(doc, page_number, zoom, clip=clip)
+        img = pixmap_to_image(pix)
+        img.info['origin'] = (pix.x, pix.y)
+
+        with self._lock:
+            self.render_time += time.perf_counter() - start
+        self.put(key, img)
+        return img
+
+    def _render(self, doc, page_number: int, key: Tuple):
+        start = time.perf_counter()
+        zoom = key[2]
+        img = None
+        if self.disk_cache is not None:
+            profile = self.page_profile(doc, page_number)
+            img = self.disk_cache.get_page_raster(doc, page_number, zoom, profile)
+        from_disk = img is not None
+        if img is None:
+            pix = self._pixmap(doc, page_number, zoom)
+            img = pixmap_to_image(pix)
+            del pix  # release the MuPDF buffer before the cache may evict
+            # Simple sheets rasterize faster than a PNG decodes - only keep the slow ones
+            if (self.disk_cache is not None and
+                    time.perf_counter() - start >= self.disk_cache.MIN_RENDER_S):
+                self.disk_cache.put_page_raster(doc, page_number, zoom, profile, img)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.render_time += elapsed
+        self.put(key, img)
+        return img, elapsed, from_disk
+
+    # ================================================================
+    # STATISTICS
+    # ================================================================
+
+    def stats(self) -> Dict:
+        """Hit/miss statistics for instrumentation"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / lookups) if lookups else 0.0,
+            'evictions': self.evictions,
+            'prefetched': self.prefetched,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'render_time_s': self.render_time,
+        }
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        return (f"cache: {s['hits']} hits / {s['misses']} misses "
+                f"({s['hit_rate'] * 100:.0f}%), {s['entries']} pages, "
+                f"{s['bytes'] / (1024 * 1024):.1f} MB; {RASTER_STATS.format()}"
+                + (f"; {self.disk_cache.format_stats()}" if self.disk_cache is not None else ""))
@@ -0,0 +1,118 @@
+"""
+Background Page Prefetcher
+Renders neighbouring pages (N-1, N+1 and any explicitly requested page,
+e.g. the next punch in production mode) into the PageRasterCache on a
+worker thread, so page turns become cache hits instead of waiting on
+MuPDF rasterization on the Tk thread.
+
+The worker keeps its own fitz document handle - PyMuPDF documents must
+not be shared across threads.
+"""
+
+import queue
+import threading
+import time
+from typing import Iterable, Optional
+
+import fitz  # PyMuPDF
+
+from page_cache import PageRasterCache, quantize_zoom
+
+
+class PagePrefetcher:
+    """Cancellable background renderer feeding a PageRasterCache"""
+
+    # Let the UI settle before competing with it for the interpreter
+    IDLE_DELAY = 0.15
+
+    def __init__(self, cache: PageRasterCache):
+        self.cache = cache
+        self._jobs = queue.Queue()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._doc = None
+        self._doc_path = None
+        self._thread = threading.Thread(target=self._run, name="page-prefetch", daemon=True)
+        self._thread.start()
+
+    # ================================================================
+    # PUBLIC API (Tk thread)
+    # ================================================================
+
+    def request(self, doc, current_page: int, scale: float, extra_pages: Iterable[int] = (),
+                include_current: bool = False) -> bool:
+        """Queue N+1, N-1 and extra_pages for rendering at the given scale.
+
+        With include_current the current page is rendered first (sharp
+        re-render after an interim zoom). Any work queued by an earlier
+        request is cancelled. Returns False if nothing could be queued.
+        """
+        path = getattr(doc, 'name', '') or ''
+        if not path:
+            return False  # In-memory document - nothing the worker can reopen
+
+        page_count = len(doc)
+        pages = [current_page] if include_current else []
+        for p in list(extra_pages) + [current_page + 1, current_page - 1]:
+            if 0 <= p < page_count and p != current_page and p not in pages:
+                pages.append(p)
+        if not pages:
+            return False
+
+        generation = self.cancel()
+        self._jobs.put((generation, path, pages, quantize_zoom(scale),
+                        0.0 if include_current else self.IDLE_DELAY))
+        return True
+
+    def cancel(self) -> int:
+        """Cancel all pending work (zoom change, new PDF). Returns the new generation."""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        try:
+            while True:
+                self._jobs.get_nowait()
+        except queue.Empty:
+            pass
+        return generation
+
+    # ================================================================
+    # WORKER
+    # ================================================================
+
+    def _is_current(self, generation: int) -> bool:
+        with self._lock:
+            return generation == self._generation
+
+    def _open(self, path: str) -> Optional[fitz.Document]:
+        if self._doc_path != path:
+            if self._doc is not None:
+                self._doc.close()
+            self._doc = None
+            self._doc_path = None
+            try:
+                self._doc = fitz.open(path)
+                self._doc_path = path
+            except Exception as e:
+                print(f"⚠️ Prefetch could not open {path}: {e}")
+        return self._doc
+
+    def _run(self):
+        while True:
+            generation, path, pages, scale, delay = self._jobs.get()
+            time.sleep(delay)
+            if not self._is_current(generation):
+                continue
+
+            doc = self._open(path)
+            if doc is None:
+                continue
+
+            for page_number in pages:
+                if not self._is_current(generation):
+                    break
+                try:
+                    if self.cache.ensure_page(doc, page_number, scale):
+                        print(f"⏩ Prefetched page {page_number + 1} @ {scale:.2f}x")
+                except Exception as e:
+                    print(f"⚠️ Prefetch failed for page {page_number + 1}: {e}")
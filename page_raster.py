@@ -0,0 +1,113 @@
+"""
+Page Raster Helpers
+Shared pixmap -> PIL / NumPy conversion for every page render.
+
+MuPDF's sample buffer is wrapped directly (pix.samples_mv) instead of
+going through pix.samples (a full bytes copy) or a PNG encode/decode
+round trip. NumPy arrays are zero-copy views that keep their pixmap
+alive. RASTER_STATS counts the copies avoided and bytes saved so the
+effect is measurable in the render log.
+"""
+
+import threading
+
+import fitz  # PyMuPDF
+import numpy as np
+from PIL import Image
+
+
+_MODES = {1: 'L', 3: 'RGB', 4: 'RGBA'}
+# Modes PIL maps onto the source buffer instead of decoding a copy
+_SHARED_MODES = ('L', 'RGBA')
+
+
+class RasterStats:
+    """Thread-safe counters for the render pipeline"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.bytes_rendered = 0
+        self.copies_avoided = 0
+        self.bytes_saved = 0
+
+    def record(self, rendered: int = 0, copies_avoided: int = 0, bytes_saved: int = 0):
+        with self._lock:
+            if rendered:
+                self.renders += 1
+                self.bytes_rendered += rendered
+            self.copies_avoided += copies_avoided
+            self.bytes_saved += bytes_saved
+
+    def format(self) -> str:
+        return (f"{self.renders} renders, {self.copies_avoided} copies avoided, "
+                f"{self.bytes_saved / (1024 * 1024):.1f} MB not copied")
+
+
+RASTER_STATS = RasterStats()
+
+
+class _PixmapArray(np.ndarray):
+    """ndarray view over a pixmap's samples - holds the pixmap so the buffer stays valid"""
+    _pixmap = None
+
+
+def pixmap_nbytes(pix) -> int:
+    return pix.stride * pix.height
+
+
+def pixmap_array(pix) -> np.ndarray:
+    """(height, width, n) uint8 view of the pixmap samples - no copy"""
+    buf = np.frombuffer(pix.samples_mv, dtype=np.uint8)
+    arr = buf.reshape(pix.height, pix.stride)[:, :pix.width * pix.n]
+    arr = arr.reshape(pix.height, pix.width, pix.n).view(_PixmapArray)
+    arr._pixmap = pix
+    # Saved: the pix.samples bytes copy
+    RASTER_STATS.record(rendered=pixmap_nbytes(pix), copies_avoided=1,
+                        bytes_saved=pixmap_nbytes(pix))
+    return arr
+
+
+def pixmap_to_image(pix) -> Image.Image:
+    """PIL image decoded straight from the pixmap buffer.
+
+    PIL stores RGB as 4 bytes per pixel, so this is the one unavoidable
+    copy; the intermediate pix.samples bytes object is skipped. Gray (L)
+    images would map the buffer instead of copying it, which must not
+    outlive the pixmap - they share one Python-owned copy of the samples.
+    """
+    mode = _MODES[pix.n]
+    if mode in _SHARED_MODES:
+        img = Image.frombuffer(mode, (pix.width, pix.height), pix.samples,
+                               'raw', mode, pix.stride, 1)
+        RASTER_STATS.record(rendered=pixmap_nbytes(pix))
+        return img
+    img = Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv,
+                           'raw', mode, pix.stride, 1)
+    RASTER_STATS.record(rendered=pixmap_nbytes(pix), copies_avoided=1,
+                        bytes_saved=pixmap_nbytes(pix))
+    return img
+
+
+def render_image(page, zoom: float, clip=None) -> Image.Image:
+    """Render a page (or clip of it) at zoom straight into a PIL image"""
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip)
+    img = pixmap_to_image(pix)
+    img.info['origin'] = (pix.x, pix.y)
+    return img
+
+
+def render_array(page, zoom: float, clip=None) -> np.ndarray:
+    """Render a page (or clip of it) at zoom as a zero-copy NumPy view"""
+    return pixmap_array(page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip))
+
+
+def image_region(img: Image.Image, x1: int, y1: int, x2: int, y2: int) -> np.ndarray:
+    """RGB array of one region of a page image - copies only that region.
+
+    Gray-profile pages are promoted to RGB here, for the region only.
+    """
+    region = img.crop((x1, y1, x2, y2))
+    if region.mode != 'RGB':
+        region = region.convert('RGB')
+    return np.asarray(region)
@@ -0,0 +1,295 @@
+"""
+Continuous Scroll View
+Shows the whole drawing set as one vertical strip of pages. Only pages
+intersecting the viewport are rasterized and kept on the canvas; pages in
+the prefetch margin are rendered by the background prefetcher, and pages
+that leave the margin drop their PhotoImage and canvas items (the raster
+stays in the PageRasterCache LRU).
+
+The *anchor* page - the viewer's current page - is always laid out at
+canvas origin (0, 0). All existing single-page code (capture, display
+<-> page coordinates, OCR crops, the viewer's annotation layer) therefore
+keeps working unchanged for it. When another page becomes current, the
+strip is shifted so that page sits at the origin and the view is scrolled
+by the same amount, so nothing moves on screen.
+"""
+
+import bisect
+import tkinter as tk
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageTk
+
+from page_cache import PageRasterCache
+from page_prefetch import PagePrefetcher
+from page_tiles import page_display_size
+
+
+PAGE_GAP = 16             # display pixels between pages
+PREFETCH_MARGIN = 1.0     # viewport heights rendered ahead above and below
+
+
+class ContinuousPageView:
+    """Virtualized vertical strip of pages around an anchor page"""
+
+    TAG = 'cpage'
+
+    def __init__(self, canvas, cache: PageRasterCache, prefetcher: PagePrefetcher,
+                 layer_factory: Callable[[], object],
+                 annotations_fn: Callable[[int], List[dict]],
+                 on_page_change: Callable[[int], None]):
+        """
+        Args:
+            layer_factory: new annotation layer (same kind as the viewer's own)
+            annotations_fn: page index -> annotations on that page
+            on_page_change: called with the page at the viewport centre when
+                            scrolling moves it away from the anchor page
+        """
+        self.canvas = canvas
+        self.cache = cache
+        self.prefetcher = prefetcher
+        self.layer_factory = layer_factory
+        self.annotations_fn = annotations_fn
+        self.on_page_change = on_page_change
+
+        self.active = False
+        self.doc = None
+        self.scale = None
+        self.zoom_level = 1.0
+        self.anchor = 0
+        self._tops: List[int] = []     # absolute top of every page at self.scale
+        self._sizes: List[Tuple[int, int]] = []
+        self._width = 0
+        # page -> (canvas item, PhotoImage, annotation layer or None for the anchor page)
+        self._pages: Dict[int, Tuple[int, ImageTk.PhotoImage, Optional[object]]] = {}
+        self._update_pending = False
+        self._held_point: Optional[Tuple[float, float]] = None
+
+        canvas.bind("<MouseWheel>", self._on_wheel, add='+')
+        canvas.bind("<Button-4>", lambda e: self._scroll(-3), add='+')
+        canvas.bind("<Button-5>", lambda e: self._scroll(3), add='+')
+
+    # ================================================================
+    # PUBLIC API
+    # ================================================================
+
+    def show(self, doc, page_number: int, scale: float, zoom_level: float = 1.0) -> Image.Image:
+        """Lay out / re-anchor the strip on page_number and return its base raster.
+
+        Scrolling onto a page keeps the view still; a jump (buttons,
+        thumbnails) scrolls the page's top into view.
+        """
+        relayout = (not self.active or doc is not self.doc or scale != self.scale)
+        jump = not relayout and page_number != self.page_at_center()
+        point, self._held_point = self._held_point, None
+
+        if relayout:
+            # Keep the held point still on screen across a zoom change - or
+            # without one, the same relative position in the page
+            fraction = held = None
+            old_scale = self.scale
+            if self.active and doc is self.doc and page_number == self.anchor and self._sizes:
+                if point is not None:
+                    held = self._point_in_page(point)
+                else:
+                    fraction = self.canvas.canvasy(0) / max(1, self._sizes[self.anchor][1])
+            self.release_all()
+            self._layout(doc, scale)
+            self.zoom_level = zoom_level
+            self.active = True
+            self.anchor = page_number
+            self._set_scrollregion()
+            if held is not None:
+                self._scroll_point_to(held, scale / old_scale)
+            else:
+                self._scroll_to(0 if fraction is None else fraction * self._sizes[page_number][1])
+        elif page_number != self.anchor:
+            self._rebase(page_number)
+            if jump:
+                self._scroll_to(0)
+
+        self.update_viewport()
+        return self.cache.get_page_image(self.doc, page_number, self.scale)
+
+    def hold_point(self, point: Optional[Tuple[float, float]]):
+        """Keep canvas point (x, y) - the zoom cursor - at its screen position
+        across the next zoom re-layout"""
+        self._held_point = point
+
+    def deactivate(self):
+        """Leave continuous mode - drop every item the strip owns"""
+        self.release_all()
+        self.active = False
+        self.doc = None
+        self.scale = None
+
+    def release_all(self):
+        for page in list(self._pages):
+            self._release(page)
+
+    def page_at(self, canvas_y: float) -> int:
+        """Page under a canvas y coordinate (gaps belong to the page above)"""
+        if not self._tops:
+            return 0
+        absolute = canvas_y + self._tops[self.anchor]
+        return max(0, min(len(self._tops) - 1, bisect.bisect_right(self._tops, absolute) - 1))
+
+    def page_at_center(self) -> int:
+        return self.page_at(self.canvas.canvasy(self.canvas.winfo_height() / 2))
+
+    def page_origin(self, page_number: int) -> Tuple[int, int]:
+        """Canvas position of a page's top-left corner"""
+        return (0, self._tops[page_number] - self._tops[self.anchor])
+
+    def sync_annotations(self):
+        """Bring the neighbouring pages' annotation layers up to date (undo, reload)"""
+        for page, (_, _, layer) in self._pages.items():
+            if layer is not None:
+                layer.sync(self.annotations_fn(page))
+
+    def schedule_update(self):
+        """Scroll callback - coalesce viewport updates to one per idle cycle"""
+        if self.active and not self._update_pending:
+            self._update_pending = True
+            self.canvas.after_idle(self._run_update)
+
+    def update_viewport(self):
+        """Draw pages entering the viewport, release those far outside it"""
+        if not self.active:
+            return
+        visible, margin = self._wanted_pages()
+
+        for page in [p for p in self._pages if p not in margin]:
+            self._release(page)
+
+        to_prefetch = []
+        for page in margin:
+            if page in self._pages:
+                continue
+            key = self.cache.make_key(self.doc, page, self.scale)
+            if page in visible or self.cache.contains(key):
+                self._draw_page(page)
+            else:
+                to_prefetch.append(page)
+        if to_prefetch:
+            self.prefetcher.request(self.doc, self.anchor, self.scale, extra_pages=to_prefetch)
+
+        self.canvas.tag_lower(self.TAG)
+
+    # ================================================================
+    # LAYOUT
+    # ================================================================
+
+    def _layout(self, doc, scale: float):
+        self.doc = doc
+        self.scale = scale
+        self._sizes = [page_display_size(doc, i, scale) for i in range(len(doc))]
+        self._tops = []
+        y = 0
+        for _, height in self._sizes:
+            self._tops.append(y)
+            y += height + PAGE_GAP
+        self._width = max((w for w, _ in self._sizes), default=0)
+
+    def _set_scrollregion(self):
+        top = -self._tops[self.anchor]
+        bottom = self._tops[-1] + self._sizes[-1][1] - self._tops[self.anchor]
+        self.canvas.config(scrollregion=(0, top, self._width, bottom))
+
+    def _scroll_to(self, canvas_y: float):
+        """Put canvas_y at the top of the viewport"""
+        region_top = -self._tops[self.anchor]
+        total = self._tops[-1] + self._sizes[-1][1]
+        self.canvas.yview_moveto((canvas_y - region_top) / max(1, total))
+
+    def _point_in_page(self, point: Tuple[float, float]) -> Tuple[int, float, float, float, float]:
+        """(page, y into the page, x, viewport x, viewport y) of a canvas point"""
+        x, y = point
+        page = self.page_at(y)
+        return (page, y - self.page_origin(page)[1], x,
+                x - self.canvas.canvasx(0), y - self.canvas.canvasy(0))
+
+    def _scroll_point_to(self, held: Tuple[int, float, float, float, float], ratio: float):
+        """Scroll the re-laid-out strip so a _point_in_page result is back at its viewport position"""
+        page, page_y, x, view_x, view_y = held
+        self._scroll_to(self.page_origin(page)[1] + page_y * ratio - view_y)
+        self.canvas.xview_moveto(max(0.0, x * ratio - view_x) / max(1, self._width))
+
+    def _rebase(self, page_number: int):
+        """Move the strip so page_number sits at the canvas origin"""
+        view_top = self.canvas.canvasy(0)
+        delta = self._tops[self.anchor] - self._tops[page_number]
+        self.canvas.move(self.TAG, 0, delta)
+        self.canvas.move('annotation', 0, delta)
+
+        # The old anchor's annotations belong to the viewer's layer - hand
+        # them to a layer of their own; the new anchor gives its layer up
+        old_anchor = self.anchor
+        self.anchor = page_number
+        entry = self._pages.get(page_number)
+        if entry is not None and entry[2] is not None:
+            entry[2].clear()
+            self._pages[page_number] = (entry[0], entry[1], None)
+        for page, (_, _, layer) in self._pages.items():
+            if layer is not None:
+                layer.origin = self.page_origin(page)
+        entry = self._pages.get(old_anchor)
+        if entry is not None:
+            self._pages[old_anchor] = (entry[0], entry[1], self._new_layer(old_anchor))
+
+        self._set_scrollregion()
+        self._scroll_to(view_top + delta)
+
+    def _wanted_pages(self) -> Tuple[range, range]:
+        """(pages in the viewport, pages within the prefetch margin)"""
+        height = max(1, self.canvas.winfo_height())
+        top = self.canvas.canvasy(0)
+        margin = height * PREFETCH_MARGIN
+        first, last = self.page_at(top), self.page_at(top + height)
+        m_first, m_last = self.page_at(top - margin), self.page_at(top + height + margin)
+        return range(first, last + 1), range(m_first, m_last + 1)
+
+    # ================================================================
+    # PAGES
+    # ================================================================
+
+    def _draw_page(self, page: int):
+        img = self.cache.get_page_image(self.doc, page, self.scale)
+        photo = ImageTk.PhotoImage(img)
+        x, y = self.page_origin(page)
+        item = self.canvas.create_image(x, y, anchor=tk.NW, image=photo,
+                                        tags=(self.TAG, 'page_base', f'{self.TAG}_{page}'))
+        layer = self._new_layer(page) if page != self.anchor else None
+        self._pages[page] = (item, photo, layer)
+
+    def _new_layer(self, page: int):
+        layer = self.layer_factory()
+        layer.origin = self.page_origin(page)
+        layer.rebuild(self.annotations_fn(page), self.scale, self.zoom_level)
+        return layer
+
+    def _release(self, page: int):
+        item, _, layer = self._pages.pop(page)
+        self.canvas.delete(item)
+        if layer is not None:
+            layer.clear()
+
+    # ================================================================
+    # SCROLLING
+    # ================================================================
+
+    def _run_update(self):
+        self._update_pending = False
+        if not self.active:
+            return
+        self.update_viewport()
+        center = self.page_at_center()
+        if center != self.anchor:
+            self.on_page_change(center)
+
+    def _on_wheel(self, event):
+        self._scroll(-3 if event.delta > 0 else 3)
+
+    def _scroll(self, units: int):
+        if self.active:
+            self.canvas.yview_scroll(units, "units")
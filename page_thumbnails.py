@@ -0,0 +1,357 @@
+"""
+Page Thumbnail Sidebar
+Virtualized strip of page thumbnails for 40-120 page drawing sets.
+
+Thumbnails are rendered at low resolution on a worker thread (own fitz
+document, like the prefetcher) and stored on disk in the cabinet's
+Thumbnails folder next to Sessions, keyed by the PDF content hash, so
+reopening a cabinet - or the production side after handover - loads them
+from disk instead of rasterizing again.
+
+Only the rows inside the visible part of the strip have canvas items and
+PhotoImages; scrolling creates and drops them. Each row carries a badge
+with the page's punch count (orange while any punch is not implemented).
+"""
+
+import os
+import queue
+import threading
+import time
+import tkinter as tk
+from typing import Callable, Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageTk
+
+from page_cache import pdf_content_hash
+from page_raster import render_image
+
+
+THUMB_WIDTH = 120          # pixels - pages are rendered to fit THUMB_WIDTH x THUMB_HEIGHT
+THUMB_HEIGHT = 160
+ROW_PADDING = 8
+ROW_HEIGHT = THUMB_HEIGHT + 2 * ROW_PADDING + 16  # thumbnail + page number
+POLL_MS = 50               # how often the Tk thread collects finished thumbnails
+THUMBNAILS_FOLDER = "Thumbnails"
+
+
+def thumbnail_cache_dir(sessions_dir: str) -> Optional[str]:
+    """Thumbnails folder next to a cabinet's Sessions folder"""
+    if not sessions_dir:
+        return None
+    return os.path.join(os.path.dirname(os.path.normpath(sessions_dir)), THUMBNAILS_FOLDER)
+
+
+class ThumbnailSidebar:
+    """Scrollable, lazily populated page thumbnail strip"""
+
+    TAG = 'thumb'
+
+    def __init__(self, parent, on_select: Callable[[int], None],
+                 badge_fn: Callable[[int], Tuple[int, int]]):
+        """
+        Args:
+            parent: container the strip is packed into (left of the page canvas)
+            on_select: called with a page index when a thumbnail is clicked
+            badge_fn: page index -> (punches, not yet implemented)
+        """
+        self.on_select = on_select
+        self.badge_fn = badge_fn
+
+        self.frame = tk.Frame(parent, bg='#1e293b', width=THUMB_WIDTH + 2 * ROW_PADDING + 16)
+        self.frame.pack_propagate(False)
+        scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas = tk.Canvas(self.frame, bg='#1e293b', highlightthickness=0,
+                                yscrollincrement=ROW_HEIGHT // 4,
+                                yscrollcommand=lambda *a: self._on_scrolled(scrollbar, *a))
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.canvas.yview)
+        self.canvas.bind("<Configure>", lambda e: self._refresh_rows())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+
+        self.visible = True
+        self.page_count = 0
+        self.current_page = 0
+        self.cache_dir: Optional[str] = None
+        self._path = None
+        self._images: Dict[int, Image.Image] = {}  # page -> thumbnail (all pages, small)
+        self._rows: Dict[int, Tuple[list, Optional[ImageTk.PhotoImage]]] = {}  # visible rows only
+        self._after_id = None
+        self._started_at = 0.0
+        self.disk_hits = 0
+        self.rendered = 0
+
+        self._results = queue.Queue()
+        self._jobs = queue.Queue()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="page-thumbnails", daemon=True)
+        self._thread.start()
+
+    # ================================================================
+    # PUBLIC API (Tk thread)
+    # ================================================================
+
+    def show(self, doc, current_page: int, cache_dir: Optional[str] = None):
+        """Sync the strip with the viewer - call from display_page.
+
+        A different PDF (or a cache folder that just became known) starts
+        the background loader; otherwise only the current-page frame and
+        the badges of the visible rows are refreshed.
+        """
+        if doc is None:
+            self.clear()
+            return
+
+        path = getattr(doc, 'name', '') or ''
+        if path != self._path or len(doc) != self.page_count:
+            self.clear()
+            self._path = path
+            self.page_count = len(doc)
+            self.cache_dir = cache_dir
+            self.current_page = current_page
+            self.canvas.config(scrollregion=(0, 0, 1, self.page_count * ROW_HEIGHT))
+            self._start_loading()
+        elif cache_dir and cache_dir != self.cache_dir:
+            # Project folders were created after the first display - persist what we have
+            self.cache_dir = cache_dir
+            self._start_loading()
+
+        self.current_page = current_page
+        self._scroll_into_view(current_page)
+        self._refresh_rows(force=True)
+
+    def refresh_badges(self):
+        """Redraw the visible rows (punch logged / implemented)"""
+        self._refresh_rows(force=True)
+
+    def set_visible(self, visible: bool):
+        if visible == self.visible:
+            return
+        self.visible = visible
+        if visible:
+            self.frame.pack(side=tk.LEFT, fill=tk.Y, before=self.frame.master.pack_slaves()[0])
+            self._refresh_rows(force=True)
+        else:
+            self.frame.pack_forget()
+
+    def clear(self):
+        self.cancel()
+        self.canvas.delete("all")
+        self._rows.clear()
+        self._images.clear()
+        self._path = None
+        self.page_count = 0
+
+    def cancel(self) -> int:
+        """Stop the background loader (new PDF, app close)"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        try:
+            while True:
+                self._jobs.get_nowait()
+        except queue.Empty:
+            pass
+        if self._after_id is not None:
+            try:
+                self.canvas.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        return generation
+
+    # ================================================================
+    # VIRTUALIZED ROWS
+    # ================================================================
+
+    def _visible_range(self) -> range:
+        if not self.page_count:
+            return range(0)
+        top = self.canvas.canvasy(0)
+        height = max(1, self.canvas.winfo_height())
+        first = max(0, int(top // ROW_HEIGHT) - 1)
+        last = min(self.page_count, int((top + height) // ROW_HEIGHT) + 2)
+        return range(first, last)
+
+    def _refresh_rows(self, force: bool = False):
+        if not self.visible:
+            return
+        wanted = self._visible_range()
+        for page in [p for p in self._rows if p not in wanted]:
+            self._drop_row(page)
+        for page in wanted:
+            if force or page not in self._rows:
+                self._draw_row(page)
+
+    def _drop_row(self, page: int):
+        items, _ = self._rows.pop(page)
+        for item in items:
+            self.canvas.delete(item)
+
+    def _draw_row(self, page: int):
+        if page in self._rows:
+            self._drop_row(page)
+
+        y = page * ROW_HEIGHT + ROW_PADDING
+        box_w, box_h = THUMB_WIDTH, THUMB_HEIGHT
+        items = []
+        photo = None
+
+        img = self._images.get(page)
+        if img is not None:
+            box_w, box_h = img.width, img.height
+        x = ROW_PADDING + (THUMB_WIDTH - box_w) // 2
+        if img is not None:
+            photo = ImageTk.PhotoImage(img)
+            items.append(self.canvas.create_image(x, y, anchor=tk.NW, image=photo, tags=self.TAG))
+        else:
+            # Placeholder until the worker delivers the thumbnail
+            items.append(self.canvas.create_rectangle(x, y, x + box_w, y + box_h,
+                                                      fill='#334155', outline='', tags=self.TAG))
+
+        current = page == self.current_page
+        items.append(self.canvas.create_rectangle(
+            x - 2, y - 2, x + box_w + 2, y + box_h + 2,
+            outline='#3b82f6' if current else '#475569', width=3 if current else 1, tags=self.TAG))
+        items.append(self.canvas.create_text(
+            ROW_PADDING + THUMB_WIDTH / 2, y + box_h + 10, text=str(page + 1),
+            fill='white' if current else '#94a3b8', font=('Segoe UI', 9, 'bold'), tags=self.TAG))
+
+        punches, not_implemented = self.badge_fn(page)
+        if punches:
+            bx, by = x + box_w - 12, y + 12
+            color = '#f97316' if not_implemented else '#10b981'
+            items.append(self.canvas.create_oval(bx - 11, by - 11, bx + 11, by + 11,
+                                                 fill=color, outline='white', tags=self.TAG))
+            items.append(self.canvas.create_text(bx, by, text=str(punches), fill='white',
+                                                 font=('Segoe UI', 8, 'bold'), tags=self.TAG))
+
+        self._rows[page] = (items, photo)
+
+    def _scroll_into_view(self, page: int):
+        if not self.page_count:
+            return
+        top = self.canvas.canvasy(0)
+        height = max(1, self.canvas.winfo_height())
+        y0 = page * ROW_HEIGHT
+        if y0 < top or y0 + ROW_HEIGHT > top + height:
+            target = max(0, y0 - (height - ROW_HEIGHT) / 2)
+            self.canvas.yview_moveto(target / (self.page_count * ROW_HEIGHT))
+
+    def _on_scrolled(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        self._refresh_rows()
+
+    def _on_wheel(self, event):
+        self.canvas.yview_scroll(-2 if event.delta > 0 else 2, "units")
+
+    def _on_click(self, event):
+        page = int(self.canvas.canvasy(event.y) // ROW_HEIGHT)
+        if 0 <= page < self.page_count and page != self.current_page:
+            self.on_select(page)
+
+    # ================================================================
+    # BACKGROUND LOADING
+    # ================================================================
+
+    def _start_loading(self):
+        if not self._path:
+            return  # In-memory document - nothing the worker can reopen
+        generation = self.cancel()
+        # Current page outward, so the visible rows fill in first
+        order = sorted(range(self.page_count), key=lambda p: abs(p - self.current_page))
+        with self._lock:
+            have = dict(self._images)
+        self._started_at = time.perf_counter()
+        self.disk_hits = 0
+        self.rendered = 0
+        self._jobs.put((generation, self._path, order, self.cache_dir, have))
+        self._after_id = self.canvas.after(POLL_MS, self._poll)
+
+    def _poll(self):
+        self._after_id = None
+        changed = False
+        done = False
+        try:
+            while True:
+                generation, page, img = self._results.get_nowait()
+                if generation != self._generation:
+                    continue
+                if page is None:
+                    done = True
+                    continue
+                self._images[page] = img
+                if page in self._rows:
+                    self._draw_row(page)
+                changed = True
+        except queue.Empty:
+            pass
+
+        if done:
+            print(f"🖼️ Thumbnails ready in {(time.perf_counter() - self._started_at) * 1000:.0f} ms "
+                  f"({self.disk_hits} from disk, {self.rendered} rendered)")
+        else:
+            self._after_id = self.canvas.after(POLL_MS if changed else POLL_MS * 2, self._poll)
+
+    def _is_current(self, generation: int) -> bool:
+        with self._lock:
+            return generation == self._generation
+
+    def _run(self):
+        while True:
+            generation, path, order, cache_dir, have = self._jobs.get()
+            if not self._is_current(generation):
+                continue
+            try:
+                self._load(generation, path, order, cache_dir, have)
+            except Exception as e:
+                print(f"⚠️ Thumbnail loading failed: {e}")
+            self._results.put((generation, None, None))
+
+    def _load(self, generation: int, path: str, order: List[int], cache_dir: Optional[str],
+              have: Dict[int, Image.Image]):
+        folder = None
+        if cache_dir:
+            folder = os.path.join(cache_dir, pdf_content_hash(path)[:16])
+            os.makedirs(folder, exist_ok=True)
+
+        doc = None
+        try:
+            for page_number in order:
+                if not self._is_current(generation):
+                    return
+                file_path = (os.path.join(folder, f"p{page_number + 1:04d}_{THUMB_WIDTH}x{THUMB_HEIGHT}.png")
+                             if folder else None)
+                img = have.get(page_number)
+                if img is not None:
+                    if file_path and not os.path.exists(file_path):
+                        img.save(file_path)
+                    continue
+
+                if file_path and os.path.exists(file_path):
+                    try:
+                        img = Image.open(file_path)
+                        img.load()
+                        self.disk_hits += 1
+                    except Exception:
+                        img = None
+
+                if img is None:
+                    if doc is None:
+                        doc = fitz.open(path)
+                    page = doc[page_number]
+                    zoom = min(THUMB_WIDTH / page.rect.width, THUMB_HEIGHT / page.rect.height)
+                    img = render_image(page, zoom)
+                    self.rendered += 1
+                    if file_path:
+                        img.save(file_path)
+
+                self._results.put((generation, page_number, img))
+        finally:
+            if doc is not None:
+                doc.close()
@@ -0,0 +1,151 @@
+"""
+Viewport Tile Rendering
+For large drawings at high zoom, rasterizing the whole page costs tens of
+megabytes per render while only a small part is visible. TiledPageView
+renders only the tiles intersecting the visible canvas region (plus a
+margin) using fitz clip rectangles, and fills in more tiles as the user
+scrolls. Tiles are cached in the shared PageRasterCache.
+"""
+
+import tkinter as tk
+from typing import Dict, Optional, Tuple
+
+import fitz  # PyMuPDF
+import numpy as np
+from PIL import ImageTk
+
+from page_cache import PageRasterCache, quantize_zoom
+from page_raster import render_array
+
+
+TILE_SIZE = 512            # display pixels per tile edge
+VIEWPORT_MARGIN = 256      # extra pixels rendered around the visible region
+TILED_THRESHOLD_PIXELS = 24_000_000  # auto mode: tile pages larger than this
+
+
+def page_display_size(doc, page_number: int, scale: float) -> Tuple[int, int]:
+    """Pixel size of the full page raster at a given scale"""
+    zoom = quantize_zoom(scale)
+    irect = (doc[page_number].rect * fitz.Matrix(zoom, zoom)).irect
+    return irect.width, irect.height
+
+
+def should_tile(doc, page_number: int, scale: float, mode='auto') -> bool:
+    """Decide whether a page should be shown in tiled mode.
+
+    mode: 'auto' (tile only above TILED_THRESHOLD_PIXELS), True or False
+    """
+    if mode == 'auto':
+        width, height = page_display_size(doc, page_number, scale)
+        return width * height > TILED_THRESHOLD_PIXELS
+    return bool(mode)
+
+
+class TiledPageView:
+    """Shows one page as canvas tiles rendered on demand for the viewport"""
+
+    TAG = 'page_tile'
+
+    def __init__(self, canvas, cache: PageRasterCache,
+                 tile_size: int = TILE_SIZE, margin: int = VIEWPORT_MARGIN):
+        self.canvas = canvas
+        self.cache = cache
+        self.tile_size = tile_size
+        self.margin = margin
+        self.active = False
+        self.doc = None
+        self.page_number = None
+        self.scale = None
+        self.page_size = (0, 0)
+        # (tile_x, tile_y) -> (canvas item id, PhotoImage)
+        self._tiles: Dict[Tuple[int, int], Tuple[int, object]] = {}
+
+    # ================================================================
+    # LIFECYCLE
+    # ================================================================
+
+    def load(self, doc, page_number: int, scale: float):
+        """Switch to tiled display of a page. The caller clears the canvas first."""
+        self._tiles.clear()
+        self.doc = doc
+        self.page_number = page_number
+        self.scale = scale
+        self.page_size = page_display_size(doc, page_number, scale)
+        self.active = True
+
+        # Invisible page-sized rectangle so bbox("all") still reports the page extents
+        width, height = self.page_size
+        self.canvas.create_rectangle(0, 0, width, height, outline='', fill='',
+                                     tags=('page_base', self.TAG))
+        self.canvas.config(scrollregion=(0, 0, width, height))
+        self.update_visible()
+
+    def deactivate(self):
+        """Leave tiled mode (full-page raster is shown instead)"""
+        if self.active:
+            self.canvas.delete(self.TAG)
+        self._tiles.clear()
+        self.active = False
+        self.doc = None
+
+    # ================================================================
+    # VIEWPORT
+    # ================================================================
+
+    def visible_rect(self, margin: Optional[int] = None) -> Tuple[float, float, float, float]:
+        """Visible canvas region in display coordinates, expanded by margin"""
+        if margin is None:
+            margin = self.margin
+        x0 = self.canvas.canvasx(0)
+        y0 = self.canvas.canvasy(0)
+        x1 = x0 + max(1, self.canvas.winfo_width())
+        y1 = y0 + max(1, self.canvas.winfo_height())
+        return (x0 - margin, y0 - margin, x1 + margin, y1 + margin)
+
+    def update_visible(self):
+        """Render tiles that scrolled into view and release far-away ones"""
+        if not self.active:
+            return
+
+        wanted = self._tiles_in(self.visible_rect())
+        keep = self._tiles_in(self.visible_rect(self.margin + 2 * self.tile_size))
+
+        for tile in [t for t in self._tiles if t not in keep]:
+            item_id, _ = self._tiles.pop(tile)
+            self.canvas.delete(item_id)
+
+        created = False
+        for tile_x, tile_y in sorted(wanted - set(self._tiles)):
+            img = self.cache.get_tile_image(self.doc, self.page_number, self.scale,
+                                            tile_x, tile_y, self.tile_size)
+            photo = ImageTk.PhotoImage(img)
+            x, y = img.info.get('origin', (tile_x * self.tile_size, tile_y * self.tile_size))
+            item_id = self.canvas.create_image(x, y, anchor=tk.NW, image=photo, tags=self.TAG)
+            self._tiles[(tile_x, tile_y)] = (item_id, photo)
+            created = True
+
+        if created:
+            # Tiles always sit underneath annotations and tool drawings
+            self.canvas.tag_lower(self.TAG)
+
+    def _tiles_in(self, rect) -> set:
+        width, height = self.page_size
+        if width <= 0 or height <= 0:
+            return set()
+        x0, y0, x1, y1 = rect
+        t = self.tile_size
+        tx0 = max(0, int(x0 // t))
+        ty0 = max(0, int(y0 // t))
+        tx1 = min((width - 1) // t, int(x1 // t))
+        ty1 = min((height - 1) // t, int(y1 // t))
+        return {(tx, ty) for tx in range(tx0, tx1 + 1) for ty in range(ty0, ty1 + 1)}
+
+    # ================================================================
+    # REGION ACCESS (OCR)
+    # ================================================================
+
+    def render_region(self, x1: int, y1: int, x2: int, y2: int) -> np.ndarray:
+        """Render an arbitrary display-space region of the page as an RGB array (zero-copy view)"""
+        zoom = quantize_zoom(self.scale)
+        clip = fitz.Rect(x1, y1, x2, y2) / zoom
+        return render_array(self.doc[self.page_number], zoom, clip=clip)
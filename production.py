@@ -19,6 +19,21 @@ import sqlite3
 import numpy as np
 from handover_database import HandoverDB
 from database_manager import DatabaseManager
+from annotation_store import AnnotationStore
+from stroke_geometry import (
+    annotations_equal, as_points, rotate_points, scale_points, simplify_points, to_json
+)
+from content_cache import shared_content_cache
+from page_cache import PageRasterCache, image_nbytes
+from render_layers import AnnotationOverlay, VectorAnnotationLayer
+from page_prefetch import PagePrefetcher
+from page_tiles import TiledPageView, should_tile
+from page_raster import RASTER_STATS, image_region, pixmap_to_image
+from zoom_preview import ProgressiveZoom
+from page_thumbnails import ThumbnailSidebar, thumbnail_cache_dir
+from page_scroll import ContinuousPageView
+from stroke_preview import StrokePreview
+from stats_sync import EXCEL_LOCK, StatsSyncScheduler
 import sys
 
 LOGGED_IN_USERNAME = sys.argv[1] if len(sys.argv) > 1 else None
@@ -155,7 +170,7 @@ class ProductionTool:
         self.sales_order_no = ""
         self.cabinet_id = ""
         self.storage_location = ""
-        self.annotations = []
+        self.annotations = AnnotationStore()
         
         base = get_app_base_dir()
         
@@ -169,6 +184,17 @@ class ProductionTool:
         self.zoom_level = 1.0
         self.current_sr_no = 1
         self.current_page_image = None
+        self.render_profile = 'auto'  # 'auto', 'gray' or 'rgb' - gray rasters for monochrome sheets
+        # LRU of base page rasters, backed by the content-addressed disk cache shared by all tools
+        self.page_cache = PageRasterCache(disk_cache=shared_content_cache(),
+                                          render_profile=self.render_profile)
+        self.prefetcher = PagePrefetcher(self.page_cache)  # renders N±1 in the background
+        self.tiled_rendering = 'auto'  # 'auto', True or False - viewport tiles for huge rasters
+        self.continuous_scroll = False  # True = all pages in one vertical strip
+        self.annotation_render_mode = 'raster'  # 'raster' (RGBA patches) or 'vector' (canvas items)
+        self.stroke_tolerance_px = 1.0  # RDP tolerance for captured strokes, in screen pixels
+        self.keep_raw_stroke_points = False  # True = load legacy sessions without simplifying strokes
+        self._tile_update_pending = False
         self.session_refs = set()
         
         # Visual navigation for production mode
@@ -229,7 +255,6 @@ class ProductionTool:
         self.tool_mode = None  # Alias for current_tool
         self.pen_points = []
         self.temp_pen_line = None
-        self.temp_line_ids = []  # Store temporary drawing line IDs
         self.drawing_type = None  # 'pen', 'text'
         self.text_pos_x = None
         self.text_pos_y = None
@@ -242,16 +267,40 @@ class ProductionTool:
         self.max_undo = 50
         
         self.setup_ui()
+        # Annotations are drawn on their own layer above the cached page raster
+        self.annotation_layer = self._create_annotation_layer()
+        self._base_layer_key = None
+        self.tile_view = TiledPageView(self.canvas, self.page_cache)
+        self.zoomer = ProgressiveZoom(self.root, self.canvas, self.page_cache, self.prefetcher)
+        self.stroke_preview = StrokePreview(self.root, self.canvas)  # one live item per stroke
+        self.scroll_view = ContinuousPageView(
+            self.canvas, self.page_cache, self.prefetcher, self._create_annotation_layer,
+            lambda page: self.annotations.on_page(page), self.go_to_page
+        )
+        # Manager stats sync runs in the background after a quiet period, never on redraw
+        self.stats_sync = StatsSyncScheduler(
+            self.root, self._manager_stats_snapshot,
+            lambda snapshot: self.sync_manager_stats(snapshot=snapshot)
+        )
+        self.root.protocol("WM_DELETE_WINDOW", self.on_app_close)
         self.current_sr_no = self.get_next_sr_no()
 
     # ================================================================
     # MANAGER SYNC - PRODUCTION SPECIFIC
     # ================================================================
     
-    def sync_manager_stats(self):
-        """Sync current cabinet statistics to manager database"""
-        if not self.cabinet_id:
+    def sync_manager_stats(self, snapshot=None):
+        """Sync current cabinet statistics to manager database
+        
+        Args:
+            snapshot: Cabinet identity from _manager_stats_snapshot (taken now if None)
+        """
+        if snapshot is None:
+            snapshot = self._cabinet_identity()
+        if snapshot is None:
             return
+        # Background syncs may run after another cabinet was loaded
+        cabinet_id, excel_file = snapshot['cabinet_id'], snapshot['excel_file']
         
         try:
             # Count from Excel - start from row 9
@@ -259,9 +308,10 @@ class ProductionTool:
             closed_punches = 0
             total_punches = 0
             
-            if self.excel_file and os.path.exists(self.excel_file):
+            if excel_file and os.path.exists(excel_file):
                 try:
-                    wb = load_workbook(self.excel_file, data_only=True)
+                    with EXCEL_LOCK:
+                        wb = load_workbook(excel_file, data_only=True)
                     ws = wb[self.punch_sheet_name] if self.punch_sheet_name in wb.sheetnames else wb.active
                     
                     row = 9  # Start from row 9
@@ -293,9 +343,9 @@ class ProductionTool:
             open_punches = total_punches - implemented_punches - closed_punches
             
             self.manager_db.update_cabinet(
-                self.cabinet_id,
-                self.project_name,
-                self.sales_order_no,
+                cabinet_id,
+                snapshot['project_name'],
+                snapshot['sales_order_no'],
                 0,
                 0,
                 total_punches,
@@ -303,8 +353,8 @@ class ProductionTool:
                 implemented_punches,
                 closed_punches,
                 'in_progress',
-                storage_location=getattr(self, 'storage_location', None),
-                excel_path=self.excel_file
+                storage_location=snapshot['storage_location'],
+                excel_path=excel_file
             )
         
         except Exception as e:
@@ -312,6 +362,34 @@ class ProductionTool:
             import traceback
             traceback.print_exc()
     
+    def _manager_stats_snapshot(self):
+        """Production counts come from Excel - only the cabinet identity is snapshotted"""
+        if not self.excel_file:
+            return None
+        return self._cabinet_identity()
+
+    def _cabinet_identity(self):
+        """Loaded cabinet for a manager sync (None if none is loaded)"""
+        if not self.cabinet_id:
+            return None
+        return {
+            'cabinet_id': self.cabinet_id,
+            'project_name': self.project_name,
+            'sales_order_no': self.sales_order_no,
+            'excel_file': self.excel_file,
+            'storage_location': getattr(self, 'storage_location', None),
+        }
+
+    def on_app_close(self):
+        """Flush pending manager statistics before the window goes away"""
+        self.stats_sync.flush()
+        self.prefetcher.cancel()
+        self.thumbnail_bar.cancel()
+        disk_cache = shared_content_cache()
+        if disk_cache is not None:
+            disk_cache.flush()  # queued rasters - the writer is a daemon thread
+        self.root.destroy()
+
     def sync_manager_stats_only(self):
         """Lightweight sync without full recount - for display updates"""
         # Only sync if we have the necessary data loaded
@@ -385,6 +463,16 @@ class ProductionTool:
         view_menu.add_command(label="Zoom In", command=self.zoom_in, accelerator="Ctrl++")
         view_menu.add_command(label="Zoom Out", command=self.zoom_out, accelerator="Ctrl+-")
         view_menu.add_command(label="Reset Zoom", command=lambda: setattr(self, 'zoom_level', 1.0) or self.display_page())
+        view_menu.add_separator()
+        self.vector_annotations_var = tk.BooleanVar(value=self.annotation_render_mode == 'vector')
+        view_menu.add_checkbutton(label="Vector Annotation Layer", variable=self.vector_annotations_var,
+                                  command=self.toggle_vector_annotations)
+        self.continuous_scroll_var = tk.BooleanVar(value=self.continuous_scroll)
+        view_menu.add_checkbutton(label="Continuous Scroll", variable=self.continuous_scroll_var,
+                                  command=self.toggle_continuous_scroll)
+        self.thumbnails_var = tk.BooleanVar(value=True)
+        view_menu.add_checkbutton(label="Page Thumbnails", variable=self.thumbnails_var,
+                                  command=lambda: self.thumbnail_bar.set_visible(self.thumbnails_var.get()))
         
         # Keyboard shortcuts
         self.root.bind_all("<Control-o>", lambda e: self.load_from_handover_queue())
@@ -523,6 +611,11 @@ class ProductionTool:
         canvas_frame = tk.Frame(self.root, bg='#f1f5f9')
         canvas_frame.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
         
+        # Page thumbnails - virtualized strip, rendered in the background and cached on disk
+        self.thumbnail_bar = ThumbnailSidebar(canvas_frame, on_select=self.go_to_page,
+                                              badge_fn=lambda page: self.annotations.punch_counts(page))
+        self.thumbnail_bar.frame.pack(side=tk.LEFT, fill=tk.Y)
+        
         v_scrollbar = tk.Scrollbar(canvas_frame, orient=tk.VERTICAL)
         v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
@@ -530,13 +623,14 @@ class ProductionTool:
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
         
         self.canvas = tk.Canvas(canvas_frame, bg='#f8fafc',
-                               yscrollcommand=v_scrollbar.set,
-                               xscrollcommand=h_scrollbar.set,
+                               yscrollcommand=lambda *a: self._on_canvas_scrolled(v_scrollbar, *a),
+                               xscrollcommand=lambda *a: self._on_canvas_scrolled(h_scrollbar, *a),
                                highlightthickness=0)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         v_scrollbar.config(command=self.canvas.yview)
         h_scrollbar.config(command=self.canvas.xview)
+        self.canvas.bind("<Configure>", self._schedule_tile_update)
         
         # Bind mouse events - CRITICAL FOR PEN AND TEXT TOOLS
         self.canvas.bind("<ButtonPress-1>", self.on_left_press)
@@ -675,6 +769,9 @@ class ProductionTool:
                 return
             
             # Load PDF
+            self.stats_sync.flush()  # a pending sync belongs to the previous cabinet
+            self.prefetcher.cancel()  # drop queued renders for the previous PDF
+            self.zoomer.cancel()
             self.pdf_document = fitz.open(item['pdf_path'])
             self.current_pdf_path = item['pdf_path']
             self.current_page = 0
@@ -715,7 +812,7 @@ class ProductionTool:
                           f"sr_no={ann.get('sr_no')}")
             else:
                 print(f"⚠️ No session file found")
-                self.annotations = []
+                self.annotations = AnnotationStore()
                 self.session_refs.clear()
             
             print(f"{'='*60}\n")
@@ -731,7 +828,7 @@ class ProductionTool:
             
             # Update manager status
             self.manager_db.update_status(self.cabinet_id, 'in_progress')
-            self.sync_manager_stats()
+            self.stats_sync.mark_dirty('handover loaded')
             
             self.display_page()
             
@@ -808,12 +905,12 @@ class ProductionTool:
             )
             
             # Clear current work
+            self.stats_sync.flush()  # a pending sync belongs to the previous cabinet
             self.pdf_document = None
             self.current_pdf_path = None
             self.excel_file = None
-            self.annotations = []
-            self.canvas.delete("all")
-            self.page_label.config(text="Page: 0/0")
+            self.annotations = AnnotationStore()
+            self.display_page()
             self.root.title("Production Tool - Highlighter Mode")
         else:
             messagebox.showerror("Error", "Failed to handback item to Quality.")
@@ -1043,9 +1140,7 @@ class ProductionTool:
             text_widget.insert(tk.END, f"Implementation: {'YES' if p['implemented'] else 'NO'}\n")
             
             # Find annotation - checks for both SR number and excel row
-            ann = next((a for a in self.annotations 
-                       if a.get('sr_no') == p['sr_no'] 
-                       or a.get('excel_row') == p['row']), None)
+            ann = self.annotations.find_punch(p['sr_no'], p['row'])
             
             # Display quality remarks from quality team
             if ann and ann.get('quality_remark'):
@@ -1062,6 +1157,15 @@ class ProductionTool:
             text_widget.config(state=tk.DISABLED)
             
             self.navigate_to_punch_highlighter(p['sr_no'], p['punch_text'])
+
+            # Warm the cache with the next punch's page while this one is worked on
+            if pos[0] < len(punches) - 1:
+                nxt = punches[pos[0] + 1]
+                next_ann = next((a for a in self.annotations.by_sr_no(nxt['sr_no']) if a.get('page') is not None), None)
+                if next_ann:
+                    self.prefetcher.request(self.pdf_document, self.current_page,
+                                            self.page_to_display_scale(),
+                                            extra_pages=[next_ann['page']])
         
         show_item()
         
@@ -1087,10 +1191,11 @@ class ProductionTool:
                 self.write_cell(ws, p['row'], self.punch_cols['implemented_date'],
                               datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
                 
-                wb.save(self.excel_file)
+                with EXCEL_LOCK:
+                    wb.save(self.excel_file)
                 wb.close()
                 
-                self.sync_manager_stats()
+                self.stats_sync.mark_dirty('punch implemented')
             
             except PermissionError:
                 messagebox.showerror("File Locked",
@@ -1102,9 +1207,7 @@ class ProductionTool:
                 return
             
             # Find annotation and update implementation status
-            ann = next((a for a in self.annotations 
-                       if a.get('sr_no') == p['sr_no'] 
-                       or a.get('excel_row') == p['row']), None)
+            ann = self.annotations.find_punch(p['sr_no'], p['row'])
             
             if ann:
                 ann['implemented'] = True
@@ -1112,6 +1215,7 @@ class ProductionTool:
                 ann['implemented_date'] = datetime.now().isoformat()
                 if remark:
                     ann['implementation_remark'] = remark
+                self.thumbnail_bar.refresh_badges()
             
             if pos[0] < len(punches) - 1:
                 pos[0] += 1
@@ -1171,11 +1275,9 @@ class ProductionTool:
         target_ann = None
         
         # Try SR No match - looking for 'error' type annotations (which are highlighter marks)
-        for ann in self.annotations:
-            if ann.get('sr_no') == sr_no and ann.get('type') in ('error', 'highlight'):
-                target_ann = ann
-                print(f"✓ Found annotation by SR No: {sr_no}, type: {ann.get('type')}")
-                break
+        target_ann = self.annotations.find_punch(sr_no, types=('error', 'highlight'))
+        if target_ann:
+            print(f"✓ Found annotation by SR No: {sr_no}, type: {target_ann.get('type')}")
         
         # Fuzzy text match if no direct SR match
         if not target_ann:
@@ -1216,13 +1318,13 @@ class ProductionTool:
                 self._last_highlighted_ann = target_ann
         else:
             print(f"⚠️ No annotation found for SR {sr_no}")
-            print(f"Available annotation types: {set(a.get('type') for a in self.annotations)}")
+            print(f"Available annotation types: {set(self.annotations.type_counts())}")
             print(f"Available SR numbers: {set(a.get('sr_no') for a in self.annotations if a.get('sr_no'))}")
     
     def highlight_annotation_visual(self, annotation):
         """Draw visual indicators for highlighter annotation - UPDATED"""
         # Calculate bounding box from points_page or use bbox_page
-        if 'points_page' in annotation and annotation['points_page']:
+        if 'points_page' in annotation and len(annotation['points_page']):
             # Calculate bbox from highlighter points
             points = annotation['points_page']
             xs = [p[0] for p in points]
@@ -1400,7 +1502,7 @@ class ProductionTool:
         self.drawing = False
         self.drawing_type = None
         self.pen_points = []
-        self.temp_line_ids = []
+        self.clear_temp_drawings()
         self.display_page()
     
     def update_tool_pane(self):
@@ -1424,12 +1526,7 @@ class ProductionTool:
     
     def clear_temp_drawings(self):
         """Clear temporary drawing elements from canvas"""
-        for line_id in self.temp_line_ids:
-            try:
-                self.canvas.delete(line_id)
-            except:
-                pass
-        self.temp_line_ids.clear()
+        self.stroke_preview.clear()
     
     # ================================================================
     # UNDO FUNCTIONALITY
@@ -1455,9 +1552,11 @@ class ProductionTool:
         
         if last_action['type'] == 'add_annotation':
             annotation = last_action['annotation']
-            if annotation in self.annotations:
-                self.annotations.remove(annotation)
-                self.display_page()
+            # Undo stack holds a copy - find the live annotation to drop its overlay item
+            live = next((a for a in self.annotations if annotations_equal(a, annotation)), None)
+            if live is not None:
+                self.annotations.remove(live)
+                self.annotation_layer.remove(live)
                 self._flash_status("✓ Annotation removed", bg='#10b981')
         
         self.update_tool_pane()
@@ -1475,6 +1574,13 @@ class ProductionTool:
         x = self.canvas.canvasx(event.x)
         y = self.canvas.canvasy(event.y)
 
+        if self.continuous_scroll and self.scroll_view.page_at(y) != self.current_page:
+            # Capture belongs to the page under the cursor - it becomes the
+            # current page (at canvas origin), so re-read the coordinates
+            self.go_to_page(self.scroll_view.page_at(y))
+            x = self.canvas.canvasx(event.x)
+            y = self.canvas.canvasy(event.y)
+
         # -------- PEN TOOL --------
         if self.tool_mode == "pen":
             self.drawing = True
@@ -1501,15 +1607,10 @@ class ProductionTool:
 
         # -------- PEN TOOL DRAWING --------
         if self.drawing_type == "pen":
-            if len(self.pen_points) > 0:
-                last_x, last_y = self.pen_points[-1]
-                line_id = self.canvas.create_line(
-                    last_x, last_y, x, y,
-                    fill="red", width=3,
-                    capstyle=tk.ROUND, smooth=True
-                )
-                self.temp_line_ids.append(line_id)
+            if not self.stroke_preview.active and self.pen_points:
+                self.stroke_preview.begin(self.pen_points[-1], fill="red", width=3)
             self.pen_points.append((x, y))
+            self.stroke_preview.add_point(x, y)
             return
     
     def on_left_release(self, event):
@@ -1520,7 +1621,8 @@ class ProductionTool:
         # -------- PEN TOOL FINISH --------
         if self.drawing_type == "pen":
             if len(self.pen_points) >= 2:
-                points_page = self.display_to_page_coords(self.pen_points)
+                points_page = self.simplify_stroke(self.display_to_page_coords(self.pen_points))
+                print(f"✂️ Pen stroke: {len(self.pen_points)} → {len(points_page)} points")
                 annotation = {
                     'type': 'pen',
                     'page': self.current_page,
@@ -1529,11 +1631,11 @@ class ProductionTool:
                 }
                 self.annotations.append(annotation)
                 self.add_to_undo_stack('add_annotation', annotation)
+                self.annotation_layer.add(annotation)
             self.pen_points = []
             self.clear_temp_drawings()
             self.drawing = False
             self.drawing_type = None
-            self.display_page()
             self.update_tool_pane()
             self._flash_status("✓ Pen stroke added", bg='#10b981')
             return
@@ -1552,7 +1654,7 @@ class ProductionTool:
                 }
                 self.annotations.append(annotation)
                 self.add_to_undo_stack('add_annotation', annotation)
-                self.display_page()
+                self.annotation_layer.add(annotation)
                 self._flash_status("✓ Text added", bg='#10b981')
             self.drawing = False
             self.drawing_type = None
@@ -1564,137 +1666,146 @@ class ProductionTool:
     # ================================================================
     
     def display_page(self):
-        """Render the current PDF page with HIGHLIGHTER annotations ONLY - NO BOXES"""
+        """Render the current PDF page with HIGHLIGHTER annotations ONLY - NO BOXES
+
+        Base raster and annotations are separate layers - the base image is
+        only rebuilt when the page or zoom changes.
+        """
         if not self.pdf_document:
             self.canvas.delete("all")
+            self._base_layer_key = None
+            self.annotation_layer.clear()
+            self.tile_view.deactivate()
+            self.scroll_view.deactivate()
             self.page_label.config(text="Page: 0/0")
+            self.thumbnail_bar.clear()
             return
 
         try:
-            page = self.pdf_document[self.current_page]
-            mat = fitz.Matrix(self.page_to_display_scale(), self.page_to_display_scale())
-            pix = page.get_pixmap(matrix=mat)
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            self.current_page_image = np.array(img)
-            draw = ImageDraw.Draw(img, 'RGBA')
-
-            # Try to load a font for text
-            try:
-                font_size = max(12, int(14 * self.zoom_level))
-                font = ImageFont.truetype("arial.ttf", font_size)
-            except:
-                font = ImageFont.load_default()
-
-            # Count annotations by type for debugging
-            page_annotations = [ann for ann in self.annotations if ann.get('page') == self.current_page]
-            print(f"\n=== Rendering Page {self.current_page + 1} ===")
-            print(f"Total annotations on this page: {len(page_annotations)}")
-            
-            highlight_count = 0
-            error_count = 0
-            pen_count = 0
-            text_count = 0
-            box_count = 0
+            scale = self.page_to_display_scale()
+            base_key = self.page_cache.make_key(self.pdf_document, self.current_page, scale)
+            page_annotations = self.annotations.on_page(self.current_page)
 
-            for ann in self.annotations:
-                if ann.get('page') != self.current_page:
-                    continue
+            if self.continuous_scroll:
+                # -------- CONTINUOUS SCROLL - neighbouring pages stay on the canvas --------
+                if base_key != self._base_layer_key:
+                    self.tile_view.deactivate()
+                    self.current_page_image = self.scroll_view.show(
+                        self.pdf_document, self.current_page, scale, self.zoom_level)
+                    self._base_layer_key = base_key
+                    self.annotation_layer.rebuild(page_annotations, scale, self.zoom_level)
+                else:
+                    self.annotation_layer.sync(page_annotations)
+                    self.scroll_view.sync_annotations()
+            elif base_key != self._base_layer_key:
+                # Keep annotation items - the vector layer rescales them in place
+                self.canvas.delete("!" + self.annotation_layer.TAG)
+                if should_tile(self.pdf_document, self.current_page, scale, self.tiled_rendering):
+                    # -------- TILED BASE LAYER - only the visible region is rasterized --------
+                    self.current_page_image = None
+                    self.photo = None
+                    self.tile_view.load(self.pdf_document, self.current_page, scale)
+                    viewport = self.tile_view.visible_rect()
+                else:
+                    # -------- BASE LAYER - page or zoom changed --------
+                    self.tile_view.deactivate()
+                    base_img = self.page_cache.get_page_image(self.pdf_document, self.current_page, scale)
+                    # Shared with the cache, read-only - OCR crops only the region it needs
+                    self.current_page_image = base_img
+                    RASTER_STATS.record(copies_avoided=1, bytes_saved=image_nbytes(base_img))
+                    self.photo = ImageTk.PhotoImage(base_img)
+                    self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo, tags='page_base')
+                    self.canvas.config(scrollregion=self.canvas.bbox(tk.ALL))
+                    self.prefetcher.request(self.pdf_document, self.current_page, scale)
+                    viewport = None
+                self.canvas.tag_lower('page_base')
+                self._base_layer_key = base_key
+                self.annotation_layer.rebuild(page_annotations, scale, self.zoom_level, viewport)
+            else:
+                # -------- ANNOTATION-ONLY REDRAW --------
+                self.annotation_layer.sync(page_annotations)
 
+            # Count annotations by type for debugging
+            type_counts = {}
+            for ann in page_annotations:
                 ann_type = ann.get('type')
+                type_counts[ann_type] = type_counts.get(ann_type, 0) + 1
 
-                # -------- HIGHLIGHTER STROKES (type='highlight' or type='error') --------
-                if ann_type in ('highlight', 'error') and 'points_page' in ann:
-                    points_page = ann['points_page']
-                    if len(points_page) >= 2:
-                        points_display = self.page_to_display_coords(points_page)
-                        color_key = ann.get('color', 'yellow')
-                        rgba = self.highlighter_colors.get(color_key, self.highlighter_colors['yellow'])['rgba']
-                        
-                        # Draw thick semi-transparent strokes
-                        stroke_width = max(15, int(15 * self.zoom_level))
-                        for i in range(len(points_display) - 1):
-                            x1, y1 = points_display[i]
-                            x2, y2 = points_display[i + 1]
-                            draw.line([x1, y1, x2, y2], fill=rgba, width=stroke_width)
-                        
-                        # Add closed indicator if applicable
-                        if ann.get('closed_by'):
-                            # Calculate bbox if not present
-                            if 'bbox_page' in ann:
-                                bbox_display = self.bbox_page_to_display(ann['bbox_page'])
-                            else:
-                                xs = [p[0] for p in points_page]
-                                ys = [p[1] for p in points_page]
-                                bbox_page = (min(xs), min(ys), max(xs), max(ys))
-                                bbox_display = self.bbox_page_to_display(bbox_page)
-                            
-                            cx = bbox_display[0] + 8
-                            cy = bbox_display[1] + 8
-                            draw.ellipse([cx - 6, cy - 6, cx + 6, cy + 6], fill=(0, 128, 0, 200))
-                        
-                        if ann_type == 'highlight':
-                            highlight_count += 1
-                        else:
-                            error_count += 1
-
-                # -------- PEN STROKES --------
-                elif ann_type == 'pen' and 'points' in ann:
-                    points_page = ann['points']
-                    if len(points_page) >= 2:
-                        points_display = self.page_to_display_coords(points_page)
-                        stroke_width = max(2, int(3 * self.zoom_level))
-                        for i in range(len(points_display) - 1):
-                            x1, y1 = points_display[i]
-                            x2, y2 = points_display[i + 1]
-                            draw.line([x1, y1, x2, y2], fill='red', width=stroke_width)
-                        pen_count += 1
-
-                # -------- TEXT ANNOTATIONS --------
-                elif ann_type == 'text' and 'pos_page' in ann:
-                    pos_page = ann['pos_page']
-                    pos_display = self.page_to_display_coords(pos_page)
-                    text = ann.get('text', '')
-                    if text:
-                        # Draw text background for visibility
-                        try:
-                            bbox = draw.textbbox(pos_display, text, font=font)
-                            padding = 2
-                            draw.rectangle(
-                                [bbox[0] - padding, bbox[1] - padding,
-                                 bbox[2] + padding, bbox[3] + padding],
-                                fill=(255, 255, 200, 200)
-                            )
-                        except:
-                            pass
-                        draw.text(pos_display, text, fill='red', font=font)
-                        text_count += 1
-                
-                # -------- BOX ANNOTATIONS - REMOVED (counting for debugging only) --------
-                elif ann_type == 'box':
-                    box_count += 1
-                    print(f"  ⚠️ Skipping box annotation (boxes are disabled)")
-
-            print(f"Rendered annotations:")
-            print(f"  🖍️ Highlights: {highlight_count}")
-            print(f"  ❌ Errors (as highlights): {error_count}")
-            print(f"  ✏️ Pen strokes: {pen_count}")
-            print(f"  🅰️ Text: {text_count}")
-            if box_count > 0:
-                print(f"  📦 Boxes (skipped): {box_count}")
+            print(f"\n=== Rendering Page {self.current_page + 1} ===")
+            print(f"Total annotations on this page: {len(page_annotations)}")
+            print(f"  🖍️ Highlights: {type_counts.get('highlight', 0)}")
+            print(f"  ❌ Errors (as highlights): {type_counts.get('error', 0)}")
+            print(f"  ✏️ Pen strokes: {type_counts.get('pen', 0)}")
+            print(f"  🅰️ Text: {type_counts.get('text', 0)}")
+            if type_counts.get('box'):
+                print(f"  📦 Boxes (skipped): {type_counts['box']}")
             print(f"{'='*40}\n")
 
-            self.photo = ImageTk.PhotoImage(img)
-            self.canvas.delete("all")
-            self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
-            self.canvas.config(scrollregion=self.canvas.bbox(tk.ALL))
             self.page_label.config(text=f"Page: {self.current_page + 1}/{len(self.pdf_document)}")
-            self.sync_manager_stats_only()
+            self.thumbnail_bar.show(self.pdf_document, self.current_page, self._thumbnail_cache_dir())
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to display page: {e}")
             import traceback
             traceback.print_exc()
 
+    def _on_canvas_scrolled(self, scrollbar, first, last):
+        """Canvas scroll callback - keep the scrollbar in sync and fill in tiles"""
+        scrollbar.set(first, last)
+        self._schedule_tile_update()
+        self.scroll_view.schedule_update()
+
+    def _schedule_tile_update(self, event=None):
+        if self.tile_view.active and not self._tile_update_pending:
+            self._tile_update_pending = True
+            self.root.after_idle(self._update_visible_tiles)
+
+    def _update_visible_tiles(self):
+        """Render tiles (and draw culled annotations) that scrolled into view"""
+        self._tile_update_pending = False
+        if not self.tile_view.active:
+            return
+        self.tile_view.update_visible()
+        page_annotations = self.annotations.on_page(self.current_page)
+        self.annotation_layer.set_viewport(self.tile_view.visible_rect(), page_annotations)
+
+    def _create_annotation_layer(self):
+        """Build the annotation layer for the current annotation_render_mode"""
+        layer_cls = VectorAnnotationLayer if self.annotation_render_mode == 'vector' else AnnotationOverlay
+        return layer_cls(self.canvas, self.highlighter_colors, highlight_types=('highlight', 'error'))
+
+    def _thumbnail_cache_dir(self):
+        """Thumbnails folder next to the cabinet's Sessions folder (None if storage is unknown)"""
+        if not getattr(self, 'storage_location', None) or not self.cabinet_id:
+            return None
+        cabinet_root = os.path.join(
+            self.storage_location,
+            self.project_name.replace(' ', '_'),
+            self.cabinet_id.replace(' ', '_')
+        )
+        return thumbnail_cache_dir(os.path.join(cabinet_root, "Sessions"))
+
+    def toggle_continuous_scroll(self):
+        """Switch between single-page view and one continuous strip of pages"""
+        self.continuous_scroll = self.continuous_scroll_var.get()
+        self.zoomer.cancel()
+        self.scroll_view.deactivate()
+        self.tile_view.deactivate()
+        self.canvas.delete('page_base')
+        self._base_layer_key = None
+        self.display_page()
+        print(f"📜 Continuous scroll: {'on' if self.continuous_scroll else 'off'}")
+
+    def toggle_vector_annotations(self):
+        """Switch between raster (RGBA patch) and vector (canvas item) annotations"""
+        self.annotation_layer.clear()
+        self.scroll_view.deactivate()  # neighbouring pages get layers of the new kind
+        self.annotation_render_mode = 'vector' if self.vector_annotations_var.get() else 'raster'
+        self.annotation_layer = self._create_annotation_layer()
+        self._base_layer_key = None
+        self.display_page()
+        print(f"🖌️ Annotation layer: {self.annotation_render_mode}")
+
     # ================================================================
     # COORDINATE CONVERSION HELPERS
     # ================================================================
@@ -1737,8 +1848,8 @@ class ProductionTool:
             if not isinstance(pts[0], (list, tuple)):
                 return (pts[0] / scale, pts[1] / scale)
         
-        # Handle list of points
-        return [(x / scale, y / scale) for x, y in pts]
+        # Handle list/array of points - one batched array operation
+        return scale_points(pts, 1.0 / scale)
     
     def page_to_display_coords(self, pts):
         """Convert page coords to display coords"""
@@ -1749,8 +1860,8 @@ class ProductionTool:
             if not isinstance(pts[0], (list, tuple)):
                 return (pts[0] * scale, pts[1] * scale)
         
-        # Handle list of points
-        return [(x * scale, y * scale) for x, y in pts]
+        # Handle list/array of points - one batched array operation
+        return scale_points(pts, scale)
     
     def bbox_page_to_display(self, bbox_page):
         scale = self.page_to_display_scale()
@@ -1761,6 +1872,18 @@ class ProductionTool:
         scale = self.page_to_display_scale()
         x1, y1, x2, y2 = bbox_display
         return (x1 / scale, y1 / scale, x2 / scale, y2 / scale)
+
+    def simplify_stroke(self, points_page):
+        """Drop redundant stroke points (RDP). Tolerance is in screen pixels at the current zoom."""
+        tolerance = self.stroke_tolerance_px / self.page_to_display_scale()
+        return simplify_points(points_page, tolerance)
+
+    def load_stroke_points(self, points):
+        """Stroke points from a session file - simplified unless raw points are kept"""
+        points = as_points(points)
+        if self.keep_raw_stroke_points:
+            return points
+        return self.simplify_stroke(points)
     
     # ================================================================
     # ROTATION TRANSFORMATION METHODS FOR PDF EXPORT
@@ -1810,37 +1933,17 @@ class ProductionTool:
     def transform_highlight_points_for_rotation(self, points, page):
         """Transform highlighter stroke points for page rotation
         
-        Highlighters store a list of (x, y) tuples representing the stroke path.
-        Each point needs to be individually transformed based on page rotation.
+        Highlighters store the stroke path as an (N, 2) array. The whole
+        stroke is mapped in one affine array operation.
         
         Args:
-            points: List of (x, y) tuples representing the highlight stroke
+            points: (N, 2) array or list of (x, y) tuples for the highlight stroke
             page: PyMuPDF page object with rotation info
             
         Returns:
-            List of fitz.Point objects, transformed for the page rotation
+            (N, 2) NumPy array, transformed for the page rotation
         """
-        r = page.rotation
-        w = page.rect.width
-        h = page.rect.height
-        
-        transformed_points = []
-        
-        for point in points:
-            x, y = point
-            
-            if r == 0:
-                transformed_points.append(fitz.Point(x, y))
-            elif r == 90:
-                transformed_points.append(fitz.Point(y, w - x))
-            elif r == 180:
-                transformed_points.append(fitz.Point(w - x, h - y))
-            elif r == 270:
-                transformed_points.append(fitz.Point(h - y, x))
-            else:
-                transformed_points.append(fitz.Point(x, y))
-        
-        return transformed_points
+        return rotate_points(points, page.rotation, page.rect.width, page.rect.height)
     
     def zoom_at_point(self, canvas_x, canvas_y, zoom_delta):
         if not self.pdf_document:
@@ -1852,8 +1955,8 @@ class ProductionTool:
         if new_zoom == old_zoom:
             return
         
-        self.zoom_level = new_zoom
-        self.display_page()
+        if self.zoom_to(new_zoom, anchor=(canvas_x, canvas_y)):
+            return
         
         scale = new_zoom / old_zoom
         bbox = self.canvas.bbox("all")
@@ -1887,15 +1990,67 @@ class ProductionTool:
             self.current_page += 1
             self.display_page()
     
+    def go_to_page(self, page):
+        """Jump to a page (thumbnail click)"""
+        if self.pdf_document and 0 <= page < len(self.pdf_document) and page != self.current_page:
+            self.current_page = page
+            self.display_page()
+
+    def zoom_to(self, new_zoom, anchor=None):
+        """Change zoom - show a resampled interim frame now, render sharp in the background.
+
+        Returns True if anchor is already kept under the cursor (interim
+        frame, or the continuous strip), False if the page was redrawn directly.
+        """
+        if not self.pdf_document:
+            self.zoom_level = new_zoom
+            return False
+
+        if self.continuous_scroll:
+            # The strip re-lays out at the new scale and keeps anchor's page
+            # point on screen (without one, the position in the page)
+            self.zoom_level = new_zoom
+            self.zoomer.cancel()
+            self.scroll_view.hold_point(anchor)
+            self.display_page()
+            return True
+
+        old_scale = self.page_to_display_scale()
+        base_img = None
+        if self._base_layer_key is not None and not self.tile_view.active:
+            base_img = self.page_cache.peek(self._base_layer_key)
+
+        self.zoom_level = new_zoom
+        new_scale = self.page_to_display_scale()
+        self.prefetcher.cancel()
+
+        if anchor is None:
+            anchor = (self.canvas.canvasx(self.canvas.winfo_width() / 2),
+                      self.canvas.canvasy(self.canvas.winfo_height() / 2))
+        sharp_key = self.page_cache.make_key(self.pdf_document, self.current_page, new_scale)
+        if (base_img is None or self.page_cache.contains(sharp_key)
+                or should_tile(self.pdf_document, self.current_page, new_scale, self.tiled_rendering)
+                or not self.zoomer.show_interim(base_img, old_scale, new_scale, anchor)):
+            self.zoomer.cancel()
+            self.display_page()
+            return False
+
+        # Annotations follow the interim frame; the sharp base replaces it when ready
+        self._base_layer_key = None
+        self.current_page_image = None
+        self.photo = None
+        self.annotation_layer.rebuild(self.annotations.on_page(self.current_page),
+                                      new_scale, self.zoom_level)
+        self.zoomer.request_sharp(self.pdf_document, self.current_page, new_scale, self.display_page)
+        return True
+
     def zoom_in(self):
         if self.zoom_level < 3.0:
-            self.zoom_level += 0.25
-            self.display_page()
+            self.zoom_to(self.zoom_level + 0.25)
     
     def zoom_out(self):
         if self.zoom_level > 0.5:
-            self.zoom_level -= 0.25
-            self.display_page()
+            self.zoom_to(self.zoom_level - 0.25)
 
     # ================================================================
     # SESSION MANAGEMENT - HIGHLIGHTER COMPATIBLE
@@ -1974,7 +2129,7 @@ class ProductionTool:
             
             # ===== HIGHLIGHTER ANNOTATIONS - Convert tuples to lists =====
             if 'points_page' in entry:
-                entry['points_page'] = [[float(x), float(y)] for x, y in entry['points_page']]
+                entry['points_page'] = to_json(entry['points_page'])
             
             # ===== BBOX for highlights =====
             if 'bbox_page' in entry:
@@ -1982,7 +2137,7 @@ class ProductionTool:
             
             # ===== PEN STROKES - Convert tuples to lists =====
             if 'points' in entry:
-                entry['points'] = [[float(x), float(y)] for x, y in entry['points']]
+                entry['points'] = to_json(entry['points'])
             
             # ===== TEXT ANNOTATIONS - Convert tuple to list =====
             if 'pos_page' in entry:
@@ -2000,10 +2155,10 @@ class ProductionTool:
                 json.dump(data, f, indent=2, ensure_ascii=False)
             
             # Count annotation types for feedback
-            highlight_count = len([a for a in self.annotations if a.get('type') == 'highlight'])
-            error_count = len([a for a in self.annotations if a.get('type') == 'error'])
-            pen_count = len([a for a in self.annotations if a.get('type') == 'pen'])
-            text_count = len([a for a in self.annotations if a.get('type') == 'text'])
+            highlight_count = self.annotations.type_count('highlight')
+            error_count = self.annotations.type_count('error')
+            pen_count = self.annotations.type_count('pen')
+            text_count = self.annotations.type_count('text')
             
             print(f"\n✓ Session saved to: {save_path}")
             print(f"Total annotations: {len(self.annotations)}")
@@ -2038,7 +2193,7 @@ class ProductionTool:
         self.current_sr_no = data.get('current_sr_no', self.current_sr_no)
         
         # Restore session refs
-        self.annotations = []
+        self.annotations = AnnotationStore()
         self.session_refs = set(data.get('session_refs', []))
         
         highlight_count = 0
@@ -2047,13 +2202,18 @@ class ProductionTool:
         text_count = 0
         box_count = 0
         
+        raw_point_count = 0
+        kept_point_count = 0
+
         for entry in data.get('annotations', []):
             ann = entry.copy()
             ann_type = ann.get('type')
             
             # ===== HIGHLIGHTER ANNOTATIONS - points_page =====
             if 'points_page' in ann:
-                ann['points_page'] = [(float(p[0]), float(p[1])) for p in ann['points_page']]
+                raw_point_count += len(ann['points_page'])
+                ann['points_page'] = self.load_stroke_points(ann['points_page'])
+                kept_point_count += len(ann['points_page'])
                 if ann_type == 'highlight':
                     highlight_count += 1
                 elif ann_type == 'error':
@@ -2065,7 +2225,9 @@ class ProductionTool:
             
             # ===== PEN STROKES - points =====
             if 'points' in ann:
-                ann['points'] = [(float(p[0]), float(p[1])) for p in ann['points']]
+                raw_point_count += len(ann['points'])
+                ann['points'] = self.load_stroke_points(ann['points'])
+                kept_point_count += len(ann['points'])
                 pen_count += 1
             
             # ===== TEXT ANNOTATIONS - pos_page =====
@@ -2090,6 +2252,9 @@ class ProductionTool:
             if ann.get('ref_no'):
                 self.session_refs.add(str(ann['ref_no']).strip())
         
+        if raw_point_count != kept_point_count:
+            print(f"✂️ Simplified stored strokes: {raw_point_count} → {kept_point_count} points")
+
         self.display_page()
         
         print(f"\n✓ Session loaded from: {path}")
@@ -2101,11 +2266,7 @@ class ProductionTool:
         if box_count > 0:
             print(f"  📦 Box annotations (skipped): {box_count}")
         
-        types_loaded = {}
-        for ann in self.annotations:
-            ann_type = ann.get('type', 'unknown')
-            types_loaded[ann_type] = types_loaded.get(ann_type, 0) + 1
-        print(f"Annotation types loaded: {types_loaded}\n")
+        print(f"Annotation types loaded: {self.annotations.type_counts()}\n")
 
 
 def main():
@@ -13,17 +13,43 @@ import json
 import numpy as np
 import getpass
 import sys
+import time
 import subprocess
 import sqlite3
 import shlex
 from difflib import SequenceMatcher
 from handover_database import HandoverDB
 from database_manager import DatabaseManager
+from annotation_store import AnnotationStore
+from stroke_geometry import (
+    annotations_equal, as_points, points_bbox, rotate_points, scale_points, simplify_points, stroke_list,
+    to_json
+)
+from content_cache import page_content_hash, shared_content_cache
+from page_cache import PageRasterCache, image_nbytes
+from render_layers import AnnotationOverlay, VectorAnnotationLayer
+from page_prefetch import PagePrefetcher
+from page_tiles import TiledPageView, should_tile
+from page_raster import RASTER_STATS, image_region, pixmap_to_image
+from ocr_engine import OCR_ENGINE, ocr_deadline, ocr_remaining
+from zoom_preview import ProgressiveZoom
+from page_thumbnails import ThumbnailSidebar, thumbnail_cache_dir
+from page_scroll import ContinuousPageView
+from stroke_preview import StrokePreview
+from word_index import WordIndex, word_index_path
+from ocr_pool import (
+    DISMISS_GRACE_MS, HIGHLIGHT_OCR_PROFILE, OCR_BUDGET_S, OcrWorkerPool, image_boxes,
+    ocr_orientations
+)
+from ocr_prefill import ask_ocr_prefilled
+from ocr_profiles import PROFILE_STATS, choose_profile
+from ocr_region import denoise, ocr_clip, render_ocr_region
+from text_layer import HIGHLIGHT_PAD, text_in_rect
+from stats_sync import EXCEL_LOCK, StatsSyncScheduler
 from tkinter import ttk
 import pytesseract
 import os
 import cv2
-import io
 import re
 import sys
 
@@ -322,7 +348,7 @@ class CircuitInspector:
         self.project_name = ""
         self.sales_order_no = ""
         self.cabinet_id = ""
-        self.annotations = []
+        self.annotations = AnnotationStore()
         base = get_app_base_dir()
         self.master_excel_file = os.path.join(base, "Emerson.xlsx")
 
@@ -332,6 +358,17 @@ class CircuitInspector:
         self.zoom_level = 1.0
         self.current_sr_no = 1
         self.current_page_image = None
+        self.render_profile = 'auto'  # 'auto', 'gray' or 'rgb' - gray rasters for monochrome sheets
+        # LRU of base page rasters, backed by the content-addressed disk cache shared by all tools
+        self.page_cache = PageRasterCache(disk_cache=shared_content_cache(),
+                                          render_profile=self.render_profile)
+        self.prefetcher = PagePrefetcher(self.page_cache)  # renders N±1 in the background
+        self.tiled_rendering = 'auto'  # 'auto', True or False - viewport tiles for huge rasters
+        self.continuous_scroll = False  # True = all pages in one vertical strip
+        self.annotation_render_mode = 'raster'  # 'raster' (RGBA patches) or 'vector' (canvas items)
+        self.stroke_tolerance_px = 1.0  # RDP tolerance for captured strokes, in screen pixels
+        self.keep_raw_stroke_points = False  # True = load legacy sessions without simplifying strokes
+        self._tile_update_pending = False
         self.tool_mode = None  # None, "pen", or "text"
         self.pen_points = []
         self.session_refs = set()
@@ -392,13 +429,33 @@ class CircuitInspector:
         # Drawing / tool state
         self.drawing = False
         self.drawing_type = None  # 'highlight', 'pen', 'text'
-        self.temp_line_ids = []  # Store temporary drawing line IDs
         self.selected_annotation = None
         self.undo_stack = []  # Stack for undo operations
         self.max_undo = 50    # Maximum undo history
         self.hover_annotation = None  # For hover preview
 
         self.setup_ui()
+        # Annotations are drawn on their own layer above the cached page raster
+        self.annotation_layer = self._create_annotation_layer()
+        self._base_layer_key = None
+        self.tile_view = TiledPageView(self.canvas, self.page_cache)
+        self.zoomer = ProgressiveZoom(self.root, self.canvas, self.page_cache, self.prefetcher)
+        self.stroke_preview = StrokePreview(self.root, self.canvas)  # one live item per stroke
+        self.word_index = WordIndex()  # words per page, built in the background on load
+        self.ocr_pool = OcrWorkerPool(self.root)  # highlight OCR off the Tk thread
+        self._highlight_ocr_job = None
+        self._highlight_ocr_claim = None  # (annotation, job) picked from the menu before OCR finished
+        self._highlight_ocr_fill = None   # (annotation, fill) of the open prefill dialog
+        self.scroll_view = ContinuousPageView(
+            self.canvas, self.page_cache, self.prefetcher, self._create_annotation_layer,
+            lambda page: self.annotations.on_page(page), self.go_to_page
+        )
+        # Manager stats sync runs in the background after a quiet period, never on redraw
+        self.stats_sync = StatsSyncScheduler(
+            self.root, self._manager_stats_snapshot,
+            lambda snapshot: self.sync_manager_stats_only(snapshot=snapshot)
+        )
+        self.root.protocol("WM_DELETE_WINDOW", self.on_app_close)
         self.current_sr_no = self.get_next_sr_no()
         
         base = get_app_base_dir()
@@ -426,8 +483,8 @@ class CircuitInspector:
             if not isinstance(pts[0], (list, tuple)):
                 return (pts[0] / scale, pts[1] / scale)
         
-        # Handle list of points
-        return [(x / scale, y / scale) for x, y in pts]
+        # Handle list/array of points - one batched array operation
+        return scale_points(pts, 1.0 / scale)
 
     def page_to_display_coords(self, pts):
         """Convert page-space coordinates to display-space coordinates."""
@@ -438,8 +495,8 @@ class CircuitInspector:
             if not isinstance(pts[0], (list, tuple)):
                 return (pts[0] * scale, pts[1] * scale)
         
-        # Handle list of points
-        return [(x * scale, y * scale) for x, y in pts]
+        # Handle list/array of points - one batched array operation
+        return scale_points(pts, scale)
 
     def bbox_page_to_display(self, bbox_page):
         scale = self.page_to_display_scale()
@@ -451,6 +508,18 @@ class CircuitInspector:
         x1, y1, x2, y2 = bbox_display
         return (x1 / scale, y1 / scale, x2 / scale, y2 / scale)
 
+    def get_display_page_size(self):
+        """(width, height) of the current page in display pixels"""
+        if self.current_page_image is not None:
+            return self.current_page_image.size
+        return self.tile_view.page_size
+
+    def get_display_region(self, x1, y1, x2, y2):
+        """RGB pixels of a display-space region - rendered on demand in tiled mode"""
+        if self.current_page_image is not None:
+            return image_region(self.current_page_image, x1, y1, x2, y2)
+        return self.tile_view.render_region(x1, y1, x2, y2)
+
     # ================================================================
     # HIGHLIGHTER HELPER - AUTO-STRAIGHTEN
     # ================================================================
@@ -462,6 +531,18 @@ class CircuitInspector:
         # Simply return start and end points for a perfectly straight line
         return [points[0], points[-1]]
 
+    def simplify_stroke(self, points_page):
+        """Drop redundant stroke points (RDP). Tolerance is in screen pixels at the current zoom."""
+        tolerance = self.stroke_tolerance_px / self.page_to_display_scale()
+        return simplify_points(points_page, tolerance)
+
+    def load_stroke_points(self, points):
+        """Stroke points from a session file - simplified unless raw points are kept"""
+        points = as_points(points)
+        if self.keep_raw_stroke_points:
+            return points
+        return self.simplify_stroke(points)
+
     # ================================================================
     # MOUSE EVENT HANDLERS - HIGHLIGHTER INTEGRATED
     # ================================================================
@@ -475,6 +556,13 @@ class CircuitInspector:
         x = self.canvas.canvasx(event.x)
         y = self.canvas.canvasy(event.y)
 
+        if self.continuous_scroll and self.scroll_view.page_at(y) != self.current_page:
+            # Capture belongs to the page under the cursor - it becomes the
+            # current page (at canvas origin), so re-read the coordinates
+            self.go_to_page(self.scroll_view.page_at(y))
+            x = self.canvas.canvasx(event.x)
+            y = self.canvas.canvasy(event.y)
+
         # -------- HIGHLIGHTER MODE --------
         if self.active_highlighter:
             self.drawing = True
@@ -509,38 +597,25 @@ class CircuitInspector:
 
         # -------- HIGHLIGHTER DRAWING --------
         if self.drawing_type == "highlight":
-            if len(self.highlight_points) > 0:
-                last_x, last_y = self.highlight_points[-1]
-                
+            if not self.stroke_preview.active and self.highlight_points:
                 # Get highlighter color
-                rgba = self.highlighter_colors[self.active_highlighter]['rgba']
                 rgb = self.highlighter_colors[self.active_highlighter]['rgb']
                 hex_color = f'#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}'
                 
-                # Draw thick line segment
-                line_id = self.canvas.create_line(
-                    last_x, last_y, x, y,
-                    fill=hex_color,
-                    width=max(15, int(15 * self.zoom_level)),
-                    capstyle=tk.ROUND,
-                    smooth=True
-                )
-                self.temp_line_ids.append(line_id)
+                # One thick live polyline, updated at frame rate
+                self.stroke_preview.begin(self.highlight_points[-1], fill=hex_color,
+                                          width=max(15, int(15 * self.zoom_level)))
             
             self.highlight_points.append((x, y))
+            self.stroke_preview.add_point(x, y)
             return
 
         # -------- PEN TOOL DRAWING --------
         if self.drawing_type == "pen":
-            if len(self.pen_points) > 0:
-                last_x, last_y = self.pen_points[-1]
-                line_id = self.canvas.create_line(
-                    last_x, last_y, x, y,
-                    fill="red", width=3,
-                    capstyle=tk.ROUND, smooth=True
-                )
-                self.temp_line_ids.append(line_id)
+            if not self.stroke_preview.active and self.pen_points:
+                self.stroke_preview.begin(self.pen_points[-1], fill="red", width=3)
             self.pen_points.append((x, y))
+            self.stroke_preview.add_point(x, y)
             return
 
     def on_left_release_with_ocr(self, event):
@@ -554,13 +629,11 @@ class CircuitInspector:
                 # ALWAYS apply straightening for highlighter
                 processed_points = self.straighten_path(self.highlight_points)
                 
-                # Convert to page coordinates
-                points_page = self.display_to_page_coords(processed_points)
+                # Convert to page coordinates and drop redundant points
+                points_page = self.simplify_stroke(self.display_to_page_coords(processed_points))
                 
                 # Calculate bounding box
-                xs = [p[0] for p in points_page]
-                ys = [p[1] for p in points_page]
-                bbox_page = (min(xs), min(ys), max(xs), max(ys))
+                bbox_page = points_bbox(points_page)
                 
                 # Create annotation
                 annotation = {
@@ -574,23 +647,15 @@ class CircuitInspector:
                 
                 # ✨ NEW: Extract text from highlighted area if orange highlighter
                 if self.active_highlighter == 'orange':
-                    print("\n🔍 Extracting text from highlighted area...")
-                    extracted_text = self.extract_text_from_highlight_area(annotation)
-                    
-                    if extracted_text:
-                        annotation['extracted_text'] = extracted_text
-                        print(f"✓ Text extracted: '{extracted_text[:100]}...'")
-                    else:
-                        annotation['extracted_text'] = None
-                        print("⚠️ No text extracted")
-                    
-                    # Show action menu with extracted text
+                    # Show action menu right away - the text is filled in
+                    # by the OCR worker pool when it is ready
+                    annotation['extracted_text'] = None
                     self.handle_error_highlight_with_ocr(annotation)
                 else:
                     # Green/Yellow highlighters - no OCR, just add annotation
                     self.annotations.append(annotation)
                     self.add_to_undo_stack('add_annotation', annotation)
-                    self.display_page()
+                    self.annotation_layer.add(annotation)
             
             self.highlight_points = []
             self.clear_temp_drawings()
@@ -602,7 +667,8 @@ class CircuitInspector:
         # -------- PEN TOOL FINISH - NO CHANGES --------
         if self.drawing_type == "pen":
             if len(self.pen_points) >= 2:
-                points_page = self.display_to_page_coords(self.pen_points)
+                points_page = self.simplify_stroke(self.display_to_page_coords(self.pen_points))
+                print(f"✂️ Pen stroke: {len(self.pen_points)} → {len(points_page)} points")
                 annotation = {
                     'type': 'pen',
                     'page': self.current_page,
@@ -611,11 +677,11 @@ class CircuitInspector:
                 }
                 self.annotations.append(annotation)
                 self.add_to_undo_stack('add_annotation', annotation)
+                self.annotation_layer.add(annotation)
             self.pen_points = []
             self.clear_temp_drawings()
             self.drawing = False
             self.drawing_type = None
-            self.display_page()
             self.update_tool_pane()
             return
 
@@ -633,7 +699,7 @@ class CircuitInspector:
                 }
                 self.annotations.append(annotation)
                 self.add_to_undo_stack('add_annotation', annotation)
-                self.display_page()
+                self.annotation_layer.add(annotation)
             self.drawing = False
             self.drawing_type = None
             self.update_tool_pane()
@@ -669,7 +735,79 @@ class CircuitInspector:
 
     def extract_text_from_highlight_area(self, annotation):
         """Extract text from highlighted area with automatic padding and rotation support - OPTIMIZED"""
-        if self.current_page_image is None:
+        text = self.extract_text_from_text_layer(annotation)
+        if text:
+            return text
+        page_hash = self._highlight_page_hash(annotation)
+        reading = self._cached_highlight_ocr(page_hash, annotation)
+        if reading is None:
+            # Same budget as a pooled job - best partial reading at the deadline
+            with ocr_deadline(time.perf_counter() + OCR_BUDGET_S):
+                region = self._highlight_ocr_region(annotation)
+                if region is None:
+                    return None
+                reading = self._ocr_highlight_region(*region)
+            self._store_highlight_ocr(page_hash, annotation, reading)
+        return reading['text'] if reading else None
+
+    def extract_text_from_text_layer(self, annotation):
+        """Words under a highlight from the word index (or the PDF text layer while
+        the page is not indexed yet), in reading order (None if none)"""
+        bbox_page = annotation.get('bbox_page')
+        if not self.pdf_document or not bbox_page:
+            return None
+        
+        try:
+            start = time.perf_counter()
+            page_number = annotation.get('page', self.current_page)
+            # Word index first (text layer or full-page OCR, built on load)
+            text = self.word_index.lookup(page_number, bbox_page, HIGHLIGHT_PAD, HIGHLIGHT_PAD)
+            source = f"word index, {self.word_index.page_source(page_number)}"
+            if text is None:
+                text = text_in_rect(self.pdf_document[page_number], bbox_page, HIGHLIGHT_PAD, HIGHLIGHT_PAD)
+                source = "text layer"
+            text = self.clean_ocr_text(text)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if text:
+                print(f"📄 Highlight text from {source} ({elapsed_ms:.0f} ms): '{text}'")
+            else:
+                print(f"📄 No words under highlight in {source} ({elapsed_ms:.0f} ms) - using OCR")
+            return text
+        except Exception as e:
+            print(f"⚠️ Text layer lookup failed: {e}")
+            return None
+
+    def _highlight_page_hash(self, annotation):
+        """Content hash of the highlight's page (None if unavailable)"""
+        try:
+            return page_content_hash(self.pdf_document, annotation.get('page', self.current_page))
+        except Exception as e:
+            print(f"⚠️ Page hash failed: {e}")
+            return None
+
+    def _cached_highlight_ocr(self, page_hash, annotation):
+        """Earlier OCR reading of (nearly) the same region of identical page content"""
+        cache = shared_content_cache()
+        if cache is None or page_hash is None or not annotation.get('bbox_page'):
+            return None
+        reading = cache.get_ocr_region(page_hash, annotation['bbox_page'], HIGHLIGHT_OCR_PROFILE)
+        if reading is not None:
+            print(f"♻️ OCR cache hit ({reading['rotation']}°, {reading['confidence']:.1f}%): "
+                  f"'{reading['text']}' - {cache.format_stats()}")
+        return reading
+
+    def _store_highlight_ocr(self, page_hash, annotation, reading):
+        cache = shared_content_cache()
+        if cache is not None and page_hash is not None and reading and not reading.get('partial'):
+            cache.put_ocr_region(page_hash, annotation['bbox_page'], HIGHLIGHT_OCR_PROFILE, reading)
+
+    def _highlight_ocr_region(self, annotation):
+        """Highlight rendered from the PDF for OCR, independent of the view zoom (Tk thread)
+        
+        Returns:
+            tuple: (grayscale array, page-space origin, zoom, OCR profile) or None
+        """
+        if not self.pdf_document:
             return None
         
         try:
@@ -677,76 +815,56 @@ class CircuitInspector:
             if not bbox_page:
                 return None
             
-            bbox_display = self.bbox_page_to_display(bbox_page)
-            x1, y1, x2, y2 = bbox_display
-            
-            # ✨ EXPAND BBOX - Add generous padding for OCR
-            PADDING_X = 10  # Horizontal padding
-            PADDING_Y = 20  # Vertical padding (more because text height matters)
-            
-            height, width = self.current_page_image.shape[:2]
+            page = self.pdf_document[annotation.get('page', self.current_page)]
             
-            x1 = max(0, int(x1) - PADDING_X)
-            y1 = max(0, int(y1) - PADDING_Y)
-            x2 = min(width, int(x2) + PADDING_X)
-            y2 = min(height, int(y2) + PADDING_Y)
+            # ✨ EXPAND BBOX - padded more across the text than along it
+            clip = ocr_clip(bbox_page, page.rect)
             
-            crop_width = x2 - x1
-            crop_height = y2 - y1
-            
-            if crop_width < 20 or crop_height < 15:
+            if clip.width < 10 or clip.height < 7.5:
                 print("⚠️ WARNING: Highlighted area too small")
                 return None
             
-            cropped = self.current_page_image[y1:y2, x1:x2]
+            # Re-render just this clip at a zoom that suits tesseract
+            region, zoom, glyphs = render_ocr_region(page, clip)
             
-            if cropped.size == 0:
+            if region.size == 0:
                 return None
-            
-            # Upscale for better OCR (smaller scale for faster processing)
-            h, w = cropped.shape[:2]
-            upscaled = cv2.resize(cropped, (w*2, h*2), interpolation=cv2.INTER_CUBIC)
-            
-            # Convert to grayscale and threshold in one go
-            gray = cv2.cvtColor(upscaled, cv2.COLOR_RGB2GRAY)
-            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            # Segmentation mode, whitelist and orientations from the highlight's shape
+            return region, (clip.x0, clip.y0), zoom, choose_profile(bbox_page, glyphs)
+        
+        except Exception as e:
+            print(f"❌ OCR Error: {e}")
+            return None
+
+    def _ocr_highlight_region(self, region, origin, zoom, profile, should_stop=None):
+        """OCR a rendered highlight region at the profile's rotations, keeping the confident reading.
+
+        Touches no Tk or PDF state, so it runs on the OCR worker pool;
+        should_stop() abandons the orientation passes still outstanding.
+        
+        Returns:
+            dict: text, confidence, rotation, profile and word boxes (page coordinates), or None
+        """
+        reading = None
+        try:
+            # Already grayscale at OCR resolution - no upscale needed
+            _, binary = cv2.threshold(region, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
             
             # Convert to PIL once (reuse for all rotations)
             pil_img = Image.fromarray(binary)
             
-            # Smart rotation strategy: Try 0° first (most common), then others only if needed
-            # First try: Normal orientation (0°)
-            text, confidence = self._ocr_with_confidence(pil_img)
-            
-            # If confidence is high enough (>60%), accept immediately
-            if confidence > 60 and text:
-                cleaned_text = self.clean_ocr_text(text)
-                if cleaned_text and len(cleaned_text) > 1:
-                    print(f"✅ Extracted (0°, {confidence:.1f}%): '{cleaned_text}'")
-                    return cleaned_text
-            
-            # Otherwise, try other rotations
-            best_text = text
-            best_confidence = confidence
-            best_rotation = 0
-            
-            rotations = [
-                (90, pil_img.rotate(270, expand=True), "90°"),   # PIL rotate is counter-clockwise
-                (270, pil_img.rotate(90, expand=True), "270°"),
-                (180, pil_img.rotate(180, expand=True), "180°")
-            ]
-            
-            for angle, rotated_img, label in rotations:
-                text, conf = self._ocr_with_confidence(rotated_img)
-                
-                if conf > best_confidence:
-                    best_confidence = conf
-                    best_text = text
-                    best_rotation = angle
-                    
-                    # Early exit if we find high confidence result
-                    if conf > 70:
-                        break
+            # Candidate orientations run concurrently - a vertical wire label
+            # no longer waits behind a failed horizontal pass
+            best_text, best_confidence, best_rotation, best_words = ocr_orientations(
+                pil_img,
+                lambda img: self._ocr_with_confidence(img, with_words=True, psm=profile.psm,
+                                                      whitelist=profile.whitelist),
+                should_stop=should_stop, orientations=profile.orientations)
+            if should_stop is not None and should_stop():
+                print("⏹️ OCR cancelled")
+                return None
+            remaining = ocr_remaining()
+            partial = remaining is not None and remaining <= 0
             
             if best_text:
                 if best_rotation != 0:
@@ -756,37 +874,59 @@ class CircuitInspector:
                 
                 if cleaned_text and len(cleaned_text) > 1:
                     print(f"✅ Extracted: '{cleaned_text}'")
-                    return cleaned_text
-            
-            print("⚠️ No text found")
-            return None
+                    ox, oy = origin
+                    words = [
+                        [round(x0 / zoom + ox, 2), round(y0 / zoom + oy, 2),
+                         round(x1 / zoom + ox, 2), round(y1 / zoom + oy, 2), word]
+                        for x0, y0, x1, y1, word in image_boxes(best_words, best_rotation, pil_img.size)
+                    ]
+                    reading = {
+                        'text': cleaned_text,
+                        'confidence': round(best_confidence, 1),
+                        'rotation': best_rotation,
+                        'profile': profile.name,
+                        'words': words
+                    }
+                    if partial:
+                        reading['partial'] = True  # out of budget - not cached
+            
+            if reading is None:
+                print("⚠️ No text found")
+            PROFILE_STATS.record(profile, reading)
+            print(f"🎛️ OCR profiles: {PROFILE_STATS.format()}")
+            return reading
                     
         except Exception as e:
             print(f"❌ OCR Error: {e}")
             return None
 
 
-    def _ocr_with_confidence(self, pil_image):
+    def _ocr_with_confidence(self, pil_image, with_words=False, psm=6, whitelist=None):
         """
         Helper method to run OCR and calculate confidence
         
         Args:
             pil_image: PIL Image object
+            with_words: Also return the word boxes
+            psm: Tesseract page segmentation mode (6 - uniform block of text)
+            whitelist: Characters tesseract may output (None - any)
             
         Returns:
-            tuple: (text, average_confidence)
+            tuple: (text, average_confidence), plus [(x0, y0, x1, y1, word), ...]
+                   in image pixels if with_words
         """
         try:
             # Get OCR data with confidence scores
-            ocr_data = pytesseract.image_to_data(
+            ocr_data = OCR_ENGINE.image_to_data(
                 pil_image, 
                 lang='eng', 
-                config='--psm 6',  # Assume uniform block of text
-                output_type=pytesseract.Output.DICT
+                psm=psm,
+                whitelist=whitelist
             )
             
             text_parts = []
             confidences = []
+            boxes = []
             
             # Extract words with valid confidence
             for i, conf in enumerate(ocr_data['conf']):
@@ -795,17 +935,20 @@ class CircuitInspector:
                     if word:
                         text_parts.append(word)
                         confidences.append(conf)
+                        left, top = ocr_data['left'][i], ocr_data['top'][i]
+                        boxes.append((left, top, left + ocr_data['width'][i],
+                                      top + ocr_data['height'][i], word))
             
             if text_parts:
                 text = ' '.join(text_parts)
                 avg_confidence = sum(confidences) / len(confidences)
-                return text, avg_confidence
+                return (text, avg_confidence, boxes) if with_words else (text, avg_confidence)
             
-            return None, 0
+            return (None, 0, []) if with_words else (None, 0)
             
         except Exception as e:
             print(f"⚠️ OCR processing error: {e}")
-            return None, 0
+            return (None, 0, []) if with_words else (None, 0)
 
 
     def clean_ocr_text(self, text):
@@ -848,7 +991,7 @@ class CircuitInspector:
         """
         Simplified OCR extraction - Just upscale and try
         """
-        if self.current_page_image is None:
+        if self.current_page_image is None and not self.tile_view.active:
             print("❌ No image loaded")
             return None
         
@@ -861,7 +1004,7 @@ class CircuitInspector:
             x1, y1, x2, y2 = map(int, bbox_display)
             
             # Get image dimensions
-            height, width = self.current_page_image.shape[:2]
+            width, height = self.get_display_page_size()
             
             # Clip to image bounds
             x1 = max(0, min(x1, width))
@@ -870,7 +1013,7 @@ class CircuitInspector:
             y2 = max(0, min(y2, height))
             
             # Crop
-            cropped = self.current_page_image[y1:y2, x1:x2]
+            cropped = self.get_display_region(x1, y1, x2, y2)
             
             print(f"Cropped area: {cropped.shape}")
             
@@ -899,7 +1042,7 @@ class CircuitInspector:
             
             # OCR
             pil_img = Image.fromarray(binary)
-            text = pytesseract.image_to_string(pil_img, lang='eng', config='--psm 6')
+            text = OCR_ENGINE.image_to_string(pil_img, lang='eng', psm=6)
             
             # Clean
             text = ' '.join(text.split()).strip()
@@ -946,8 +1089,8 @@ class CircuitInspector:
             11, 2
         )
         
-        # Denoise
-        denoised = cv2.fastNlMeansDenoising(thresh)
+        # Denoise - falls back to a fast filter near the OCR deadline
+        denoised = denoise(thresh)
         
         # Convert back to PIL
         return Image.fromarray(denoised)
@@ -981,13 +1124,104 @@ class CircuitInspector:
         
         return text if text else None
 
+    def start_highlight_ocr(self, annotation, menu):
+        """Read the highlight from the text layer, or crop it now and OCR it on
+        the worker pool. Returns the OCR job, or None if no OCR is needed."""
+        text = self.extract_text_from_text_layer(annotation)
+        if text:
+            annotation['extracted_text'] = text
+            return None
+        page_hash = self._highlight_page_hash(annotation)
+        reading = self._cached_highlight_ocr(page_hash, annotation)
+        if reading is not None:
+            annotation['extracted_text'] = reading['text']
+            return None
+        region = self._highlight_ocr_region(annotation)
+        if region is None:
+            print("⚠️ No text extracted")
+            return None
+        print("\n🔍 Extracting text from highlighted area...")
+        return self.ocr_pool.submit(
+            self._ocr_highlight_region, *region,
+            on_done=lambda reading: self._on_highlight_ocr_done(annotation, reading, menu, page_hash)
+        )
+
+    def _on_highlight_ocr_done(self, annotation, reading, menu, page_hash):
+        """OCR result (Tk thread) - cache it, store the text and replace the menu's placeholder"""
+        self._store_highlight_ocr(page_hash, annotation, reading)
+        text = reading['text'] if reading else None
+        annotation['extracted_text'] = text
+        if text:
+            print(f"✓ Text extracted: '{text[:100]}...'")
+        else:
+            print("⚠️ No text extracted")
+        try:
+            menu.entryconfig(0, label=self._highlight_text_label(text))
+        except tk.TclError:
+            pass  # menu already destroyed
+        if self._highlight_ocr_fill is not None and self._highlight_ocr_fill[0] is annotation:
+            self._highlight_ocr_fill[1](text)
+
+    @staticmethod
+    def _highlight_text_label(text):
+        if not text:
+            return "📖 No text found"
+        return f"📖 {text[:40]}{'…' if len(text) > 40 else ''}"
+
+    def _highlight_ocr_text(self, annotation):
+        """Text for the chosen menu action - never waits for OCR.
+
+        A job still running is claimed instead: the next prefill prompt
+        opens at once and the job's callback fills it in.
+        """
+        job, self._highlight_ocr_job = self._highlight_ocr_job, None
+        if job is not None and not job.delivered:
+            self._highlight_ocr_claim = (annotation, job)
+        return annotation.get('extracted_text', None)
+
+    def _ask_ocr_prefilled(self, title, prompt, prefill_text):
+        """askstring pre-filled with the highlight text - or with OCR still running, when it finishes"""
+        claim, self._highlight_ocr_claim = self._highlight_ocr_claim, None
+        if claim is not None:
+            annotation, job = claim
+            prefill_text = prefill_text or annotation.get('extracted_text')
+            if not job.delivered and not job.cancelled:
+                print("⏳ OCR still running - the text is filled in when it finishes")
+                return ask_ocr_prefilled(
+                    self.root, title, prompt, prefill_text,
+                    register=lambda fill: setattr(self, '_highlight_ocr_fill',
+                                                  (annotation, fill) if fill else None)
+                )
+        return simpledialog.askstring(title, prompt, parent=self.root,
+                                      initialvalue=prefill_text or "")
+
+    def _cancel_highlight_ocr(self, job):
+        """Menu dismissed - drop its OCR job unless an action claimed it"""
+        if job is not None and job is self._highlight_ocr_job:
+            self._highlight_ocr_job = None
+            if not job.done:
+                job.cancel()
+                print("⏹️ Highlight OCR cancelled (menu dismissed)")
+
     def handle_error_highlight_with_ocr(self, annotation):
         """Handle orange error highlight with OCR-extracted text pre-filled"""
         
-        extracted_text = annotation.get('extracted_text', None)
-        
         menu = Menu(self.root, tearoff=0)
 
+        # OCR runs while the menu is open; the first entry shows the text
+        self._cancel_highlight_ocr(self._highlight_ocr_job)
+        self._highlight_ocr_claim = None  # a previous pick that never opened a prompt
+        job = self._highlight_ocr_job = self.start_highlight_ocr(annotation, menu)
+        if job is None:
+            label = self._highlight_text_label(annotation.get('extracted_text'))
+        else:
+            label = "📖 Reading…"
+        menu.add_command(label=label, state=tk.DISABLED)
+        menu.add_separator()
+        if job is not None:
+            menu.bind("<Unmap>", lambda e, j=job:
+                      self.root.after(DISMISS_GRACE_MS, self._cancel_highlight_ocr, j))
+
         for cat in self.categories:
             mode = cat.get("mode", "parent")
             
@@ -995,8 +1229,8 @@ class CircuitInspector:
             if mode == "wiring_selector":
                 menu.add_command(
                     label=f"🔧 {cat['name']}",
-                    command=lambda c=cat, ann=annotation, txt=extracted_text: 
-                        self.handle_wiring_selector_with_ocr(c, ann, txt)
+                    command=lambda c=cat, ann=annotation: 
+                        self.handle_wiring_selector_with_ocr(c, ann, self._highlight_ocr_text(ann))
                 )
             
             # ========== TEMPLATE MODE ==========
@@ -1009,8 +1243,8 @@ class CircuitInspector:
                 
                 menu.add_command(
                     label=label,
-                    command=lambda c=cat, ann=annotation, txt=extracted_text: 
-                        self.handle_template_category_highlight_with_ocr(c, ann, txt)
+                    command=lambda c=cat, ann=annotation: 
+                        self.handle_template_category_highlight_with_ocr(c, ann, self._highlight_ocr_text(ann))
                 )
             
             # ========== PARENT MODE ==========
@@ -1024,8 +1258,8 @@ class CircuitInspector:
                         label = sub['name']
                     cat_menu.add_command(
                         label=label,
-                        command=lambda c=cat, s=sub, ann=annotation, txt=extracted_text: 
-                            self.handle_subcategory_highlight_with_ocr(c, s, ann, txt)
+                        command=lambda c=cat, s=sub, ann=annotation: 
+                            self.handle_subcategory_highlight_with_ocr(c, s, ann, self._highlight_ocr_text(ann))
                     )
                 
                 menu.add_cascade(label=f"🔧 {cat['name']}", menu=cat_menu)
@@ -1033,13 +1267,17 @@ class CircuitInspector:
         menu.add_separator()
         menu.add_command(
             label="📝 Custom Action Point",
-            command=lambda ann=annotation, txt=extracted_text: 
-                self.log_custom_error_highlight_with_ocr(ann, txt)
+            command=lambda ann=annotation: 
+                self.log_custom_error_highlight_with_ocr(ann, self._highlight_ocr_text(ann))
         )
 
         x = self.root.winfo_pointerx()
         y = self.root.winfo_pointery()
         menu.tk_popup(x, y)
+        if job is not None and sys.platform == 'win32':
+            # Native popup menus are modal on Windows and send no <Unmap> -
+            # tk_popup returns once the menu has closed
+            self.root.after(DISMISS_GRACE_MS, self._cancel_highlight_ocr, job)
 
 
     # ============================================================================
@@ -1072,12 +1310,16 @@ class CircuitInspector:
                 initial_value = prefill_text
                 print(f"✓ Pre-filling with OCR text: '{prefill_text[:50]}...'")
             
-            val = simpledialog.askstring(
-                "Input Required", 
-                inp["label"], 
-                parent=self.root,
-                initialvalue=initial_value  # ✨ Pre-filled!
-            )
+            if i == 0:
+                # OCR still running fills the entry in when it finishes
+                val = self._ask_ocr_prefilled("Input Required", inp["label"], initial_value)
+            else:
+                val = simpledialog.askstring(
+                    "Input Required", 
+                    inp["label"], 
+                    parent=self.root,
+                    initialvalue=initial_value
+                )
             
             if not val:
                 return None
@@ -1269,7 +1511,8 @@ class CircuitInspector:
             self.write_cell(ws, row_num, self.punch_cols['checked_date'], 
                           datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
-            wb.save(self.excel_file)
+            with EXCEL_LOCK:
+                wb.save(self.excel_file)
             wb.close()
 
             updated = self.update_interphase_status_for_ref(ref_no, status='NOK')
@@ -1292,8 +1535,9 @@ class CircuitInspector:
             self.annotations.append(annotation)
             self.current_sr_no = self.get_next_sr_no()
             
-            # Redraw to show the color change from orange to red
-            self.display_page()
+            # Draw only the new punch on the annotation layer
+            self.annotation_layer.add(annotation)
+            self.thumbnail_bar.refresh_badges()  # new punch on this page
 
             print(f"✓ Logged: Ref {ref_no}, SR {sr_no_assigned}")
             self._flash_status(f"✓ Logged Ref {ref_no}", bg='#10b981')
@@ -1305,7 +1549,7 @@ class CircuitInspector:
                     component_type,
                     error_name
                 )
-                self.sync_manager_stats_only()
+                self.stats_sync.mark_dirty('punch logged')
             except Exception as e:
                 print(f"Manager category logging failed: {e}")
 
@@ -1370,7 +1614,8 @@ class CircuitInspector:
             self.write_cell(ws, row_num, self.punch_cols['checked_date'], 
                           datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
-            wb.save(self.excel_file)
+            with EXCEL_LOCK:
+                wb.save(self.excel_file)
             wb.close()
 
             updated = self.update_interphase_status_for_ref(ref_no, status='NOK')
@@ -1390,7 +1635,8 @@ class CircuitInspector:
 
             self.annotations.append(annotation)
             self.current_sr_no = self.get_next_sr_no()
-            self.display_page()
+            self.annotation_layer.add(annotation)
+            self.thumbnail_bar.refresh_badges()  # new punch on this page
 
             print(f"✓ Logged: Ref {ref_no}, SR {sr_no_assigned}")
             self._flash_status(f"✓ Logged Ref {ref_no}", bg='#10b981')
@@ -1402,7 +1648,7 @@ class CircuitInspector:
                     component_type,
                     error_name
                 )
-                self.sync_manager_stats_only()
+                self.stats_sync.mark_dirty('punch logged')
             except Exception as e:
                 print(f"Manager category logging failed: {e}")
 
@@ -1418,11 +1664,10 @@ class CircuitInspector:
         """Log custom error with OCR pre-fill"""
         try:
             # Pre-fill with OCR text
-            custom_action = simpledialog.askstring(
+            custom_action = self._ask_ocr_prefilled(
                 "Custom Action Point",
                 "Enter the action point / punch description:",
-                parent=self.root,
-                initialvalue=extracted_text if extracted_text else ""
+                extracted_text
             )
             
             if not custom_action:
@@ -1480,7 +1725,8 @@ class CircuitInspector:
             self.write_cell(ws, row_num, self.punch_cols['checked_date'], 
                           datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
-            wb.save(self.excel_file)
+            with EXCEL_LOCK:
+                wb.save(self.excel_file)
             wb.close()
 
             annotation['component'] = custom_category
@@ -1493,7 +1739,8 @@ class CircuitInspector:
 
             self.annotations.append(annotation)
             self.current_sr_no = self.get_next_sr_no()
-            self.display_page()
+            self.annotation_layer.add(annotation)
+            self.thumbnail_bar.refresh_badges()  # new punch on this page
 
             print(f"✓ Logged custom: Ref {ref_no}, SR {sr_no_assigned}")
             self._flash_status(f"✓ Custom punch Ref {ref_no}", bg='#8b5cf6')
@@ -1505,7 +1752,7 @@ class CircuitInspector:
                     custom_category,
                     None
                 )
-                self.sync_manager_stats_only()
+                self.stats_sync.mark_dirty('punch logged')
             except Exception as e:
                 print(f"Manager category logging failed: {e}")
 
@@ -1562,109 +1809,136 @@ class CircuitInspector:
 
     def clear_temp_drawings(self):
         """Clear temporary drawing elements from canvas"""
-        for line_id in self.temp_line_ids:
-            try:
-                self.canvas.delete(line_id)
-            except:
-                pass
-        self.temp_line_ids.clear()
+        self.stroke_preview.clear()
 
     # ================================================================
     # DISPLAY PAGE - WITH HIGHLIGHTER, PEN AND TEXT RENDERING
     # ================================================================
 
     def display_page(self):
-        """Render the current PDF page with all annotations"""
+        """Render the current PDF page with all annotations.
+
+        The page is drawn in two layers: a cached base raster that is only
+        rebuilt when the page or zoom changes, and an annotation overlay
+        that is updated incrementally.
+        """
         if not self.pdf_document:
             self.canvas.delete("all")
+            self._base_layer_key = None
+            self.annotation_layer.clear()
+            self.tile_view.deactivate()
+            self.scroll_view.deactivate()
             self.page_label.config(text="Page: 0/0")
+            self.thumbnail_bar.clear()
             return
 
         try:
-            page = self.pdf_document[self.current_page]
-            mat = fitz.Matrix(self.page_to_display_scale(), self.page_to_display_scale())
-            pix = page.get_pixmap(matrix=mat)
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            self.current_page_image = np.array(img)
-            draw = ImageDraw.Draw(img, 'RGBA')
-
-            # Try to load a font for text
-            try:
-                font_size = max(12, int(14 * self.zoom_level))
-                font = ImageFont.truetype("arial.ttf", font_size)
-            except:
-                font = ImageFont.load_default()
-
-            for ann in self.annotations:
-
-                if ann.get('page') != self.current_page:
-                    continue
-
-                ann_type = ann.get('type')
-
-                # -------- HIGHLIGHTER STROKES --------
-                if ann_type == 'highlight' and 'points_page' in ann:
-                    points_page = ann['points_page']
-                    if len(points_page) >= 2:
-                        points_display = self.page_to_display_coords(points_page)
-                        color_key = ann.get('color', 'yellow')
-                        rgba = self.highlighter_colors[color_key]['rgba']
-                        
-                        # Draw thick semi-transparent strokes
-                        stroke_width = max(15, int(15 * self.zoom_level))
-                        for i in range(len(points_display) - 1):
-                            x1, y1 = points_display[i]
-                            x2, y2 = points_display[i + 1]
-                            draw.line([x1, y1, x2, y2], fill=rgba, width=stroke_width)
-                        
-                        # Add closed indicator if applicable
-                        if ann.get('closed_by'):
-                            bbox_display = self.bbox_page_to_display(ann['bbox_page'])
-                            cx = bbox_display[0] + 8
-                            cy = bbox_display[1] + 8
-                            draw.ellipse([cx - 6, cy - 6, cx + 6, cy + 6], fill=(0, 128, 0, 200))
-
-                # -------- PEN STROKES --------
-                elif ann_type == 'pen' and 'points' in ann:
-                    points_page = ann['points']
-                    if len(points_page) >= 2:
-                        points_display = self.page_to_display_coords(points_page)
-                        stroke_width = max(2, int(3 * self.zoom_level))
-                        for i in range(len(points_display) - 1):
-                            x1, y1 = points_display[i]
-                            x2, y2 = points_display[i + 1]
-                            draw.line([x1, y1, x2, y2], fill='red', width=stroke_width)
-
-                # -------- TEXT ANNOTATIONS --------
-                elif ann_type == 'text' and 'pos_page' in ann:
-                    pos_page = ann['pos_page']
-                    pos_display = self.page_to_display_coords(pos_page)
-                    text = ann.get('text', '')
-                    if text:
-                        # Draw text background for visibility
-                        try:
-                            bbox = draw.textbbox(pos_display, text, font=font)
-                            padding = 2
-                            draw.rectangle(
-                                [bbox[0] - padding, bbox[1] - padding,
-                                 bbox[2] + padding, bbox[3] + padding],
-                                fill=(255, 255, 200, 200)
-                            )
-                        except:
-                            pass
-                        draw.text(pos_display, text, fill='red', font=font)
+            scale = self.page_to_display_scale()
+            base_key = self.page_cache.make_key(self.pdf_document, self.current_page, scale)
+            page_annotations = self.annotations.on_page(self.current_page)
+
+            if self.continuous_scroll:
+                # -------- CONTINUOUS SCROLL - neighbouring pages stay on the canvas --------
+                if base_key != self._base_layer_key:
+                    self.tile_view.deactivate()
+                    self.current_page_image = self.scroll_view.show(
+                        self.pdf_document, self.current_page, scale, self.zoom_level)
+                    self._base_layer_key = base_key
+                    self.annotation_layer.rebuild(page_annotations, scale, self.zoom_level)
+                else:
+                    self.annotation_layer.sync(page_annotations)
+                    self.scroll_view.sync_annotations()
+            elif base_key != self._base_layer_key:
+                # Keep annotation items - the vector layer rescales them in place
+                self.canvas.delete("!" + self.annotation_layer.TAG)
+                if should_tile(self.pdf_document, self.current_page, scale, self.tiled_rendering):
+                    # -------- TILED BASE LAYER - only the visible region is rasterized --------
+                    self.current_page_image = None
+                    self.photo = None
+                    self.tile_view.load(self.pdf_document, self.current_page, scale)
+                    viewport = self.tile_view.visible_rect()
+                else:
+                    # -------- BASE LAYER - page or zoom changed --------
+                    self.tile_view.deactivate()
+                    base_img = self.page_cache.get_page_image(self.pdf_document, self.current_page, scale)
+                    # Shared with the cache, read-only - OCR crops only the region it needs
+                    self.current_page_image = base_img
+                    RASTER_STATS.record(copies_avoided=1, bytes_saved=image_nbytes(base_img))
+                    self.photo = ImageTk.PhotoImage(base_img)
+                    self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo, tags='page_base')
+                    self.canvas.config(scrollregion=self.canvas.bbox(tk.ALL))
+                    self.prefetcher.request(self.pdf_document, self.current_page, scale)
+                    viewport = None
+                self.canvas.tag_lower('page_base')
+                self._base_layer_key = base_key
+                self.annotation_layer.rebuild(page_annotations, scale, self.zoom_level, viewport)
+            else:
+                # -------- ANNOTATION-ONLY REDRAW --------
+                self.annotation_layer.sync(page_annotations)
 
-            self.photo = ImageTk.PhotoImage(img)
-            self.canvas.delete("all")
-            self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
-            self.canvas.config(scrollregion=self.canvas.bbox(tk.ALL))
             self.page_label.config(text=f"Page: {self.current_page + 1}/{len(self.pdf_document)}")
-            self.sync_manager_stats_only()
+            self.thumbnail_bar.show(self.pdf_document, self.current_page, self._thumbnail_cache_dir())
             self.update_tool_pane()
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to display page: {e}")
 
+    def _on_canvas_scrolled(self, scrollbar, first, last):
+        """Canvas scroll callback - keep the scrollbar in sync and fill in tiles"""
+        scrollbar.set(first, last)
+        self._schedule_tile_update()
+        self.scroll_view.schedule_update()
+
+    def _schedule_tile_update(self, event=None):
+        if self.tile_view.active and not self._tile_update_pending:
+            self._tile_update_pending = True
+            self.root.after_idle(self._update_visible_tiles)
+
+    def _update_visible_tiles(self):
+        """Render tiles (and draw culled annotations) that scrolled into view"""
+        self._tile_update_pending = False
+        if not self.tile_view.active:
+            return
+        self.tile_view.update_visible()
+        page_annotations = self.annotations.on_page(self.current_page)
+        self.annotation_layer.set_viewport(self.tile_view.visible_rect(), page_annotations)
+
+    def _create_annotation_layer(self):
+        """Build the annotation layer for the current annotation_render_mode"""
+        layer_cls = VectorAnnotationLayer if self.annotation_render_mode == 'vector' else AnnotationOverlay
+        return layer_cls(self.canvas, self.highlighter_colors)
+
+    def _thumbnail_cache_dir(self):
+        """Thumbnails folder next to the cabinet's Sessions folder (None before project setup)"""
+        return thumbnail_cache_dir(self.project_dirs.get("sessions", ""))
+
+    def _build_word_index(self):
+        """Index the loaded PDF's words in the background, stored next to the session"""
+        if self.current_pdf_path:
+            self.word_index.build(self.current_pdf_path, word_index_path(
+                self.project_dirs.get("sessions", ""), getattr(self, 'cabinet_id', '')))
+
+    def toggle_continuous_scroll(self):
+        """Switch between single-page view and one continuous strip of pages"""
+        self.continuous_scroll = self.continuous_scroll_var.get()
+        self.zoomer.cancel()
+        self.scroll_view.deactivate()
+        self.tile_view.deactivate()
+        self.canvas.delete('page_base')
+        self._base_layer_key = None
+        self.display_page()
+        print(f"📜 Continuous scroll: {'on' if self.continuous_scroll else 'off'}")
+
+    def toggle_vector_annotations(self):
+        """Switch between raster (RGBA patch) and vector (canvas item) annotations"""
+        self.annotation_layer.clear()
+        self.scroll_view.deactivate()  # neighbouring pages get layers of the new kind
+        self.annotation_render_mode = 'vector' if self.vector_annotations_var.get() else 'raster'
+        self.annotation_layer = self._create_annotation_layer()
+        self._base_layer_key = None
+        self.display_page()
+        print(f"🖌️ Annotation layer: {self.annotation_render_mode}")
+
     # ================================================================
     # SAVE SESSION - WITH HIGHLIGHTER SERIALIZATION
     # ================================================================
@@ -1704,7 +1978,7 @@ class CircuitInspector:
 
             # ===== HIGHLIGHTER ANNOTATIONS - Convert tuples to lists =====
             if 'points_page' in entry:
-                entry['points_page'] = [[float(x), float(y)] for x, y in entry['points_page']]
+                entry['points_page'] = to_json(entry['points_page'])
             
             # ===== BBOX for highlights and old rectangles =====
             if 'bbox_page' in entry:
@@ -1712,7 +1986,7 @@ class CircuitInspector:
 
             # ===== PEN STROKES - Convert tuples to lists =====
             if 'points' in entry:
-                entry['points'] = [[float(x), float(y)] for x, y in entry['points']]
+                entry['points'] = to_json(entry['points'])
 
             # ===== TEXT ANNOTATIONS - Convert tuple to list =====
             if 'pos_page' in entry:
@@ -1725,7 +1999,7 @@ class CircuitInspector:
 
             data['annotations'].append(entry)
         
-        self.sync_manager_stats_only()
+        self.stats_sync.sync_now()
 
         try:
             with open(save_path, 'w', encoding='utf-8') as f:
@@ -1752,7 +2026,7 @@ class CircuitInspector:
             return
 
         self.load_session_from_path(path)
-        self.sync_manager_stats_only()
+        self.stats_sync.mark_dirty('session loaded')
 
     def load_session_from_path(self, path):
         """Load session from a specific JSON file path with all annotation types"""
@@ -1764,6 +2038,7 @@ class CircuitInspector:
             return
 
         # Restore basic state
+        self.stats_sync.flush()  # a pending sync belongs to the previous cabinet
         self.project_name = data.get('project_name', self.project_name)
         self.sales_order_no = data.get('sales_order_no', self.sales_order_no)
         self.cabinet_id = data.get('cabinet_id', getattr(self, "cabinet_id", ""))
@@ -1775,17 +2050,22 @@ class CircuitInspector:
         self.session_refs = set(data.get('session_refs', []))
 
         # Restore annotations with proper type conversion
-        self.annotations = []
+        self.annotations = AnnotationStore()
         highlight_count = 0
         pen_count = 0
         text_count = 0
         
+        raw_point_count = 0
+        kept_point_count = 0
+
         for entry in data.get('annotations', []):
             ann = entry.copy()
 
             # ===== HIGHLIGHTER ANNOTATIONS - Convert lists to tuples =====
             if 'points_page' in ann:
-                ann['points_page'] = [(float(p[0]), float(p[1])) for p in ann['points_page']]
+                raw_point_count += len(ann['points_page'])
+                ann['points_page'] = self.load_stroke_points(ann['points_page'])
+                kept_point_count += len(ann['points_page'])
                 highlight_count += 1
             
             # ===== BBOX - Convert list back to tuple =====
@@ -1794,7 +2074,9 @@ class CircuitInspector:
 
             # ===== PEN STROKES - Convert lists to tuples =====
             if 'points' in ann:
-                ann['points'] = [(float(p[0]), float(p[1])) for p in ann['points']]
+                raw_point_count += len(ann['points'])
+                ann['points'] = self.load_stroke_points(ann['points'])
+                kept_point_count += len(ann['points'])
                 pen_count += 1
 
             # ===== TEXT ANNOTATIONS - Convert list to tuple =====
@@ -1813,6 +2095,9 @@ class CircuitInspector:
             if ann.get('ref_no'):
                 self.session_refs.add(str(ann['ref_no']).strip())
 
+        if raw_point_count != kept_point_count:
+            print(f"✂️ Simplified stored strokes: {raw_point_count} → {kept_point_count} points")
+
         self.display_page()
         
 
@@ -1871,37 +2156,17 @@ class CircuitInspector:
     def transform_highlight_points_for_rotation(self, points, page):
         """Transform highlighter stroke points for page rotation
         
-        Highlighters store a list of (x, y) tuples representing the stroke path.
-        Each point needs to be individually transformed based on page rotation.
+        Highlighters store the stroke path as an (N, 2) array. The whole
+        stroke is mapped in one affine array operation.
         
         Args:
-            points: List of (x, y) tuples representing the highlight stroke
+            points: (N, 2) array or list of (x, y) tuples for the highlight stroke
             page: PyMuPDF page object with rotation info
             
         Returns:
-            List of fitz.Point objects, transformed for the page rotation
+            (N, 2) NumPy array, transformed for the page rotation
         """
-        r = page.rotation
-        w = page.rect.width
-        h = page.rect.height
-        
-        transformed_points = []
-        
-        for point in points:
-            x, y = point
-            
-            if r == 0:
-                transformed_points.append(fitz.Point(x, y))
-            elif r == 90:
-                transformed_points.append(fitz.Point(y, w - x))
-            elif r == 180:
-                transformed_points.append(fitz.Point(w - x, h - y))
-            elif r == 270:
-                transformed_points.append(fitz.Point(h - y, x))
-            else:
-                transformed_points.append(fitz.Point(x, y))
-        
-        return transformed_points
+        return rotate_points(points, page.rotation, page.rect.width, page.rect.height)
     def get_text_position_for_highlight(self, rect, page):
         """Get the correct position for text beside a highlight annotation based on page rotation
         
@@ -1963,7 +2228,7 @@ class CircuitInspector:
                     pass
     
             # Draw annotations
-            for ann in self.annotations:
+            for ann in self.annotations.in_pages(range(len(out_doc))):
                 p = ann.get('page')
                 if p is None or p < 0 or p >= len(out_doc):
                     continue
@@ -1986,11 +2251,8 @@ class CircuitInspector:
                             target_page
                         )
                         
-                        # Convert to list of tuples for ink annotation
-                        stroke = [(pt.x, pt.y) for pt in transformed_points]
-                        
-                        if len(stroke) >= 2:
-                            ink_list = [stroke]  # Wrap in list for PyMuPDF
+                        if len(transformed_points) >= 2:
+                            ink_list = stroke_list([transformed_points])  # Wrap in list for PyMuPDF
                             annot = target_page.add_ink_annot(ink_list)
                             annot.set_colors(stroke=color)
                             annot.set_border(width=15)  # Thick highlighter stroke
@@ -2044,16 +2306,13 @@ class CircuitInspector:
                     points = ann['points']
                     if len(points) >= 2:
                         # Transform points for rotation
-                        transformed_points = [
-                            self.transform_point_for_rotation(pt, target_page) 
-                            for pt in points
-                        ]
+                        transformed_points = rotate_points(
+                            points, target_page.rotation,
+                            target_page.rect.width, target_page.rect.height
+                        )
                         
-                        # Draw lines between consecutive points
-                        for i in range(len(transformed_points) - 1):
-                            p1 = transformed_points[i]
-                            p2 = transformed_points[i + 1]
-                            target_page.draw_line(p1, p2, color=(1, 0, 0), width=2)
+                        # Draw the stroke as one polyline
+                        target_page.draw_polyline(transformed_points.tolist(), color=(1, 0, 0), width=2)
     
                 # -------- TEXT ANNOTATIONS --------
                 elif ann_type == 'text' and 'pos_page' in ann:
@@ -2075,7 +2334,7 @@ class CircuitInspector:
     
             out_doc.save(save_path)
             out_doc.close()
-            self.sync_manager_stats_only()
+            self.stats_sync.mark_dirty('pdf exported')
     
         except PermissionError:
             messagebox.showerror("Error", "Close the target file (if open) and try again.")
@@ -2127,6 +2386,16 @@ class CircuitInspector:
         view_menu.add_command(label="Zoom In", command=self.zoom_in, accelerator="Ctrl++")
         view_menu.add_command(label="Zoom Out", command=self.zoom_out, accelerator="Ctrl+-")
         view_menu.add_command(label="Reset Zoom", command=lambda: setattr(self, 'zoom_level', 1.0) or self.display_page())
+        view_menu.add_separator()
+        self.vector_annotations_var = tk.BooleanVar(value=self.annotation_render_mode == 'vector')
+        view_menu.add_checkbutton(label="Vector Annotation Layer", variable=self.vector_annotations_var,
+                                  command=self.toggle_vector_annotations)
+        self.continuous_scroll_var = tk.BooleanVar(value=self.continuous_scroll)
+        view_menu.add_checkbutton(label="Continuous Scroll", variable=self.continuous_scroll_var,
+                                  command=self.toggle_continuous_scroll)
+        self.thumbnails_var = tk.BooleanVar(value=True)
+        view_menu.add_checkbutton(label="Page Thumbnails", variable=self.thumbnails_var,
+                                  command=lambda: self.thumbnail_bar.set_visible(self.thumbnails_var.get()))
         
         # Keyboard shortcuts
         self.root.bind_all("<Control-o>", lambda e: self.load_pdf())
@@ -2313,6 +2582,11 @@ class CircuitInspector:
         canvas_frame = tk.Frame(self.root, bg='#f1f5f9')
         canvas_frame.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
         
+        # Page thumbnails - virtualized strip, rendered in the background and cached on disk
+        self.thumbnail_bar = ThumbnailSidebar(canvas_frame, on_select=self.go_to_page,
+                                              badge_fn=lambda page: self.annotations.punch_counts(page))
+        self.thumbnail_bar.frame.pack(side=tk.LEFT, fill=tk.Y)
+        
         v_scrollbar = tk.Scrollbar(canvas_frame, orient=tk.VERTICAL)
         v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
@@ -2320,13 +2594,14 @@ class CircuitInspector:
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
         
         self.canvas = tk.Canvas(canvas_frame, bg='#f8fafc',
-                               yscrollcommand=v_scrollbar.set,
-                               xscrollcommand=h_scrollbar.set,
+                               yscrollcommand=lambda *a: self._on_canvas_scrolled(v_scrollbar, *a),
+                               xscrollcommand=lambda *a: self._on_canvas_scrolled(h_scrollbar, *a),
                                highlightthickness=0)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         v_scrollbar.config(command=self.canvas.yview)
         h_scrollbar.config(command=self.canvas.xview)
+        self.canvas.bind("<Configure>", self._schedule_tile_update)
         
         # Bind mouse events
         self.canvas.bind("<ButtonPress-1>", self.on_left_press)
@@ -2507,9 +2782,13 @@ class CircuitInspector:
         
         if last_action['type'] == 'add_annotation':
             annotation = last_action['annotation']
-            if annotation in self.annotations:
-                self.annotations.remove(annotation)
-                self.display_page()
+            # Undo stack holds a copy - find the live annotation to drop its overlay item
+            live = next((a for a in self.annotations if annotations_equal(a, annotation)), None)
+            if live is not None:
+                self.annotations.remove(live)
+                self.annotation_layer.remove(live)
+                self.stats_sync.mark_dirty('annotation undone')
+                self.thumbnail_bar.refresh_badges()
                 self._flash_status("✓ Annotation removed", bg='#10b981')
         
         self.update_tool_pane()
@@ -2528,15 +2807,67 @@ class CircuitInspector:
             self.current_page += 1
             self.display_page()
 
+    def go_to_page(self, page):
+        """Jump to a page (thumbnail click)"""
+        if self.pdf_document and 0 <= page < len(self.pdf_document) and page != self.current_page:
+            self.current_page = page
+            self.display_page()
+
+    def zoom_to(self, new_zoom, anchor=None):
+        """Change zoom - show a resampled interim frame now, render sharp in the background.
+
+        Returns True if anchor is already kept under the cursor (interim
+        frame, or the continuous strip), False if the page was redrawn directly.
+        """
+        if not self.pdf_document:
+            self.zoom_level = new_zoom
+            return False
+
+        if self.continuous_scroll:
+            # The strip re-lays out at the new scale and keeps anchor's page
+            # point on screen (without one, the position in the page)
+            self.zoom_level = new_zoom
+            self.zoomer.cancel()
+            self.scroll_view.hold_point(anchor)
+            self.display_page()
+            return True
+
+        old_scale = self.page_to_display_scale()
+        base_img = None
+        if self._base_layer_key is not None and not self.tile_view.active:
+            base_img = self.page_cache.peek(self._base_layer_key)
+
+        self.zoom_level = new_zoom
+        new_scale = self.page_to_display_scale()
+        self.prefetcher.cancel()
+
+        if anchor is None:
+            anchor = (self.canvas.canvasx(self.canvas.winfo_width() / 2),
+                      self.canvas.canvasy(self.canvas.winfo_height() / 2))
+        sharp_key = self.page_cache.make_key(self.pdf_document, self.current_page, new_scale)
+        if (base_img is None or self.page_cache.contains(sharp_key)
+                or should_tile(self.pdf_document, self.current_page, new_scale, self.tiled_rendering)
+                or not self.zoomer.show_interim(base_img, old_scale, new_scale, anchor)):
+            self.zoomer.cancel()
+            self.display_page()
+            return False
+
+        # Annotations follow the interim frame; the sharp base replaces it when ready
+        self._base_layer_key = None
+        self.current_page_image = None
+        self.photo = None
+        self.annotation_layer.rebuild(self.annotations.on_page(self.current_page),
+                                      new_scale, self.zoom_level)
+        self.zoomer.request_sharp(self.pdf_document, self.current_page, new_scale, self.display_page)
+        return True
+
     def zoom_in(self):
         if self.zoom_level < 3.0:
-            self.zoom_level += 0.25
-            self.display_page()
+            self.zoom_to(self.zoom_level + 0.25)
 
     def zoom_out(self):
         if self.zoom_level > 0.5:
-            self.zoom_level -= 0.25
-            self.display_page()
+            self.zoom_to(self.zoom_level - 0.25)
 
     # ================================================================
     # PLACEHOLDER METHODS - Implement from your original code
@@ -2550,10 +2881,13 @@ class CircuitInspector:
         )
         if file_path:
             try:
+                self.stats_sync.flush()  # a pending sync belongs to the previous cabinet
+                self.prefetcher.cancel()  # drop queued renders for the previous PDF
+                self.zoomer.cancel()
                 self.pdf_document = fitz.open(file_path)
                 self.current_pdf_path = file_path
                 self.current_page = 0
-                self.annotations = []
+                self.annotations = AnnotationStore()
                 self.zoom_level = 1.0
                 self.tool_mode = None
                 self.active_highlighter = None
@@ -2565,6 +2899,7 @@ class CircuitInspector:
                 
                 self.ask_project_details()
                 self.prepare_project_folders()
+                self._build_word_index()
 
                 try:
                     self.working_excel_path = os.path.join(
@@ -2710,15 +3045,25 @@ class CircuitInspector:
             
             page = doc[page_number]
             
+            # Same drawing in another cabinet - reuse its OCR
+            disk_cache = self.page_cache.disk_cache
+            page_hash = page_content_hash(doc, page_number) if disk_cache is not None else None
+            cached = disk_cache.get_ocr(page_hash, 'text@2.00') if page_hash else None
+            if cached is not None:
+                doc.close()
+                print(f"♻️ OCR for page {page_number + 1} from content cache")
+                return cached['text']
+            
             # Convert page to image
             pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom for better OCR
-            img_data = pix.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
+            img = pixmap_to_image(pix)  # straight from the sample buffer, no PNG round trip
             
             # Perform OCR
-            text = pytesseract.image_to_string(img)
+            text = OCR_ENGINE.image_to_string(img)
             doc.close()
             
+            if page_hash:
+                disk_cache.put_ocr(page_hash, 'text@2.00', {'text': text})
             return text
         except Exception as e:
             print(f"OCR Error: {e}")
@@ -2934,6 +3279,7 @@ class CircuitInspector:
                                            "This is a new project. Please select a storage location.")
                         return
             
+            self.stats_sync.flush()  # a pending sync belongs to the previous cabinet
             self.cabinet_id = cabinet
             self.project_name = project
             self.sales_order_no = so
@@ -2985,7 +3331,8 @@ class CircuitInspector:
                     r, c = self.split_cell(cells["cabinet_id"])
                     self.write_cell(ws, r, c, self.cabinet_id)
 
-            wb.save(self.excel_file)
+            with EXCEL_LOCK:
+                wb.save(self.excel_file)
             wb.close()
 
         except PermissionError:
@@ -3217,7 +3564,8 @@ class CircuitInspector:
                 self.write_cell(ws, r, status_col, status_value)
                 self.write_cell(ws, r, name_col, username)
                 self.write_cell(ws, r, date_col, current_date)
-                wb.save(checklist_path)
+                with EXCEL_LOCK:
+                    wb.save(checklist_path)
             except PermissionError:
                 messagebox.showerror("File Locked", 
                                    "⚠️ Please close the Excel file and try again.",
@@ -3238,11 +3586,11 @@ class CircuitInspector:
 
         def on_ok():
             do_action_set_status("OK")
-            self.sync_manager_stats_only()
+            self.stats_sync.mark_dirty('checklist reviewed')
 
         def on_nok():
             do_action_set_status("NOK")
-            self.sync_manager_stats_only()
+            self.stats_sync.mark_dirty('checklist reviewed')
 
         def on_na():
             """Handle N/A status with mandatory remark"""
@@ -3274,12 +3622,13 @@ class CircuitInspector:
                 self.write_cell(ws, r, date_col, current_date)
                 self.write_cell(ws, r, name_col, username)
                 self.write_cell(ws, r, remark_col, remark)
-                wb.save(checklist_path)
+                with EXCEL_LOCK:
+                    wb.save(checklist_path)
                 
                 messagebox.showinfo("Remark Saved", 
                                   f"N/A status with remark:\n{remark}",
                                   parent=dlg)
-                self.sync_manager_stats_only()
+                self.stats_sync.mark_dirty('checklist reviewed')
             except PermissionError:
                 messagebox.showerror("File Locked", 
                                    "⚠️ Please close the Excel file and try again.",
@@ -3505,6 +3854,8 @@ class CircuitInspector:
     # ================================================================
     def handover_to_production(self):
         """Handover current cabinet to production with checklist validation"""
+        # Push pending statistics before the cabinet changes hands
+        self.stats_sync.sync_now()
         
         if not self.pdf_document or not self.excel_file:
             messagebox.showwarning("Incomplete", 
@@ -3680,11 +4031,11 @@ class CircuitInspector:
         
         try:
             # Count pages with annotations
-            annotated_pages = len(set(ann['page'] for ann in self.annotations if ann.get('page') is not None))
+            annotated_pages = self.annotations.page_count()
             total_pages = len(self.pdf_document)
             
             # Count punches by type
-            error_anns = [a for a in self.annotations if a.get('type') == 'error']
+            error_anns = self.annotations.of_type('error')
             total_punches = len(error_anns)
             
             # Count from Excel for accuracy
@@ -3829,6 +4180,7 @@ class CircuitInspector:
                     messagebox.showerror("Error", "Project not found in database")
                     return
                 
+                self.stats_sync.flush()  # a pending sync belongs to the previous cabinet
                 self.cabinet_id = item['cabinet_id']
                 self.project_name = item['project_name']
                 self.sales_order_no = item['sales_order_no']
@@ -3840,8 +4192,11 @@ class CircuitInspector:
                     messagebox.showerror("Error", f"PDF file not found:\n{item['pdf_path']}")
                     return
                 
+                self.prefetcher.cancel()  # drop queued renders for the previous PDF
+                self.zoomer.cancel()
                 self.pdf_document = fitz.open(item['pdf_path'])
                 self.current_pdf_path = item['pdf_path']
+                self._build_word_index()
                 self.current_page = 0
                 self.zoom_level = 1.0
                 self.tool_mode = None
@@ -3855,7 +4210,7 @@ class CircuitInspector:
                 if item.get('session_path') and os.path.exists(item['session_path']):
                     self.load_session_from_path(item['session_path'])
                 else:
-                    self.annotations = []
+                    self.annotations = AnnotationStore()
                     self.display_page()
                 
                 # UPDATED: Set status to "Rework being verified"
@@ -4155,9 +4510,7 @@ class CircuitInspector:
             text_widget.insert(tk.END, f"Category: {p['category']}\n")
 
             # Find annotation
-            ann = next((a for a in self.annotations 
-                       if a.get('sr_no') == p['sr_no'] 
-                       or (a.get('excel_row') == p['row'])), None)
+            ann = self.annotations.find_punch(p['sr_no'], p['row'])
             
             if ann and ann.get('quality_remark'):
                 text_widget.insert(tk.END, f"\n──────────────────\n")
@@ -4172,9 +4525,7 @@ class CircuitInspector:
             """Add quality-side remark"""
             p = punches[pos[0]]
             
-            ann = next((a for a in self.annotations 
-                       if a.get('sr_no') == p['sr_no'] 
-                       or (a.get('excel_row') == p['row'])), None)
+            ann = self.annotations.find_punch(p['sr_no'], p['row'])
             
             current_remark = ann.get('quality_remark', '') if ann else ''
             
@@ -4210,7 +4561,8 @@ class CircuitInspector:
                 self.write_cell(ws, p['row'], self.punch_cols['closed_date'], 
                               datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
-                wb.save(self.excel_file)
+                with EXCEL_LOCK:
+                    wb.save(self.excel_file)
                 wb.close()
 
             except PermissionError:
@@ -4222,16 +4574,15 @@ class CircuitInspector:
                 return
 
             # Find and convert annotation color
-            ann = next((a for a in self.annotations 
-                       if a.get('sr_no') == p['sr_no'] 
-                       or (a.get('excel_row') == p['row'])), None)
+            ann = self.annotations.find_punch(p['sr_no'], p['row'])
             
             if ann:
                 if ann.get('type') == 'highlight' and ann.get('color') == 'orange':
                     ann['color'] = 'green'
                     print(f"✓ Converted annotation to green for SR {p['sr_no']}")
                 elif ann.get('type') == 'error':
-                    ann['type'] = 'ok'
+                    ann['type'] = 'ok'
+                    self.annotations.reindex(ann)
                     print(f"✓ Converted error rectangle to OK for SR {p['sr_no']}")
                 
                 ann['closed_by'] = name
@@ -4240,7 +4591,8 @@ class CircuitInspector:
                 print(f"⚠️ Warning: No annotation found for SR {p['sr_no']}")
 
             self.display_page()
-            self.sync_manager_stats_only()
+            self.stats_sync.mark_dirty('punch closed')
+            self.thumbnail_bar.refresh_badges()
 
             if pos[0] < len(punches) - 1:
                 pos[0] += 1
@@ -4420,6 +4772,8 @@ class CircuitInspector:
     # UPDATED: handover_to_production - with checklist check and queue management
     def handover_to_production(self):
         """Handover current cabinet to production with checklist validation"""
+        # Push pending statistics before the cabinet changes hands
+        self.stats_sync.sync_now()
         
         if not self.pdf_document or not self.excel_file:
             messagebox.showwarning("Incomplete", 
@@ -4575,7 +4929,8 @@ class CircuitInspector:
                         updated_any = True
                 
                 if updated_any:
-                    wb.save(self.excel_file)
+                    with EXCEL_LOCK:
+                        wb.save(self.excel_file)
                 wb.close()
                 return updated_any
             except Exception as e:
@@ -4658,7 +5013,7 @@ class CircuitInspector:
                 self.db.add_project(project_data)
             
             self.update_recent_dropdown()
-            self.sync_manager_stats_only()
+            self.stats_sync.mark_dirty('project saved')
             
         except Exception as e:
             print(f"Error saving recent project: {e}")
@@ -4696,6 +5051,7 @@ class CircuitInspector:
         """Load a recent project from database - HIGHLIGHTER VERSION"""
         try:
             # Set project details
+            self.stats_sync.flush()  # a pending sync belongs to the previous cabinet
             self.cabinet_id = project_data['cabinet_id']
             self.project_name = project_data['project_name']
             self.sales_order_no = project_data.get('sales_order_no', '')
@@ -4740,10 +5096,13 @@ class CircuitInspector:
                     return
             
             # Load PDF
+            self.prefetcher.cancel()  # drop queued renders for the previous PDF
+            self.zoomer.cancel()
             self.pdf_document = fitz.open(pdf_path)
             self.current_pdf_path = pdf_path
+            self._build_word_index()
             self.current_page = 0
-            self.annotations = []
+            self.annotations = AnnotationStore()
             self.zoom_level = 1.0
             self.tool_mode = None
             
@@ -4885,17 +5244,22 @@ class CircuitInspector:
             return False
 
 
-    def count_open_punches(self):
+    def count_open_punches(self, excel_file=None):
         """Count open punches in current Excel
         
+        Args:
+            excel_file: Workbook to count (the current Excel if None)
+        
         Returns:
             int: Number of punches that are not closed
         """
+        excel_file = excel_file or self.excel_file
         try:
-            if not self.excel_file or not os.path.exists(self.excel_file):
+            if not excel_file or not os.path.exists(excel_file):
                 return 0
             
-            wb = load_workbook(self.excel_file, data_only=True)
+            with EXCEL_LOCK:
+                wb = load_workbook(excel_file, data_only=True)
             ws = wb[self.punch_sheet_name] if self.punch_sheet_name in wb.sheetnames else wb.active
             
             open_count = 0
@@ -4919,34 +5283,66 @@ class CircuitInspector:
             print(f"Error counting open punches: {e}")
             return 0
         
-    def sync_manager_stats_only(self, update_status_from_interphase=True):
+    def _manager_stats_snapshot(self):
+        """Counts and cabinet identity for the manager sync - taken on the Tk thread"""
+        if not self.pdf_document or not self.cabinet_id:
+            return None
+        return {
+            'annotated_pages': self.annotations.page_count(),
+            'total_pages': len(self.pdf_document),
+            'total_punches': self.annotations.type_count('error'),
+            'cabinet_id': self.cabinet_id,
+            'project_name': self.project_name,
+            'sales_order_no': self.sales_order_no,
+            'excel_file': self.excel_file,
+            'storage_location': getattr(self, 'storage_location', None),
+        }
+
+    def on_app_close(self):
+        """Flush pending manager statistics before the window goes away"""
+        self.stats_sync.flush()
+        self.prefetcher.cancel()
+        self.thumbnail_bar.cancel()
+        self.word_index.cancel()
+        self.ocr_pool.shutdown()
+        disk_cache = shared_content_cache()
+        if disk_cache is not None:
+            disk_cache.flush()  # queued rasters and OCR readings - the writer is a daemon thread
+        self.root.destroy()
+
+    def sync_manager_stats_only(self, update_status_from_interphase=True, snapshot=None):
         """Sync statistics and optionally update status from Interphase
         
         Args:
             update_status_from_interphase: If True, recalculate status from Interphase worksheet
+            snapshot: In-memory counts from _manager_stats_snapshot (taken now if None)
         """
-        if not self.pdf_document or not self.cabinet_id:
+        if snapshot is None:
+            snapshot = self._manager_stats_snapshot()
+        if snapshot is None:
             return
         
         try:
-            # Count pages with annotations
-            annotated_pages = len(set(ann['page'] for ann in self.annotations 
-                                     if ann.get('page') is not None))
-            total_pages = len(self.pdf_document)
-            
-            # Count punches
-            error_anns = [a for a in self.annotations if a.get('type') == 'error']
-            total_punches = len(error_anns)
-            open_punches = self.count_open_punches()
+            # In-memory counts (snapshotted on the Tk thread for background syncs)
+            annotated_pages = snapshot['annotated_pages']
+            total_pages = snapshot['total_pages']
+            total_punches = snapshot['total_punches']
+            # Cabinet identity from the snapshot too - the loaded cabinet may
+            # have changed by the time a background sync runs
+            cabinet_id, project_name = snapshot['cabinet_id'], snapshot['project_name']
+            sales_order_no, storage_location = snapshot['sales_order_no'], snapshot['storage_location']
+            excel_file = snapshot['excel_file']
+            open_punches = self.count_open_punches(excel_file)
             
             # Count implemented and closed
             implemented_punches = 0
             closed_punches = 0
             
-            if self.excel_file and os.path.exists(self.excel_file):
+            if excel_file and os.path.exists(excel_file):
                 try:
                     from openpyxl import load_workbook
-                    wb = load_workbook(self.excel_file, data_only=True)
+                    with EXCEL_LOCK:
+                        wb = load_workbook(excel_file, data_only=True)
                     ws = wb[self.punch_sheet_name] if self.punch_sheet_name in wb.sheetnames else wb.active
                     
                     row = 8
@@ -4974,7 +5370,7 @@ class CircuitInspector:
             conn = sqlite3.connect(self.manager_db.db_path)
             cursor = conn.cursor()
             
-            cursor.execute('SELECT status FROM cabinets WHERE cabinet_id = ?', (self.cabinet_id,))
+            cursor.execute('SELECT status FROM cabinets WHERE cabinet_id = ?', (cabinet_id,))
             existing = cursor.fetchone()
             
             if existing:
@@ -4992,7 +5388,7 @@ class CircuitInspector:
                 ]
                 
                 if update_status_from_interphase and current_status in workflow_statuses:
-                    new_status = self.get_status_from_interphase(self.excel_file)
+                    new_status = self.get_status_from_interphase(excel_file)
                     if new_status:
                         current_status = new_status
                         print(f"✓ Status updated from Interphase: {new_status}")
@@ -5013,13 +5409,13 @@ class CircuitInspector:
                     WHERE cabinet_id = ?
                 ''', (total_pages, annotated_pages, total_punches, open_punches,
                       implemented_punches, closed_punches, current_status,
-                      datetime.now().isoformat(), self.excel_file, 
-                      getattr(self, 'storage_location', None), self.cabinet_id))
+                      datetime.now().isoformat(), excel_file, 
+                      storage_location, cabinet_id))
                 
-                print(f"✓ Updated {self.cabinet_id} - Status: {current_status}")
+                print(f"✓ Updated {cabinet_id} - Status: {current_status}")
             else:
                 # Cabinet doesn't exist - create with initial status from Interphase
-                initial_status = self.get_status_from_interphase(self.excel_file)
+                initial_status = self.get_status_from_interphase(excel_file)
                 if not initial_status:
                     initial_status = 'quality_inspection'
                 
@@ -5032,15 +5428,15 @@ class CircuitInspector:
                         storage_location, excel_path
                     ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
-                    self.cabinet_id, self.project_name, self.sales_order_no,
+                    cabinet_id, project_name, sales_order_no,
                     total_pages, annotated_pages, total_punches,
                     open_punches, implemented_punches, closed_punches,
                     initial_status, datetime.now().isoformat(),
                     datetime.now().isoformat(),
-                    getattr(self, 'storage_location', None), self.excel_file
+                    storage_location, excel_file
                 ))
                 
-                print(f"✓ Created {self.cabinet_id} with status: {initial_status}")
+                print(f"✓ Created {cabinet_id} with status: {initial_status}")
             
             conn.commit()
             conn.close()
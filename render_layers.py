@@ -0,0 +1,445 @@
+"""
+Layered Page Rendering
+The page is shown as a cached base raster with a separate annotation
+layer on top, so adding, removing or restyling one highlight only touches
+that annotation instead of re-rendering the whole page.
+
+Two interchangeable annotation layers are provided:
+- AnnotationOverlay: every annotation is a small RGBA canvas image
+  (true alpha blending, matches the exported look)
+- VectorAnnotationLayer: every annotation is a set of native Tk canvas
+  items; zoom is a canvas scale() instead of a redraw
+
+When a viewport is set (tiled rendering), annotations outside it are
+culled and only drawn once they scroll into view. Several layers can share
+one canvas (continuous scroll: one per visible page); each owns its items
+through a per-layer tag and draws at its page's origin.
+"""
+
+import abc
+import math
+import tkinter as tk
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont, ImageTk
+
+from stroke_geometry import as_points, flatten
+
+
+class _AnnotationLayer(abc.ABC):
+    """Bookkeeping shared by the raster and vector annotation layers"""
+
+    TAG = 'annotation'
+
+    def __init__(self, canvas, highlighter_colors, highlight_types=('highlight',)):
+        self.canvas = canvas
+        self.highlighter_colors = highlighter_colors
+        self.highlight_types = tuple(highlight_types)
+        self.scale = 1.0
+        self.zoom_level = 1.0
+        # id(annotation) -> (annotation, keep-alive object, signature)
+        self._items: Dict[int, Tuple] = {}
+        # Display-space rect to cull against (None = draw everything)
+        self.viewport = None
+        self._culled: Dict[int, dict] = {}
+        # Canvas position of the page's top-left corner (continuous scroll)
+        self.origin = (0, 0)
+        # Items of this layer only - other layers may share the canvas
+        self.layer_tag = f'annlayer_{id(self)}'
+
+    # ================================================================
+    # VIEW STATE
+    # ================================================================
+
+    def set_view(self, scale: float, zoom_level: float):
+        """Set the page->display scale used for drawing"""
+        self.scale = scale
+        self.zoom_level = zoom_level
+
+    # ================================================================
+    # LAYER OPERATIONS
+    # ================================================================
+
+    def rebuild(self, annotations: Iterable[dict], scale: float, zoom_level: float,
+                viewport=None):
+        """Drop every layer item and redraw the given annotations"""
+        self.clear()
+        self.set_view(scale, zoom_level)
+        self.viewport = viewport
+        for ann in annotations:
+            self.add(ann)
+
+    def set_viewport(self, viewport, annotations: Iterable[dict] = ()):
+        """Move the culling viewport and draw annotations that came into view"""
+        self.viewport = viewport
+        for ann in annotations:
+            key = id(ann)
+            if key in self._culled and self._in_viewport(ann):
+                self.add(ann)
+
+    def sync(self, annotations: Iterable[dict]):
+        """Bring the layer in line with the annotation list.
+
+        Only annotations that were added, removed or changed are touched.
+        """
+        wanted = {id(ann): ann for ann in annotations}
+
+        for key in [k for k in self._items if k not in wanted]:
+            self._delete(key)
+        for key in [k for k in self._culled if k not in wanted]:
+            del self._culled[key]
+
+        for key, ann in wanted.items():
+            entry = self._items.get(key)
+            if entry is None:
+                if key not in self._culled or self._in_viewport(ann):
+                    self.add(ann)
+            elif entry[2] != self._signature(ann):
+                self.refresh(ann)
+
+    def add(self, ann: dict):
+        """Draw a single annotation"""
+        key = id(ann)
+        if key in self._items:
+            self._delete(key)
+        self._culled.pop(key, None)
+
+        if not self._in_viewport(ann):
+            self._culled[key] = ann
+            return
+
+        keep_alive = self._draw(ann, (self.TAG, self.layer_tag, f'ann_{key}'))
+        if keep_alive is None:
+            return
+        self._items[key] = (ann, keep_alive, self._signature(ann))
+
+    def remove(self, ann: dict):
+        """Remove a single annotation from the layer"""
+        self._delete(id(ann))
+        self._culled.pop(id(ann), None)
+
+    def refresh(self, ann: dict):
+        """Redraw one annotation after its style or state changed"""
+        self.add(ann)
+
+    def clear(self):
+        """Remove all layer items"""
+        self.canvas.delete(self.layer_tag)
+        self._items.clear()
+        self._culled.clear()
+
+    def _delete(self, key: int):
+        if self._items.pop(key, None) is not None:
+            self.canvas.delete(f'ann_{key}')
+
+    @abc.abstractmethod
+    def _draw(self, ann: dict, tags: Tuple[str, str]):
+        """Create the canvas item(s) for an annotation.
+
+        Returns an object that must stay referenced while the items exist
+        (or True), or None if there is nothing to draw.
+        """
+
+    # ================================================================
+    # HELPERS
+    # ================================================================
+
+    def _signature(self, ann: dict) -> Tuple:
+        """Everything that affects how an annotation looks"""
+        points = ann.get('points_page', ann.get('points'))
+        return (
+            ann.get('type'),
+            ann.get('color'),
+            bool(ann.get('closed_by')),
+            ann.get('text'),
+            ann.get('pos_page'),
+            id(points),
+            len(points) if points is not None else 0,
+        )
+
+    def _in_viewport(self, ann: dict) -> bool:
+        """Cheap bounds test against the culling viewport"""
+        if self.viewport is None:
+            return True
+
+        if 'points_page' in ann or 'points' in ann:
+            points = ann.get('points_page', ann.get('points'))
+            if points is None or len(points) == 0:
+                return False
+            pts = as_points(points)
+            (min_x, min_y), (max_x, max_y) = pts.min(axis=0), pts.max(axis=0)
+            pad = max(15, int(15 * self.zoom_level))
+        elif 'pos_page' in ann:
+            min_x = max_x = ann['pos_page'][0]
+            min_y = max_y = ann['pos_page'][1]
+            # Text extends right/down from its anchor - be generous
+            pad = 40 * max(1.0, self.zoom_level) + 8 * len(str(ann.get('text', '')))
+        else:
+            return True
+
+        s = self.scale
+        ox, oy = self.origin
+        vx0, vy0, vx1, vy1 = self.viewport
+        return not (max_x * s + ox + pad < vx0 or min_x * s + ox - pad > vx1 or
+                    max_y * s + oy + pad < vy0 or min_y * s + oy - pad > vy1)
+
+    def _to_display(self, points) -> np.ndarray:
+        """Page -> display coordinates for a whole stroke at once"""
+        pts = as_points(points) * self.scale
+        if self.origin != (0, 0):
+            pts += self.origin
+        return pts
+
+    def _highlight_rgba(self, ann: dict):
+        color_key = ann.get('color', 'yellow')
+        return self.highlighter_colors.get(color_key, self.highlighter_colors['yellow'])['rgba']
+
+    def _closed_marker_center(self, ann: dict):
+        """Display position of the green 'closed' dot, or None if still open"""
+        if not ann.get('closed_by'):
+            return None
+        if 'bbox_page' in ann:
+            bx, by = ann['bbox_page'][0], ann['bbox_page'][1]
+        else:
+            bx, by = as_points(ann['points_page']).min(axis=0)
+        return (bx * self.scale + self.origin[0] + 8, by * self.scale + self.origin[1] + 8)
+
+    def _highlight_width(self) -> int:
+        return max(15, int(15 * self.zoom_level))
+
+    def _pen_width(self) -> int:
+        return max(2, int(3 * self.zoom_level))
+
+    def _font_size(self) -> int:
+        return max(12, int(14 * self.zoom_level))
+
+
+class AnnotationOverlay(_AnnotationLayer):
+    """Raster annotation layer - one RGBA canvas image per annotation"""
+
+    def __init__(self, canvas, highlighter_colors, highlight_types=('highlight',)):
+        super().__init__(canvas, highlighter_colors, highlight_types)
+        self._font = None
+
+    def set_view(self, scale: float, zoom_level: float):
+        """Set the page->display scale used for all annotation patches"""
+        if scale != self.scale or zoom_level != self.zoom_level:
+            self._font = None
+        super().set_view(scale, zoom_level)
+
+    @property
+    def font(self):
+        if self._font is None:
+            try:
+                self._font = ImageFont.truetype("arial.ttf", self._font_size())
+            except Exception:
+                self._font = ImageFont.load_default()
+        return self._font
+
+    def _draw(self, ann: dict, tags):
+        patch = self._render_patch(ann)
+        if patch is None:
+            return None
+
+        x0, y0, img = patch
+        photo = ImageTk.PhotoImage(img)
+        self.canvas.create_image(x0, y0, anchor=tk.NW, image=photo, tags=tags)
+        return photo
+
+    def _render_patch(self, ann: dict) -> Optional[Tuple[int, int, Image.Image]]:
+        """Render an annotation into a transparent RGBA patch.
+
+        Returns (x0, y0, image) in display coordinates, or None if the
+        annotation has nothing to draw.
+        """
+        ann_type = ann.get('type')
+
+        # -------- HIGHLIGHTER STROKES --------
+        if ann_type in self.highlight_types and 'points_page' in ann:
+            points_page = ann['points_page']
+            if len(points_page) < 2:
+                return None
+
+            pts = self._to_display(points_page)
+            rgba = self._highlight_rgba(ann)
+            stroke_width = self._highlight_width()
+
+            closed_center = self._closed_marker_center(ann)
+            extent = np.vstack([pts, [closed_center]]) if closed_center else pts
+            x0, y0, img, draw = self._new_patch(extent, stroke_width / 2 + 7)
+            # One joined polyline - segments don't double-blend at the joints
+            draw.line(flatten(pts - (x0, y0)), fill=rgba, width=stroke_width, joint='curve')
+
+            if closed_center:
+                cx, cy = closed_center[0] - x0, closed_center[1] - y0
+                draw.ellipse([cx - 6, cy - 6, cx + 6, cy + 6], fill=(0, 128, 0, 200))
+            return x0, y0, img
+
+        # -------- PEN STROKES --------
+        if ann_type == 'pen' and 'points' in ann:
+            points_page = ann['points']
+            if len(points_page) < 2:
+                return None
+
+            pts = self._to_display(points_page)
+            stroke_width = self._pen_width()
+            x0, y0, img, draw = self._new_patch(pts, stroke_width / 2 + 2)
+            draw.line(flatten(pts - (x0, y0)), fill=(255, 0, 0, 255), width=stroke_width, joint='curve')
+            return x0, y0, img
+
+        # -------- TEXT ANNOTATIONS --------
+        if ann_type == 'text' and 'pos_page' in ann:
+            text = ann.get('text', '')
+            if not text:
+                return None
+
+            px, py = self._to_display(ann['pos_page'])[0]
+            padding = 2
+            left, top, right, bottom = self.font.getbbox(text)
+            x0 = int(math.floor(px + left - padding))
+            y0 = int(math.floor(py + top - padding))
+            x1 = int(math.ceil(px + right + padding))
+            y1 = int(math.ceil(py + bottom + padding))
+
+            img = Image.new('RGBA', (max(1, x1 - x0), max(1, y1 - y0)), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(img)
+            draw.rectangle([0, 0, x1 - x0 - 1, y1 - y0 - 1], fill=(255, 255, 200, 200))
+            draw.text((px - x0, py - y0), text, fill='red', font=self.font)
+            return x0, y0, img
+
+        return None
+
+    def _new_patch(self, pts, pad: float):
+        """Allocate a transparent patch covering pts plus padding"""
+        (min_x, min_y), (max_x, max_y) = pts.min(axis=0), pts.max(axis=0)
+        x0 = int(math.floor(min_x - pad))
+        y0 = int(math.floor(min_y - pad))
+        x1 = int(math.ceil(max_x + pad))
+        y1 = int(math.ceil(max_y + pad))
+        img = Image.new('RGBA', (max(1, x1 - x0), max(1, y1 - y0)), (0, 0, 0, 0))
+        return x0, y0, img, ImageDraw.Draw(img)
+
+
+class VectorAnnotationLayer(_AnnotationLayer):
+    """Vector annotation layer - native Tk canvas items per annotation.
+
+    Tk items have no alpha channel, so highlights use a 50% stipple to stay
+    see-through. A zoom change rescales the existing items with
+    canvas.scale() instead of recreating them.
+    """
+
+    # Extra tags so widths/fonts can be restyled after canvas.scale()
+    ROLE_HIGHLIGHT = 'ann_highlight'
+    ROLE_PEN = 'ann_pen'
+    ROLE_TEXT = 'ann_text'
+    ROLE_MARKER = 'ann_marker'
+
+    def rebuild(self, annotations: Iterable[dict], scale: float, zoom_level: float,
+                viewport=None):
+        """Rescale in place when the same annotations are shown, else redraw"""
+        annotations = list(annotations)
+        same_set = (bool(self._items) and not self._culled and
+                    {id(a) for a in annotations} == set(self._items) and
+                    bool(self.canvas.find_withtag(self.layer_tag)))
+
+        if not same_set:
+            super().rebuild(annotations, scale, zoom_level, viewport)
+            return
+
+        if scale != self.scale:
+            self.rescale(scale, zoom_level)
+        self.sync(annotations)
+
+    def rescale(self, scale: float, zoom_level: float):
+        """Zoom the whole layer with one canvas.scale() and fix up styling"""
+        factor = scale / self.scale
+        self.canvas.scale(self.layer_tag, self.origin[0], self.origin[1], factor, factor)
+        self.set_view(scale, zoom_level)
+
+        self.canvas.itemconfig(self._own(self.ROLE_HIGHLIGHT), width=self._highlight_width())
+        self.canvas.itemconfig(self._own(self.ROLE_PEN), width=self._pen_width())
+
+        # Closed markers keep their fixed 12px size and corner offset
+        for key, (ann, _, _) in self._items.items():
+            center = self._closed_marker_center(ann)
+            if center and ann.get('type') in self.highlight_types:
+                cx, cy = center
+                for item in self.canvas.find_withtag(f'ann_{key}'):
+                    if self.ROLE_MARKER in self.canvas.gettags(item):
+                        self.canvas.coords(item, cx - 6, cy - 6, cx + 6, cy + 6)
+
+        # Text gets the new font size; its background box follows
+        font = ('Arial', self._font_size())
+        for text_id in self.canvas.find_withtag(self._own(self.ROLE_TEXT)):
+            self.canvas.itemconfig(text_id, font=font)
+            bbox = self.canvas.bbox(text_id)
+            if bbox:
+                self.canvas.coords(f'bg_{text_id}',
+                                   bbox[0] - 2, bbox[1] - 2, bbox[2] + 2, bbox[3] + 2)
+
+    def _own(self, role: str) -> str:
+        """Tag expression for this layer's items with a given role"""
+        return f'{role}&&{self.layer_tag}'
+
+    def _draw(self, ann: dict, tags):
+        ann_type = ann.get('type')
+
+        # -------- HIGHLIGHTER STROKES --------
+        if ann_type in self.highlight_types and 'points_page' in ann:
+            points_page = ann['points_page']
+            if len(points_page) < 2:
+                return None
+
+            r, g, b = self._highlight_rgba(ann)[:3]
+            flat = flatten(self._to_display(points_page))
+            self.canvas.create_line(
+                *flat, fill=f'#{r:02x}{g:02x}{b:02x}', width=self._highlight_width(),
+                capstyle=tk.ROUND, joinstyle=tk.ROUND, stipple='gray50',
+                tags=tags + (self.ROLE_HIGHLIGHT,)
+            )
+
+            center = self._closed_marker_center(ann)
+            if center:
+                cx, cy = center
+                self.canvas.create_oval(cx - 6, cy - 6, cx + 6, cy + 6,
+                                        fill='#008000', outline='',
+                                        tags=tags + (self.ROLE_MARKER,))
+            return True
+
+        # -------- PEN STROKES --------
+        if ann_type == 'pen' and 'points' in ann:
+            points_page = ann['points']
+            if len(points_page) < 2:
+                return None
+
+            flat = flatten(self._to_display(points_page))
+            self.canvas.create_line(
+                *flat, fill='red', width=self._pen_width(),
+                capstyle=tk.ROUND, joinstyle=tk.ROUND,
+                tags=tags + (self.ROLE_PEN,)
+            )
+            return True
+
+        # -------- TEXT ANNOTATIONS --------
+        if ann_type == 'text' and 'pos_page' in ann:
+            text = ann.get('text', '')
+            if not text:
+                return None
+
+            px, py = self._to_display(ann['pos_page'])[0]
+            text_id = self.canvas.create_text(
+                px, py, text=text, anchor=tk.NW, fill='red',
+                font=('Arial', self._font_size()),
+                tags=tags + (self.ROLE_TEXT,)
+            )
+            bbox = self.canvas.bbox(text_id) or (px, py, px, py)
+            bg_id = self.canvas.create_rectangle(
+                bbox[0] - 2, bbox[1] - 2, bbox[2] + 2, bbox[3] + 2,
+                fill='#ffffc8', outline='',
+                tags=tags + (f'bg_{text_id}',)
+            )
+            self.canvas.tag_lower(bg_id, text_id)
+            return True
+
+        return None
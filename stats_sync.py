@@ -0,0 +1,122 @@
+"""
+Manager Statistics Sync Scheduler
+Pushing cabinet statistics to the manager database means reading the
+working Excel (open / implemented / closed punches) and opening SQLite.
+Instead of doing that on every redraw, actions that change statistics
+mark the cabinet dirty; after a quiet period one coalesced sync runs on a
+background thread. Save, handover and close flush synchronously.
+
+The in-memory counts (pages, annotations) are snapshotted on the Tk
+thread; only file and database I/O happens on the worker. Its Excel read
+and the tools' Excel saves share EXCEL_LOCK.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+# Wait this long after the last change before syncing
+DEFAULT_QUIET_MS = 2000
+
+# Held around every save of the working Excel and around the sync
+# worker's read of it, so a background sync never loads a half-written file
+EXCEL_LOCK = threading.RLock()
+
+
+class StatsSyncScheduler:
+    """Debounced, dirty-flag driven manager statistics sync"""
+
+    def __init__(self, root, snapshot_fn: Callable[[], Optional[dict]],
+                 sync_fn: Callable[[dict], None], quiet_ms: int = DEFAULT_QUIET_MS):
+        """
+        Args:
+            root: Tk widget used for scheduling (after / after_cancel)
+            snapshot_fn: Tk thread - in-memory counts for the sync, or None
+                         if there is nothing to sync (no cabinet loaded)
+            sync_fn: called with the snapshot; does the file / database I/O
+        """
+        self.root = root
+        self.snapshot_fn = snapshot_fn
+        self.sync_fn = sync_fn
+        self.quiet_ms = quiet_ms
+        self.dirty = False
+        self._after_id = None
+        self._worker: Optional[threading.Thread] = None
+        self.marks = 0
+        self.syncs = 0
+
+    # ================================================================
+    # PUBLIC API (Tk thread)
+    # ================================================================
+
+    def mark_dirty(self, reason: str = ''):
+        """Statistics changed - (re)start the quiet-period timer"""
+        self.dirty = True
+        self.marks += 1
+        self._cancel_timer()
+        self._after_id = self.root.after(self.quiet_ms, self._launch)
+        if reason:
+            print(f"📊 Stats dirty ({reason}) - sync in {self.quiet_ms} ms")
+
+    def flush(self):
+        """Sync now if anything is pending (close)"""
+        if self.dirty:
+            self.sync_now()
+        else:
+            self._cancel_timer()
+            self._wait_for_worker()
+
+    def sync_now(self):
+        """Synchronous sync regardless of the dirty flag (save, handover)"""
+        self._cancel_timer()
+        self._wait_for_worker()
+        snapshot = self.snapshot_fn()
+        self.dirty = False
+        if snapshot is not None:
+            self._run(snapshot)
+
+    # ================================================================
+    # INTERNALS
+    # ================================================================
+
+    def _cancel_timer(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _wait_for_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            self._worker.join()
+        self._worker = None
+
+    def _launch(self):
+        self._after_id = None
+        if not self.dirty:
+            return
+        if self._worker is not None and self._worker.is_alive():
+            # Previous sync still writing - try again after another quiet period
+            self._after_id = self.root.after(self.quiet_ms, self._launch)
+            return
+
+        snapshot = self.snapshot_fn()
+        self.dirty = False
+        if snapshot is None:
+            return
+        self._worker = threading.Thread(target=self._run, args=(snapshot,),
+                                        name="stats-sync", daemon=True)
+        self._worker.start()
+
+    def _run(self, snapshot: dict):
+        start = time.perf_counter()
+        try:
+            self.sync_fn(snapshot)
+        except Exception as e:
+            print(f"⚠️ Manager stats sync failed: {e}")
+            return
+        self.syncs += 1
+        print(f"📊 Manager stats synced in {(time.perf_counter() - start) * 1000:.0f} ms "
+              f"({self.syncs} syncs for {self.marks} changes)")
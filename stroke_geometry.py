@@ -0,0 +1,129 @@
+"""
+Stroke Geometry
+Highlighter and pen strokes are stored as (N, 2) float NumPy arrays so
+zoom, page<->display and page-rotation transforms run as one batched
+array operation instead of a Python loop over tuples, and each stroke
+can be handed to a drawing call as a single flat polyline.
+"""
+
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+
+# Affine maps (A, b) for PDF page rotation: p' = p @ A.T + b,
+# where b is expressed in units of the unrotated page (width, height).
+# Matches the per-point rules of transform_point_for_rotation.
+_ROTATION_MAPS = {
+    0: (np.array([[1.0, 0.0], [0.0, 1.0]]), lambda w, h: (0.0, 0.0)),
+    90: (np.array([[0.0, 1.0], [-1.0, 0.0]]), lambda w, h: (0.0, w)),
+    180: (np.array([[-1.0, 0.0], [0.0, -1.0]]), lambda w, h: (w, h)),
+    270: (np.array([[0.0, -1.0], [1.0, 0.0]]), lambda w, h: (h, 0.0)),
+}
+
+
+def as_points(points) -> np.ndarray:
+    """Return points as a float (N, 2) array (no copy if already one)"""
+    arr = np.asarray(points, dtype=np.float64)
+    if arr.size == 0:
+        return np.empty((0, 2), dtype=np.float64)
+    return arr.reshape(-1, 2)
+
+
+def scale_points(points, factor: float) -> np.ndarray:
+    """Multiply every coordinate by factor (zoom / page<->display)"""
+    return as_points(points) * factor
+
+
+def rotate_points(points, rotation: int, width: float, height: float) -> np.ndarray:
+    """Map unrotated page coordinates onto a page rotated by 0/90/180/270"""
+    pts = as_points(points)
+    mapping = _ROTATION_MAPS.get(rotation % 360)
+    if mapping is None:
+        return pts.copy()
+    matrix, offset = mapping
+    return pts @ matrix.T + np.asarray(offset(width, height))
+
+
+def simplify_points(points, tolerance: float) -> np.ndarray:
+    """Ramer-Douglas-Peucker simplification.
+
+    Drops points that lie within `tolerance` (same units as the points) of
+    the polyline through the kept points. End points are always kept.
+    """
+    pts = as_points(points)
+    n = len(pts)
+    if n < 3 or tolerance <= 0:
+        return pts
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a = pts[start]
+        dx, dy = pts[end] - a
+        inner = pts[start + 1:end] - a
+        length = np.hypot(dx, dy)
+        if length == 0:
+            dist = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            dist = np.abs(dx * inner[:, 1] - dy * inner[:, 0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return pts[keep]
+
+
+def points_bbox(points) -> Tuple[float, float, float, float]:
+    """(x0, y0, x1, y1) of a stroke"""
+    pts = as_points(points)
+    x0, y0 = pts.min(axis=0)
+    x1, y1 = pts.max(axis=0)
+    return (float(x0), float(y0), float(x1), float(y1))
+
+
+def flatten(points) -> List[float]:
+    """[x0, y0, x1, y1, ...] for canvas.create_line / ImageDraw.line"""
+    return as_points(points).ravel().tolist()
+
+
+def to_json(points) -> List[List[float]]:
+    """Plain nested lists for session files"""
+    return as_points(points).tolist()
+
+
+def points_equal(a, b) -> bool:
+    """Value equality that works for arrays, lists and tuples alike"""
+    return np.array_equal(as_points(a), as_points(b))
+
+
+def annotations_equal(a: dict, b: dict) -> bool:
+    """Dict equality for annotations whose strokes may be NumPy arrays.
+
+    Plain `a == b` raises on array values, so undo lookups use this instead.
+    """
+    if a is b:
+        return True
+    if a.keys() != b.keys():
+        return False
+    for key, value in a.items():
+        other = b[key]
+        if value is other:
+            continue
+        if isinstance(value, np.ndarray) or isinstance(other, np.ndarray):
+            if not points_equal(value, other):
+                return False
+        elif value != other:
+            return False
+    return True
+
+
+def stroke_list(strokes: Iterable) -> List[List[Tuple[float, float]]]:
+    """Ink list for PyMuPDF add_ink_annot from one or more strokes"""
+    return [[tuple(p) for p in as_points(s).tolist()] for s in strokes]
@@ -0,0 +1,112 @@
+"""
+Live Stroke Preview
+While a highlighter or pen stroke is being drawn, the preview is one
+canvas polyline whose coordinates are updated in place with coords(),
+instead of one canvas item per motion event.
+
+Motion events only append to a pending list; the canvas item is updated
+at most once per display frame. The preview polyline drops points closer
+than MIN_STEP_PX to the previous one and is re-simplified (RDP) whenever
+it grows past SIMPLIFY_AT points, so the cost per frame stays flat no
+matter how long the stroke gets. The viewer keeps the full-resolution
+points for the annotation itself.
+"""
+
+import math
+import tkinter as tk
+from typing import List, Tuple
+
+from stroke_geometry import flatten, simplify_points
+
+
+FRAME_MS = 16          # ~60 Hz
+MIN_STEP_PX = 1.5      # preview ignores moves shorter than this
+SIMPLIFY_AT = 400      # re-simplify the preview beyond this many points
+SIMPLIFY_TOLERANCE_PX = 0.75
+
+
+class StrokePreview:
+    """One live canvas polyline per stroke, redrawn at frame rate"""
+
+    TAG = 'stroke_preview'
+
+    def __init__(self, root, canvas):
+        self.root = root
+        self.canvas = canvas
+        self.item = None
+        self._points: List[Tuple[float, float]] = []   # simplified preview
+        self._pending: List[Tuple[float, float]] = []
+        self._after_id = None
+        self._simplify_at = SIMPLIFY_AT
+        self.events = 0
+        self.frames = 0
+
+    @property
+    def active(self) -> bool:
+        return self.item is not None
+
+    def begin(self, start: Tuple[float, float], fill: str, width: int):
+        """Start a new stroke preview at start"""
+        self.clear()
+        x, y = start
+        self._points = [(x, y)]
+        self.item = self.canvas.create_line(
+            x, y, x, y, fill=fill, width=width,
+            capstyle=tk.ROUND, joinstyle=tk.ROUND, smooth=True, tags=self.TAG
+        )
+
+    def add_point(self, x: float, y: float):
+        """Motion event - queue the point; the canvas is updated on the next frame"""
+        if self.item is None:
+            return
+        self._pending.append((x, y))
+        self.events += 1
+        if self._after_id is None:
+            self._after_id = self.root.after(FRAME_MS, self._flush)
+
+    def clear(self):
+        """Remove the preview (stroke finished or cancelled)"""
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        if self.item is not None:
+            self.canvas.delete(self.item)
+            if self.events:
+                print(f"✍️ Stroke preview: {self.events} motion events → {self.frames} redraws, "
+                      f"{len(self._points)} preview points")
+        self.item = None
+        self._points = []
+        self._pending = []
+        self._simplify_at = SIMPLIFY_AT
+        self.events = 0
+        self.frames = 0
+
+    def _flush(self):
+        self._after_id = None
+        if self.item is None or not self._pending:
+            return
+
+        last_x, last_y = self._points[-1]
+        for x, y in self._pending:
+            if math.hypot(x - last_x, y - last_y) >= MIN_STEP_PX:
+                self._points.append((x, y))
+                last_x, last_y = x, y
+        tail = self._pending[-1]
+        self._pending = []
+
+        if len(self._points) > self._simplify_at:
+            self._points = [tuple(p) for p in
+                            simplify_points(self._points, SIMPLIFY_TOLERANCE_PX).tolist()]
+            # A stroke RDP can't shrink much waits longer before the next pass
+            self._simplify_at = max(SIMPLIFY_AT, 2 * len(self._points))
+
+        coords = flatten(self._points)
+        if tail != self._points[-1]:
+            coords += tail  # always reach the cursor
+        if len(coords) < 4:
+            coords += coords[-2:]
+        self.canvas.coords(self.item, *coords)
+        self.frames += 1
@@ -0,0 +1,100 @@
+"""
+PDF Text Layer Lookup
+Most schematics are vector PDFs with a real text layer. The words under a
+highlight can be read from it in milliseconds, so OCR is only needed for
+scanned pages or highlights over graphics.
+
+Word boxes come back from MuPDF in unrotated page space; they are mapped
+into the displayed (rotated) page space that bbox_page uses, together with
+the direction of their line, so vertical wire labels read in the right
+order on rotated sheets.
+"""
+
+import statistics
+from typing import List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+
+# Highlight bboxes span the stroke's centre line; a word counts when its
+# centre is within half a highlighter stroke (15 px at 2x scale) of it
+HIGHLIGHT_PAD = 4.0
+
+# (x0, y0, x1, y1, text, line key, dx, dy) - box in displayed page space,
+# (dx, dy) the reading direction of the word's line on screen
+Word = Tuple[float, float, float, float, str, Tuple[int, int], float, float]
+
+
+def page_words(page) -> List[Word]:
+    """Every word on the page in displayed page coordinates"""
+    textpage = page.get_textpage(flags=fitz.TEXTFLAGS_WORDS)
+    directions = {}
+    for block in textpage.extractDICT()['blocks']:
+        for line_no, line in enumerate(block.get('lines', [])):
+            directions[(block['number'], line_no)] = line['dir']
+
+    matrix = page.rotation_matrix
+    turn = fitz.Matrix(matrix.a, matrix.b, matrix.c, matrix.d, 0, 0)
+    words = []
+    for x0, y0, x1, y1, text, block_no, line_no, _ in textpage.extractWORDS():
+        rect = fitz.Rect(x0, y0, x1, y1) * matrix
+        key = (block_no, line_no)
+        dx, dy = fitz.Point(directions.get(key, (1, 0))) * turn
+        words.append((rect.x0, rect.y0, rect.x1, rect.y1, text, key, dx, dy))
+    return words
+
+
+def words_in_rect(words: List[Word], rect, pad_x: float = 0, pad_y: float = 0) -> List[Word]:
+    """Words whose centre lies inside rect (displayed page space), grown by the padding"""
+    x0, y0, x1, y1 = rect
+    x0, y0, x1, y1 = x0 - pad_x, y0 - pad_y, x1 + pad_x, y1 + pad_y
+    return [w for w in words
+            if x0 <= (w[0] + w[2]) / 2 <= x1 and y0 <= (w[1] + w[3]) / 2 <= y1]
+
+
+def reading_order(words: List[Word]) -> str:
+    """Join words in on-screen reading direction.
+
+    Lines run along the dominant text direction and are stacked along its
+    perpendicular (down for normal text, right for labels reading upwards).
+    """
+    if not words:
+        return ""
+
+    lines = {}
+    for word in words:
+        lines.setdefault(word[5], []).append(word)
+
+    # Dominant direction by character count
+    weights = {}
+    for word in words:
+        d = (round(word[6]), round(word[7]))
+        weights[d] = weights.get(d, 0) + len(word[4])
+    dx, dy = max(weights, key=weights.get)
+    nx, ny = -dy, dx
+
+    def along(w):
+        return (w[0] + w[2]) / 2 * dx + (w[1] + w[3]) / 2 * dy
+
+    def across(w):
+        return (w[0] + w[2]) / 2 * nx + (w[1] + w[3]) / 2 * ny
+
+    # Lines closer than half a text height share a row
+    heights = [abs((w[2] - w[0]) * nx + (w[3] - w[1]) * ny) for w in words]
+    band = max(1.0, statistics.median(heights) / 2)
+
+    ordered = []
+    for line in lines.values():
+        line.sort(key=along)
+        ordered.append((sum(across(w) for w in line) / len(line), along(line[0]), line))
+    ordered.sort(key=lambda entry: (round(entry[0] / band), entry[1]))
+    return " ".join(w[4] for _, _, line in ordered for w in line)
+
+
+def text_in_rect(page, rect, pad_x: float = 0, pad_y: float = 0,
+                 words: Optional[List[Word]] = None) -> Optional[str]:
+    """Text-layer words under rect (displayed page space), or None"""
+    if words is None:
+        words = page_words(page)
+    text = reading_order(words_in_rect(words, rect, pad_x, pad_y))
+    return text or None
@@ -0,0 +1,252 @@
+"""
+Page Word Index
+Every word of the open drawing set - text, bbox in displayed page
+coordinates and reading direction - built on a worker thread (own fitz
+document) as soon as a cabinet PDF is loaded.
+
+Pages with a text layer are indexed from it; pages without one get a
+single full-page OCR pass (also kept in the content cache, so another
+cabinet with the same drawing skips it). The finished index is written
+next to the session as <cabinet>_words.json, keyed by the PDF content
+hash, so reopening a cabinet loads it instead of rebuilding. Only the
+inspection tools build it; production never reads highlight text.
+
+Reading the text under a highlight is then a grid lookup into the page's
+words instead of a tesseract run per highlight.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import fitz  # PyMuPDF
+
+from content_cache import page_content_hash, shared_content_cache
+from ocr_engine import OCR_ENGINE
+from page_cache import pdf_content_hash
+from page_raster import pixmap_to_image
+from text_layer import Word, page_words, reading_order, words_in_rect
+
+
+INDEX_VERSION = 1
+OCR_ZOOM = 2.0             # full-page OCR resolution (same as the page OCR elsewhere)
+OCR_PSM = 11               # sparse text - labels scattered over a drawing
+GRID = 48.0                # page points per spatial bucket
+
+
+def word_index_path(sessions_dir: str, cabinet_id: str) -> Optional[str]:
+    """<cabinet>_words.json next to the cabinet's session file"""
+    if not sessions_dir or not cabinet_id:
+        return None
+    return os.path.join(sessions_dir, f"{cabinet_id}_words.json")
+
+
+class PageWords:
+    """Words of one page, bucketed on a uniform grid by word centre"""
+
+    def __init__(self, source: str, words: List[Word]):
+        self.source = source   # 'text', 'ocr' or 'failed' (OCR error - not persisted)
+        self.words = words
+        self._grid: Dict[tuple, List[Word]] = {}
+        for word in words:
+            cell = (int((word[0] + word[2]) / 2 // GRID), int((word[1] + word[3]) / 2 // GRID))
+            self._grid.setdefault(cell, []).append(word)
+
+    def query(self, rect, pad_x: float = 0, pad_y: float = 0) -> List[Word]:
+        """Words whose centre lies inside rect grown by the padding"""
+        x0, y0, x1, y1 = rect
+        candidates = []
+        for cx in range(int((x0 - pad_x) // GRID), int((x1 + pad_x) // GRID) + 1):
+            for cy in range(int((y0 - pad_y) // GRID), int((y1 + pad_y) // GRID) + 1):
+                candidates.extend(self._grid.get((cx, cy), ()))
+        return words_in_rect(candidates, rect, pad_x, pad_y)
+
+
+class WordIndex:
+    """Background-built word index of the open PDF"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pages: Dict[int, PageWords] = {}
+        self.pdf_path = None
+
+    # ================================================================
+    # PUBLIC API
+    # ================================================================
+
+    def build(self, pdf_path: str, index_path: Optional[str] = None):
+        """Start indexing pdf_path; index_path is loaded if current and written when done"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._pages = {}
+            self.pdf_path = pdf_path
+        threading.Thread(target=self._run, args=(generation, pdf_path, index_path),
+                         name="word-index", daemon=True).start()
+
+    def cancel(self):
+        """Stop the running build and forget the index (PDF closed)"""
+        with self._lock:
+            self._generation += 1
+            self._pages = {}
+            self.pdf_path = None
+
+    def has_page(self, page_number: int) -> bool:
+        with self._lock:
+            return page_number in self._pages
+
+    def lookup(self, page_number: int, rect, pad_x: float = 0, pad_y: float = 0) -> Optional[str]:
+        """Words under rect in reading order - '' if none, None if the page is not indexed yet"""
+        with self._lock:
+            page = self._pages.get(page_number)
+        if page is None:
+            return None
+        return reading_order(page.query(rect, pad_x, pad_y))
+
+    def page_source(self, page_number: int) -> Optional[str]:
+        with self._lock:
+            page = self._pages.get(page_number)
+        return page.source if page is not None else None
+
+    # ================================================================
+    # WORKER
+    # ================================================================
+
+    def _publish(self, generation: int, page_number: int, page: PageWords) -> bool:
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._pages[page_number] = page
+            return True
+
+    def _run(self, generation: int, pdf_path: str, index_path: Optional[str]):
+        start = time.perf_counter()
+        try:
+            pdf_hash = pdf_content_hash(pdf_path)
+            stored = self._read(index_path, pdf_hash)
+            doc = fitz.open(pdf_path)
+        except Exception as e:
+            print(f"⚠️ Word index not built: {e}")
+            return
+
+        counts = {'stored': 0, 'text': 0, 'ocr': 0, 'failed': 0}
+        try:
+            for page_number in range(len(doc)):
+                if page_number in stored:
+                    page, kind = stored[page_number], 'stored'
+                else:
+                    page = self._index_page(doc, page_number)
+                    kind = page.source
+                if not self._publish(generation, page_number, page):
+                    return
+                counts[kind] += 1
+            page_count = len(doc)
+        finally:
+            doc.close()
+
+        if counts['text'] or counts['ocr']:
+            self._write(generation, index_path, pdf_hash)
+        print(f"🗂️ Word index ready: {page_count} pages ({counts['stored']} stored, "
+              f"{counts['text']} text layer, {counts['ocr']} OCR, {counts['failed']} failed) in "
+              f"{time.perf_counter() - start:.1f} s")
+
+    def _index_page(self, doc, page_number: int) -> PageWords:
+        page = doc[page_number]
+        try:
+            words = page_words(page)
+        except Exception as e:
+            print(f"⚠️ Text layer of page {page_number + 1} unreadable: {e}")
+            words = []
+        if words:
+            return PageWords('text', words)
+        words = self._ocr_page(doc, page_number)
+        return PageWords('ocr', words) if words is not None else PageWords('failed', [])
+
+    def _ocr_page(self, doc, page_number: int) -> Optional[List[Word]]:
+        """One full-page OCR pass (content cache first) - None if OCR failed"""
+        disk_cache = shared_content_cache()
+        variant = f"words@{OCR_ZOOM:.2f}"
+        page_hash = None
+        try:
+            if disk_cache is not None:
+                page_hash = page_content_hash(doc, page_number)
+                cached = disk_cache.get_ocr(page_hash, variant)
+                if cached is not None:
+                    return [self._word_from_json(w) for w in cached['words']]
+
+            pix = doc[page_number].get_pixmap(matrix=fitz.Matrix(OCR_ZOOM, OCR_ZOOM),
+                                              colorspace=fitz.csGRAY, alpha=False)
+            data = OCR_ENGINE.image_to_data(pixmap_to_image(pix), psm=OCR_PSM)
+        except Exception as e:
+            print(f"⚠️ OCR of page {page_number + 1} failed: {e}")
+            return None
+
+        # The pixmap is of the displayed (rotated) page - pixels / zoom are
+        # already displayed page coordinates; OCR reads left to right
+        words = []
+        for i, text in enumerate(data['text']):
+            text = str(text).strip()
+            if not text or float(data['conf'][i]) <= 0:
+                continue
+            x0, y0 = data['left'][i] / OCR_ZOOM, data['top'][i] / OCR_ZOOM
+            x1 = x0 + data['width'][i] / OCR_ZOOM
+            y1 = y0 + data['height'][i] / OCR_ZOOM
+            words.append((x0, y0, x1, y1, text, (-1, i), 1.0, 0.0))
+        if page_hash is not None:
+            disk_cache.put_ocr(page_hash, variant, {'words': [self._word_to_json(w) for w in words]})
+        return words
+
+    # ================================================================
+    # PERSISTENCE
+    # ================================================================
+
+    @staticmethod
+    def _word_to_json(word: Word) -> list:
+        x0, y0, x1, y1, text, key, dx, dy = word
+        return [round(x0, 2), round(y0, 2), round(x1, 2), round(y1, 2), text,
+                list(key), round(dx, 3), round(dy, 3)]
+
+    @staticmethod
+    def _word_from_json(entry: list) -> Word:
+        x0, y0, x1, y1, text, key, dx, dy = entry
+        return (x0, y0, x1, y1, text, tuple(key), dx, dy)
+
+    def _read(self, index_path: Optional[str], pdf_hash: str) -> Dict[int, PageWords]:
+        if not index_path or not os.path.exists(index_path):
+            return {}
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Word index file unreadable, rebuilding: {e}")
+            return {}
+        if data.get('version') != INDEX_VERSION or data.get('pdf_hash') != pdf_hash:
+            return {}
+        return {int(n): PageWords(page['source'], [self._word_from_json(w) for w in page['words']])
+                for n, page in data.get('pages', {}).items()}
+
+    def _write(self, generation: int, index_path: Optional[str], pdf_hash: str):
+        if not index_path:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            pages = {n: page for n, page in self._pages.items() if page.source != 'failed'}
+        data = {
+            'version': INDEX_VERSION,
+            'pdf_hash': pdf_hash,
+            'pages': {str(n): {'source': page.source,
+                               'words': [self._word_to_json(w) for w in page.words]}
+                      for n, page in sorted(pages.items())}
+        }
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            tmp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, index_path)
+        except Exception as e:
+            print(f"⚠️ Word index not saved: {e}")
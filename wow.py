@@ -10,7 +10,10 @@ import os
 from tkinter import Tk, filedialog, messagebox
 import pytesseract
 from PIL import Image
-import io
+
+from content_cache import page_content_hash, shared_content_cache
+from ocr_engine import OCR_ENGINE
+from page_raster import pixmap_to_image
 
 # Configure Tesseract path (Windows)
 TESSERACT_PATH = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
@@ -122,13 +125,20 @@ def extract_text_via_ocr(page, zoom=2.0):
     Returns:
         str: Extracted text
     """
+    # Same drawing seen before (any cabinet, any tool) - reuse its OCR
+    disk_cache = shared_content_cache()
+    variant = f"text@{zoom:.2f}"
+    page_hash = page_content_hash(page.parent, page.number) if disk_cache is not None else None
+    cached = disk_cache.get_ocr(page_hash, variant) if page_hash else None
+    if cached is not None:
+        return cached['text']
+    
     # Convert page to high-resolution image
     mat = fitz.Matrix(zoom, zoom)
     pix = page.get_pixmap(matrix=mat)
     
-    # Convert to PIL Image
-    img_data = pix.tobytes("png")
-    img = Image.open(io.BytesIO(img_data))
+    # Convert to PIL Image straight from the sample buffer (no PNG round trip)
+    img = pixmap_to_image(pix)
     
     # Optional: Enhance image for better OCR
     # from PIL import ImageEnhance
@@ -136,8 +146,10 @@ def extract_text_via_ocr(page, zoom=2.0):
     # img = ImageEnhance.Sharpness(img).enhance(1.5)
     
     # Perform OCR
-    ocr_text = pytesseract.image_to_string(img, lang='eng')
+    ocr_text = OCR_ENGINE.image_to_string(img, lang='eng')
     
+    if page_hash:
+        disk_cache.put_ocr(page_hash, variant, {'text': ocr_text})
     return ocr_text
 
 
@@ -0,0 +1,150 @@
+"""
+Progressive Zoom
+A zoom step should move the picture immediately. The currently shown page
+raster is cropped to the new viewport and resampled to the new zoom as an
+interim image (cheap, slightly soft), and the sharp raster is rendered by
+the background prefetcher. When it lands in the PageRasterCache the
+viewer swaps it in.
+
+Rapid zoom steps (wheel, repeated double-clicks) restart a short settle
+timer, so only the final zoom level is rendered sharp.
+"""
+
+import time
+import tkinter as tk
+from typing import Callable, Tuple
+
+from PIL import Image, ImageTk
+
+from page_cache import PageRasterCache
+from page_prefetch import PagePrefetcher
+
+
+class ProgressiveZoom:
+    """Interim resampled zoom + collapsed background sharp render"""
+
+    SETTLE_MS = 150   # wait for rapid zoom steps to stop before rendering sharp
+    POLL_MS = 30      # how often to check whether the sharp raster is ready
+    MAX_WAIT_S = 5.0  # give up on the worker and let the viewer render directly
+
+    def __init__(self, root, canvas, cache: PageRasterCache, prefetcher: PagePrefetcher):
+        self.root = root
+        self.canvas = canvas
+        self.cache = cache
+        self.prefetcher = prefetcher
+        self.photo = None  # keeps the interim PhotoImage alive
+        self._after_id = None
+        self._generation = 0
+        self._requested_at = 0.0
+        self.interim_frames = 0
+        self.collapsed_steps = 0
+
+    # ================================================================
+    # INTERIM FRAME
+    # ================================================================
+
+    def show_interim(self, base_img: Image.Image, old_scale: float, new_scale: float,
+                     anchor: Tuple[float, float]) -> bool:
+        """Show base_img resampled to new_scale, keeping anchor under the cursor.
+
+        Only the part of the raster that ends up in the viewport is resampled.
+        The caller redraws annotations at the new scale afterwards.
+        """
+        if base_img is None or old_scale <= 0:
+            return False
+
+        start = time.perf_counter()
+        f = new_scale / old_scale
+        ax, ay = anchor
+        view_w = max(1, self.canvas.winfo_width())
+        view_h = max(1, self.canvas.winfo_height())
+
+        # New viewport origin that keeps the anchor at the same screen position
+        new_x0 = ax * f - (ax - self.canvas.canvasx(0))
+        new_y0 = ay * f - (ay - self.canvas.canvasy(0))
+
+        # Matching source rectangle in the old raster
+        src_x0 = max(0, int(new_x0 / f))
+        src_y0 = max(0, int(new_y0 / f))
+        src_x1 = min(base_img.width, int((new_x0 + view_w) / f) + 2)
+        src_y1 = min(base_img.height, int((new_y0 + view_h) / f) + 2)
+        if src_x1 <= src_x0 or src_y1 <= src_y0:
+            return False
+
+        crop = base_img.crop((src_x0, src_y0, src_x1, src_y1))
+        size = (max(1, round(crop.width * f)), max(1, round(crop.height * f)))
+        self.photo = ImageTk.PhotoImage(crop.resize(size, Image.BILINEAR))
+
+        self.canvas.delete("!annotation")
+        self.canvas.create_image(src_x0 * f, src_y0 * f, anchor=tk.NW,
+                                 image=self.photo, tags='page_base')
+        self.canvas.tag_lower('page_base')
+
+        page_w = base_img.width * f
+        page_h = base_img.height * f
+        self.canvas.config(scrollregion=(0, 0, page_w, page_h))
+        self.canvas.xview_moveto(max(0.0, new_x0) / max(1.0, page_w))
+        self.canvas.yview_moveto(max(0.0, new_y0) / max(1.0, page_h))
+
+        self.interim_frames += 1
+        print(f"🔍 Interim zoom {old_scale:.2f} → {new_scale:.2f} in "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms")
+        return True
+
+    # ================================================================
+    # SHARP RENDER
+    # ================================================================
+
+    def request_sharp(self, doc, page_number: int, scale: float, on_ready: Callable[[], None]):
+        """Render the page at scale in the background, then call on_ready on the Tk thread.
+
+        A new request before the settle timer fires replaces the old one.
+        """
+        if self._after_id is not None:
+            self.collapsed_steps += 1
+        self.cancel()
+        self._requested_at = time.perf_counter()
+        generation = self._generation
+        self._after_id = self.root.after(
+            self.SETTLE_MS, lambda: self._start(generation, doc, page_number, scale, on_ready))
+
+    def cancel(self):
+        """Drop any pending sharp render (page change, new PDF)"""
+        self._generation += 1
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _start(self, generation, doc, page_number, scale, on_ready):
+        self._after_id = None
+        if generation != self._generation:
+            return
+        key = self.cache.make_key(doc, page_number, scale)
+        if self.cache.contains(key):
+            self._finish(on_ready)
+            return
+        if not self.prefetcher.request(doc, page_number, scale, include_current=True):
+            # In-memory document - the viewer renders it synchronously
+            self._finish(on_ready)
+            return
+        self._poll(generation, key, on_ready)
+
+    def _poll(self, generation, key, on_ready):
+        self._after_id = None
+        if generation != self._generation:
+            return
+        if self.cache.contains(key) or time.perf_counter() - self._requested_at > self.MAX_WAIT_S:
+            self._finish(on_ready)
+            return
+        self._after_id = self.root.after(self.POLL_MS,
+                                         lambda: self._poll(generation, key, on_ready))
+
+    def _finish(self, on_ready: Callable[[], None]):
+        elapsed = (time.perf_counter() - self._requested_at) * 1000
+        print(f"🔍 Sharp zoom ready after {elapsed:.0f} ms "
+              f"({self.interim_frames} interim frames, {self.collapsed_steps} steps collapsed)")
+        self.photo = None
+        on_ready()